@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+
+from app.core.auth import get_current_user
+from app.models.analytics import CohortStats, ProgressDiff
+from app.models.form import FormType
+from app.services.analytics_service import AnalyticsService
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+@router.get("/cohort", response_model=CohortStats)
+async def get_cohort_stats(
+    year: int,
+    form_type: FormType,
+    case_types: Optional[List[str]] = Query(None, description="Only cases tagged with any of these types"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Support_type distributions, means and percentiles per item and per activity
+    across every form of `form_type` in `year`
+    """
+    return await AnalyticsService.cohort_stats(year, form_type.value, case_types)
+
+
+@router.get("/progress/{case_id}", response_model=ProgressDiff)
+async def get_progress(
+    case_id: int,
+    form_type: FormType,
+    from_year: int,
+    to_year: int,
+    narrative: bool = Query(False, description="Also have the LLM describe the changes"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Per-item and per-activity support_type change of a case's form between two years
+    """
+    return await AnalyticsService.progress(case_id, form_type.value, from_year, to_year, narrative)
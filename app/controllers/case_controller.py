@@ -1,29 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from typing import List
 from app.models.case import Case, CaseCreate, CaseUpdate
 from app.services.case_service import CaseService
 from app.core.auth import get_current_user, get_current_admin_user
+from app.core.etag import compute_etag, not_modified
+from app.core.responses import shaped_response
 
 router = APIRouter(prefix="/cases", tags=["cases"])
 
 @router.get("/", response_model=List[Case])
 async def get_all_cases(
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get all cases
     """
-    return await CaseService.get_all_cases()
+    cases = await CaseService.get_all_cases()
+    return not_modified(request, response, compute_etag(cases)) or shaped_response(cases, Case, response)
 
 @router.get("/{case_id}", response_model=Case)
 async def get_case(
     case_id: int,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get a specific case by ID
     """
-    return await CaseService.get_case_by_id(case_id)
+    case = await CaseService.get_case_by_id(case_id)
+    return not_modified(request, response, compute_etag(case)) or shaped_response(case, Case, response)
 
 @router.post("/", response_model=Case, status_code=status.HTTP_201_CREATED)
 async def create_case(
@@ -1,27 +1,110 @@
-from fastapi import APIRouter, Depends, status
-from typing import List
-from app.models.form import FormRecordCreate, FormRecord, FormRecordResponse, FormMetadata
-from app.services.form_service import FormService
+import orjson
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.models.form import (
+    FormRecordCreate, FormRecordCompactCreate, FormRecord, FormRecordResponse, FormMetadata,
+    FormTemplateResponse, FormType, FormBulkImportResult
+)
+from app.services.form_service import FormService, FORM_PAGE_SIZE, MAX_FORM_PAGE_SIZE
 from app.core.auth import get_current_user
+from app.core.etag import compute_etag, not_modified
+from app.core.responses import shaped_response
 
 router = APIRouter(prefix="/forms", tags=["forms"])
 
+def set_next_cursor(response: Response, records: list, limit: int):
+    """Expose the keyset cursor for the next page when this page is full"""
+    if len(records) == limit:
+        response.headers["X-Next-Cursor"] = str(records[-1]["id"])
+
 @router.get("/", response_model=List[FormMetadata])
-async def get_all(current_user: dict = Depends(get_current_user)):
-    return await FormService.get_all()
+async def get_all(
+    request: Request,
+    response: Response,
+    cursor: Optional[int] = Query(None, description="Return forms with an ID greater than this cursor"),
+    limit: int = Query(FORM_PAGE_SIZE, ge=1, le=MAX_FORM_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
+    records = await FormService.get_all(after_id=cursor, limit=limit)
+    set_next_cursor(response, records, limit)
+    return not_modified(request, response, compute_etag(records)) or shaped_response(records, FormMetadata, response)
+
+@router.get("/templates/{form_type}", response_model=FormTemplateResponse)
+async def get_template(
+    form_type: FormType,
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    template = FormService.get_template(form_type.value)
+    # The template version already hashes the items
+    etag = '"' + template["version"] + '"'
+    return not_modified(request, response, etag) or template
 
 @router.get("/{form_id}", response_model=FormRecordResponse)
-async def get_by_id(form_id: int, current_user: dict = Depends(get_current_user)):
-    return await FormService.get_by_id(form_id)
+async def get_by_id(
+    form_id: int,
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    # Validate against the metadata first so a 304 never loads or expands the content
+    etag = compute_etag(await FormService.get_version(form_id))
+    return not_modified(request, response, etag) or shaped_response(
+        await FormService.get_by_id(form_id), FormRecordResponse, response
+    )
 
 @router.post("/", response_model=FormRecord, status_code=status.HTTP_201_CREATED)
 async def create(form_data: FormRecordCreate, current_user: dict = Depends(get_current_user)):
     return await FormService.create(form_data.dict())
 
+@router.post("/compact", response_model=FormRecord, status_code=status.HTTP_201_CREATED)
+async def create_compact(form_data: FormRecordCompactCreate, current_user: dict = Depends(get_current_user)):
+    return await FormService.create_compact(form_data.dict())
+
+async def ndjson_progress(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """One line per row result as each chunk completes, then a summary line"""
+    created = failed = 0
+    async for batch in batches:
+        for result in batch:
+            if result["status"] == "created":
+                created += 1
+            else:
+                failed += 1
+        yield b"".join(orjson.dumps(result) + b"\n" for result in batch)
+    yield orjson.dumps({"total": created + failed, "created": created, "failed": failed}) + b"\n"
+
+@router.post("/bulk", response_model=FormBulkImportResult)
+async def bulk_create(
+    request: Request,
+    stream: bool = Query(False, description="Stream per-row results as NDJSON while the import runs"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Import many forms at once. The body is a JSON array of FormRecordCreate objects,
+    or one object per line with Content-Type application/x-ndjson.
+    """
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    rows, errors = await FormService.read_bulk(request.stream(), ndjson)
+    batches = FormService.bulk_create(rows, errors)
+    if stream:
+        return StreamingResponse(ndjson_progress(batches), media_type="application/x-ndjson")
+    return await FormService.collect_bulk(batches)
+
 @router.delete("/{form_id}")
 async def delete(form_id: int, current_user: dict = Depends(get_current_user)):
     return await FormService.delete(form_id)
 
 @router.get("/case/{case_id}", response_model=List[FormMetadata])
-async def get_by_case_id(case_id: int, current_user: dict = Depends(get_current_user)):
-    return await FormService.get_by_case_id(case_id)
\ No newline at end of file
+async def get_by_case_id(
+    case_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[int] = Query(None, description="Return forms with an ID greater than this cursor"),
+    limit: int = Query(FORM_PAGE_SIZE, ge=1, le=MAX_FORM_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
+    records = await FormService.get_by_case_id(case_id, after_id=cursor, limit=limit)
+    set_next_cursor(response, records, limit)
+    return not_modified(request, response, compute_etag(records)) or shaped_response(records, FormMetadata, response)
@@ -1,11 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, Any, List
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, AsyncIterator, Tuple
 
-from app.services.llm_service import LLMService
-from app.core.auth import get_current_user
+from app.models.llm_job import AnalysisJob, AnalysisJobCreate
+from app.services.llm_service import FormNotFound, LLMService
+from app.services.llm_job_service import LLMJobService
+from app.core.auth import get_current_user, get_current_admin_user
+from app.core.etag import with_etag
 
 router = APIRouter(prefix="/llm", tags=["llm"])
 
+@router.post("/analyze/{case_id}/{year}", response_model=Dict[str, Any])
+async def analyze_case_year(
+    case_id: int,
+    year: int,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    綜合分析個案該年度所有表單，並產出整體支持計畫
+    """
+    try:
+        return await LLMService.analyze_case_year(case_id, year)
+    except FormNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="找不到對應的表單資料"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"分析失敗: {str(e)}"
+        )
+
+
 @router.post("/analyze/{case_id}/{year}/{form_type}", response_model=Dict[str, Any])
 async def analyze_form_data(
     case_id: int,
@@ -23,6 +51,39 @@ async def analyze_form_data(
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"分析失敗：{str(e)}")
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def sse_stream(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield format_sse(event, data)
+    except Exception as e:
+        yield format_sse("error", {"detail": f"分析失敗：{str(e)}"})
+
+
+@router.post("/analyze/{case_id}/{year}/{form_type}/stream")
+async def stream_analyze_form_data(
+    case_id: int,
+    year: int,
+    form_type: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    以 Server-Sent Events 串流 LLM 分析過程：生成中送出 token 事件，完成並寫入資料庫後送出 result 事件
+    """
+    try:
+        events = await LLMService.stream_analysis(case_id, year, form_type)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return StreamingResponse(
+        sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
     
 
 @router.get("/analyze/{case_id}/{year}/{form_type}", response_model=Dict[str, Any])
@@ -30,6 +91,8 @@ async def get_analyzed_result(
     case_id: int,
     year: int,
     form_type: str,
+    request: Request,
+    response: Response,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -39,8 +102,36 @@ async def get_analyzed_result(
         result = await LLMService.get_analysis_result(case_id, year, form_type)
         if not result:
             raise ValueError("分析結果不存在")
-        return result
+        return with_etag(request, response, result)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"分析失敗：{str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"分析失敗：{str(e)}")
+
+
+@router.post("/jobs", response_model=AnalysisJob, status_code=status.HTTP_202_ACCEPTED)
+async def create_analysis_job(
+    job_request: AnalysisJobCreate,
+    current_user: Dict[str, Any] = Depends(get_current_admin_user)
+):
+    """
+    建立批次分析工作：指定 (case_id, year, form_type) 清單或篩選條件，由背景工作者逐一分析並寫入資料庫（僅限管理員）
+    """
+    return await LLMJobService.create_job(job_request)
+
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJob)
+async def get_analysis_job(
+    job_id: str,
+    request: Request,
+    response: Response,
+    include_items: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    查詢批次分析工作的進度
+    """
+    job = LLMJobService.get_job(job_id, include_items)
+    if not job:
+        raise HTTPException(status_code=404, detail="分析工作不存在")
+    return with_etag(request, response, job)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from typing import Dict, Any
+
+from app.core.auth import get_current_admin_user, principal_cache
+from app.core.worker_pool import password_pool
+from app.core.llm_pipeline import llm_client
+from app.services.llm_service import LLMService, analysis_flights
+from app.services.llm_cache_service import LLMCacheService
+from app.services.llm_job_service import LLMJobService
+from app.services.analytics_service import cohort_cache
+from app.repositories.case_repository import case_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/", response_model=Dict[str, Any])
+async def get_metrics(current_user: Dict[str, Any] = Depends(get_current_admin_user)):
+    """
+    Get in-process runtime metrics (admin only)
+    """
+    return {
+        "password_hashing": password_pool.stats(),
+        "principal_cache": principal_cache.stats(),
+        "llm": llm_client.stats(),
+        "analysis_single_flight": analysis_flights.stats(),
+        "llm_parsing": LLMService.parse_stats(),
+        "llm_result_cache": LLMCacheService.stats(),
+        "llm_jobs": LLMJobService.stats(),
+        "cohort_stats_cache": cohort_cache.stats(),
+        "case_cache": case_cache.stats(),
+    }
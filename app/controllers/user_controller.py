@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from typing import List, Dict, Any
 
 from app.models.user import (
@@ -6,16 +6,21 @@ from app.models.user import (
 )
 from app.services.user_service import UserService
 from app.core.auth import get_current_user, get_current_admin_user
+from app.core.etag import with_etag
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 # Admin routes
 @router.get("/", response_model=List[User])
-async def get_all_users(current_user: Dict[str, Any] = Depends(get_current_admin_user)):
+async def get_all_users(
+    request: Request,
+    response: Response,
+    current_user: Dict[str, Any] = Depends(get_current_admin_user)
+):
     """
     Get all users (admin only)
     """
-    return await UserService.get_all_users()
+    return with_etag(request, response, await UserService.get_all_users())
 
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
 async def create_user(
@@ -30,12 +35,14 @@ async def create_user(
 # Regular user routes - specific paths first
 @router.get("/me", response_model=User)
 async def get_current_user_info(
+    request: Request,
+    response: Response,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
     Get current user's information
     """
-    return await UserService.get_user_by_id(current_user["id"])
+    return with_etag(request, response, await UserService.get_user_by_id(current_user["id"]))
 
 @router.put("/me", response_model=User)
 async def update_current_user(
@@ -52,12 +59,14 @@ async def update_current_user(
 @router.get("/{user_id}", response_model=User)
 async def get_user(
     user_id: int,
+    request: Request,
+    response: Response,
     current_user: Dict[str, Any] = Depends(get_current_admin_user)
 ):
     """
     Get a specific user by ID (admin only)
     """
-    return await UserService.get_user_by_id(user_id)
+    return with_etag(request, response, await UserService.get_user_by_id(user_id))
 
 @router.put("/{user_id}", response_model=User)
 async def admin_update_user(
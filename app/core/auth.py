@@ -6,6 +6,7 @@ from typing import Dict, Optional
 import os
 from dotenv import load_dotenv
 
+from app.core.cache import TTLCache
 from app.repositories.user_repository import UserRepository, UserDict
 
 # Load environment variables
@@ -19,6 +20,19 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Authenticated users by id, so protected routes skip the users lookup on every request
+principal_cache = TTLCache(
+    "principals",
+    max_size=int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+)
+
+def invalidate_principal(user_id: int) -> None:
+    """
+    Drop a cached user so changes (e.g. deactivation) apply on the next request
+    """
+    principal_cache.delete(user_id)
+
 def create_access_token(data: Dict) -> str:
     """
     Create a JWT access token
@@ -37,7 +51,7 @@ async def authenticate_user(email: str, password: str) -> Optional[UserDict]:
     print(user)
     if not user:
         return None
-    if not UserRepository.verify_password(password, user["password"]):
+    if not await UserRepository.verify_password_async(password, user["password"]):
         return None
     # The activate check is already handled in the login endpoint in auth_controller.py
     return user
@@ -61,9 +75,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserDict:
     except (JWTError, ValueError):
         raise credentials_exception
     
-    user = await UserRepository.get_user_by_id(user_id)
+    user = principal_cache.get(user_id)
     if user is None:
-        raise credentials_exception
+        user = await UserRepository.get_user_by_id(user_id)
+        if user is None:
+            raise credentials_exception
+        principal_cache.set(user_id, user)
     return user
 
 async def get_current_admin_user(current_user: UserDict = Depends(get_current_user)) -> UserDict:
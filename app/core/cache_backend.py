@@ -0,0 +1,123 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from app.core.cache import TTLCache
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class CacheBackend(ABC):
+    """Interface of a shared async cache namespace"""
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU + TTL cache; each uvicorn worker keeps its own copy"""
+    name = "memory"
+
+    def __init__(self, namespace: str, max_size: int, ttl: float):
+        self.cache = TTLCache(namespace, max_size, ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        self.cache.set(key, value)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.cache.delete(key)
+
+    async def clear(self) -> None:
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.cache.stats(), backend=self.name)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared by every worker through Redis (or anything speaking its protocol).
+
+    Entries are JSON under `<namespace>:<key>` with the TTL as expiry; size-based
+    eviction is left to the server's maxmemory-policy (e.g. allkeys-lru).
+    """
+    name = "redis"
+
+    def __init__(self, namespace: str, ttl: float, url: str = REDIS_URL):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis needs the `redis` package (pip install redis)") from e
+        self.namespace = namespace
+        self.ttl = ttl
+        self._redis = redis.from_url(url)
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self._key(key))
+        if raw is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._redis.set(self._key(key), json.dumps(value, ensure_ascii=False, default=str), ex=max(1, int(self.ttl)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            self._invalidations += await self._redis.delete(*(self._key(key) for key in keys))
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._redis.scan_iter(match=self._key("*"))]
+        if keys:
+            self._invalidations += await self._redis.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "backend": self.name,
+            "ttl_seconds": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self._invalidations,
+        }
+
+
+def create_cache_backend(namespace: str, max_size: int, ttl: float) -> CacheBackend:
+    """Build the backend selected by CACHE_BACKEND (memory | redis)"""
+    if CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(namespace, max_size, ttl)
+    if CACHE_BACKEND == "redis":
+        return RedisCacheBackend(namespace, ttl)
+    raise ValueError(f"Unsupported cache backend: {CACHE_BACKEND}")
@@ -0,0 +1,155 @@
+import os
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional; without it clients are served gzip
+    brotli = None
+
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Sent as is: SSE clients and proxies expect the raw event stream
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream",)
+
+# (compress chunk, flush what is buffered so far, finish stream)
+Compressor = Tuple[Callable[[bytes], bytes], Callable[[], bytes], Callable[[], bytes]]
+
+
+def gzip_compressor(level: int = GZIP_LEVEL) -> Compressor:
+    # wbits=31 writes the gzip container rather than a raw zlib stream
+    stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return stream.compress, lambda: stream.flush(zlib.Z_SYNC_FLUSH), stream.flush
+
+
+def brotli_compressor(quality: int = BROTLI_QUALITY) -> Compressor:
+    stream = brotli.Compressor(quality=quality)
+    return stream.process, stream.flush, stream.finish
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Codings of an Accept-Encoding header with their q-values"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [piece.strip() for piece in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Preferred encoding the client accepts: br when available, else gzip.
+    A coding with q=0 is refused, including one only matched by `*`.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip response compression.
+
+    Bodies under `minimum_size` and responses that are already encoded are sent
+    unchanged; so is text/event-stream. Each chunk of a streamed body is
+    flushed as it is sent, so progress streams (e.g. NDJSON) stay incremental.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await CompressionResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[Compressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def new_compressor(self) -> Compressor:
+        return brotli_compressor() if self.encoding == "br" else gzip_compressor()
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith(UNCOMPRESSED_MEDIA_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Hold the headers back until the first body chunk decides the encoding
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = self.new_compressor()
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            body = self.encode(body, more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        await self.send({"type": "http.response.body", "body": self.encode(body, more_body), "more_body": more_body})
+
+    def encode(self, body: bytes, more_body: bool) -> bytes:
+        compress, flush, finish = self.compressor
+        return compress(body) + (flush() if more_body else finish())
@@ -0,0 +1,108 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+BatchFn = Callable[[List[Hashable]], Awaitable[List[Dict[str, Any]]]]
+
+# Loaders of the current request, keyed by (table, columns); None outside a request scope
+_request_loaders: ContextVar[Optional[Dict[Tuple[str, str], "DataLoader"]]] = ContextVar("request_loaders", default=None)
+
+
+class DataLoader:
+    """
+    Batches and memoizes by-id loads of one table.
+
+    Every `load` made in the same event-loop tick is collected and fetched with
+    a single `batch_fn(ids)` call; later loads of an id already seen reuse the
+    first result. Ids are memoized by their string form, so "5" from a path
+    and 5 from the database share an entry. Instances live for one request,
+    so nothing outlives it.
+    """
+
+    def __init__(self, batch_fn: BatchFn, key: str = "id"):
+        self.batch_fn = batch_fn
+        self.key = key
+        self._results: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[Hashable, asyncio.Future]] = []
+        self.batches = 0
+
+    async def load(self, id: Hashable) -> Optional[Dict[str, Any]]:
+        """The row with this id, or None if there is none"""
+        result = self._results.get(str(id))
+        if result is None:
+            loop = asyncio.get_running_loop()
+            result = self._results[str(id)] = loop.create_future()
+            self._pending.append((id, result))
+            if len(self._pending) == 1:
+                # Give the other loads of this tick the chance to join the batch
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return await asyncio.shield(result)
+
+    async def load_many(self, ids: List[Hashable]) -> List[Optional[Dict[str, Any]]]:
+        return list(await asyncio.gather(*[self.load(id) for id in ids]))
+
+    def prime(self, id: Hashable, row: Optional[Dict[str, Any]]) -> None:
+        """Record a row the caller already has, e.g. one it just wrote"""
+        result = asyncio.get_running_loop().create_future()
+        result.set_result(row)
+        self._results[str(id)] = result
+
+    def clear(self, id: Optional[Hashable] = None) -> None:
+        """Forget one id, or every id, after a write"""
+        if id is None:
+            self._results.clear()
+        else:
+            self._results.pop(str(id), None)
+
+    async def _dispatch(self) -> None:
+        pending, self._pending = self._pending, []
+        self.batches += 1
+        try:
+            rows = await self.batch_fn([id for id, _ in pending])
+        except Exception as e:
+            for id, result in pending:
+                result.set_exception(e)
+                result.exception()
+                # Don't memoize failures; the next load retries
+                if self._results.get(str(id)) is result:
+                    del self._results[str(id)]
+            return
+        by_id = {str(row[self.key]): row for row in rows}
+        for id, result in pending:
+            result.set_result(by_id.get(str(id)))
+
+
+def loader_for(table: str, batch_fn: BatchFn, columns: str = "*") -> Optional[DataLoader]:
+    """
+    The current request's loader for `columns` of `table`, or None outside a
+    request scope. Each projection gets its own loader, so a narrow lookup
+    never widens into a `select *`.
+    """
+    loaders = _request_loaders.get()
+    if loaders is None:
+        return None
+    loader = loaders.get((table, columns))
+    if loader is None:
+        loader = loaders[(table, columns)] = DataLoader(batch_fn)
+    return loader
+
+
+def current_loaders(table: str) -> List[DataLoader]:
+    """Every loader the current request has for `table`, whatever its columns"""
+    loaders = _request_loaders.get()
+    if not loaders:
+        return []
+    return [loader for (name, _), loader in loaders.items() if name == table]
+
+
+def begin_request_scope() -> None:
+    """Give the current request its own set of loaders"""
+    _request_loaders.set({})
+
+
+async def request_scope() -> None:
+    """
+    FastAPI dependency that turns on request-scoped loading. Each request runs
+    in its own task and context, so the loaders never leak into another request.
+    """
+    begin_request_scope()
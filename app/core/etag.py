@@ -0,0 +1,42 @@
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+
+
+def compute_etag(payload: Any) -> str:
+    """Strong ETag over the JSON form of a response payload"""
+    body = orjson.dumps(payload, default=jsonable_encoder, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names `etag`"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Tag the response with `etag` and return a 304 Not Modified response when the
+    client already has this version. Lets a route check a cheap validator (a
+    version string, a row's updated_at) before it loads or enriches the payload.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def with_etag(request: Request, response: Response, payload: Any) -> Any:
+    """
+    Tag a GET response with an ETag over its payload and answer 304 Not Modified
+    when the client already has this version; otherwise return `payload` unchanged.
+    """
+    return not_modified(request, response, compute_etag(payload)) or payload
@@ -0,0 +1,140 @@
+import base64
+import hashlib
+import json
+import os
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+FORM_TEMPLATE_PATH = Path(os.getenv(
+    "FORM_TEMPLATE_PATH",
+    Path(__file__).resolve().parent.parent / "data" / "form.json"
+))
+# Every template version ever compiled, one file per version (see app/data/generate_form.py)
+TEMPLATE_ARCHIVE_DIR = Path(os.getenv(
+    "FORM_TEMPLATE_ARCHIVE_DIR",
+    Path(__file__).resolve().parent.parent / "data" / "templates"
+))
+SUPPORT_TYPES = {-1, 0, 1, 2, 3, 4}
+# Stands in for a null support_type in a packed vector
+PACKED_NULL = -128
+
+ItemKey = Tuple[str, str, Optional[str]]
+
+
+class FormTemplate:
+    """
+    The canonical item list of one form type.
+
+    `index` maps (activity, item, subitem) to the item's position, so a form can
+    travel as a vector of support types aligned to `items` instead of full dicts.
+    `version` changes whenever the item list does.
+    """
+
+    def __init__(self, form_type: str, items: List[Dict[str, Any]]):
+        self.form_type = form_type
+        self.items = [
+            {
+                "activity": item["activity"],
+                "item": item["item"],
+                "subitem": item.get("subitem"),
+                "core_area": item["core_area"]
+            }
+            for item in items
+        ]
+        self.index: Dict[ItemKey, int] = {
+            (item["activity"], item["item"], item["subitem"]): position
+            for position, item in enumerate(self.items)
+        }
+        canonical = json.dumps(self.items, ensure_ascii=False, sort_keys=True)
+        self.version = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def validate_scores(self, scores: List[Optional[int]]) -> None:
+        """Raise ValueError unless `scores` has one valid support type (or null) per item"""
+        if len(scores) != len(self.items):
+            raise ValueError(
+                f"Form {self.form_type} expects {len(self.items)} scores, got {len(scores)}"
+            )
+        for position, score in enumerate(scores):
+            if score is not None and score not in SUPPORT_TYPES:
+                raise ValueError(f"Invalid support_type {score} at position {position}")
+
+    def expand(self, scores: List[Optional[int]]) -> List[Dict[str, Any]]:
+        """Turn a score vector into the full FormItem list stored in forms.content"""
+        self.validate_scores(scores)
+        return [dict(item, support_type=score) for item, score in zip(self.items, scores)]
+
+    def compact(self, content: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        Turn a FormItem list back into a score vector; raises ValueError if it
+        does not cover exactly this template's items, core areas included.
+        """
+        if len(content) != len(self.items):
+            raise ValueError(f"Form {self.form_type} content does not match template {self.version}")
+        scores: List[Optional[int]] = [None] * len(self.items)
+        seen = set()
+        for item in content:
+            position = self.index.get((item.get("activity"), item.get("item"), item.get("subitem")))
+            if position is None or position in seen or item.get("core_area") != self.items[position]["core_area"]:
+                raise ValueError(f"Form {self.form_type} content does not match template {self.version}")
+            seen.add(position)
+            scores[position] = item.get("support_type")
+        self.validate_scores(scores)
+        return scores
+
+
+def pack_scores(scores: List[Optional[int]]) -> str:
+    """One signed byte per item, base64 encoded for a text column"""
+    packed = array("b", [PACKED_NULL if score is None else score for score in scores])
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def unpack_scores(packed: str) -> List[Optional[int]]:
+    values = array("b")
+    values.frombytes(base64.b64decode(packed))
+    return [None if value == PACKED_NULL else value for value in values]
+
+
+_templates: Optional[Dict[str, FormTemplate]] = None
+_by_version: Dict[str, FormTemplate] = {}
+
+
+def load_templates(path: Path = FORM_TEMPLATE_PATH) -> Dict[str, FormTemplate]:
+    """Read and index the form templates; called once at startup"""
+    global _templates
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    _templates = {form_type: FormTemplate(form_type, items) for form_type, items in raw.items()}
+    # Versions loaded earlier in this process stay resolvable alongside the current ones
+    _by_version.update({template.version: template for template in _templates.values()})
+    return _templates
+
+
+def get_templates() -> Dict[str, FormTemplate]:
+    if _templates is None:
+        load_templates()
+    return _templates
+
+
+def get_template(form_type: str) -> FormTemplate:
+    template = get_templates().get(form_type)
+    if template is None:
+        raise ValueError(f"Unsupported form type: {form_type}")
+    return template
+
+
+def get_template_version(version: str) -> FormTemplate:
+    get_templates()
+    template = _by_version.get(version)
+    if template is None:
+        archive_path = TEMPLATE_ARCHIVE_DIR / f"{version}.json"
+        if not archive_path.exists():
+            raise ValueError(f"Unknown form template version: {version}")
+        with open(archive_path, encoding="utf-8") as f:
+            archived = json.load(f)
+        template = FormTemplate(archived["form_type"], archived["items"])
+        _by_version[version] = template
+    return template
@@ -0,0 +1,137 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def loads_lenient(text: str) -> Optional[Any]:
+    """json.loads that also forgives trailing commas; None when the text is not JSON"""
+    for candidate in (text, _TRAILING_COMMA.sub(r"\1", text)):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+class JSONExtractor:
+    """
+    Incrementally pulls a JSON object out of free-form model output.
+
+    Text is fed chunk by chunk as it arrives; every top-level `{...}` is tried
+    the moment its closing brace is seen, so prose or code fences around the
+    object do not matter. A `{` where no JSON value could start (e.g. in prose
+    after a stray brace) starts a new candidate instead of nesting in it, and
+    a `"` where no JSON string could start is not taken as opening one.
+    `accept` decides whether a parsed object is the one wanted (e.g. validates
+    as a given model). If the output ends before an accepted object closes,
+    `finish` repairs the truncated one by closing open strings and brackets,
+    backing off to the last complete member if needed.
+    """
+
+    def __init__(self, accept: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        self.accept = accept or (lambda value: True)
+        self.value: Optional[Dict[str, Any]] = None
+        self.repaired = False
+        self._buffer: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # (buffer length, open brackets) just before each comma, for backing off
+        self._commas: List[Tuple[int, List[str]]] = []
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """Consume more output; returns the accepted object once one has been seen"""
+        if self.value is not None:
+            return self.value
+        for ch in chunk:
+            if not self._stack:
+                if ch == "{":
+                    self._buffer = [ch]
+                    self._stack = ["{"]
+                    self._commas = []
+                continue
+
+            if self._in_string:
+                self._buffer.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == "{" and not self._value_can_start():
+                # What came before cannot be JSON; the object may start here
+                self._buffer = [ch]
+                self._stack = ["{"]
+                self._commas = []
+                self._in_string = False
+                self._escape = False
+                continue
+            if ch == '"' and self._last_significant() in "{[,:":
+                # A quote anywhere else is prose, not the start of a JSON string
+                self._in_string = True
+            elif ch in _CLOSERS:
+                self._stack.append(ch)
+            elif ch in "}]":
+                self._stack.pop()
+            elif ch == ",":
+                self._commas.append((len(self._buffer), list(self._stack)))
+            self._buffer.append(ch)
+
+            if not self._stack and self._try("".join(self._buffer)):
+                return self.value
+        return None
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """The accepted object, repairing a truncated one if the output stopped mid-object"""
+        if self.value is not None or not self._stack:
+            return self.value
+
+        text = "".join(self._buffer)
+        if self._in_string:
+            text += '"'
+        if self._try(text + self._closing(self._stack), repaired=True):
+            return self.value
+        # Drop the member that was cut off, then everything after each earlier comma
+        for length, stack in reversed(self._commas):
+            if self._try("".join(self._buffer[:length]) + self._closing(stack), repaired=True):
+                return self.value
+        return None
+
+    def _significant(self):
+        return (ch for ch in reversed(self._buffer) if not ch.isspace())
+
+    def _last_significant(self) -> str:
+        return next(self._significant(), "")
+
+    def _value_can_start(self) -> bool:
+        """Whether a JSON value may follow the candidate so far: after `[`, `,` or `"key":`"""
+        significant = self._significant()
+        last = next(significant, "")
+        if last == ":":
+            return next(significant, "") == '"'
+        return last in "[,"
+
+    @staticmethod
+    def _closing(stack: List[str]) -> str:
+        return "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+    def _try(self, text: str, repaired: bool = False) -> bool:
+        value = loads_lenient(text)
+        if isinstance(value, dict) and self.accept(value):
+            self.value = value
+            self.repaired = repaired
+            return True
+        return False
+
+
+def extract_json(text: str, accept: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Optional[Dict[str, Any]]:
+    """Find the first acceptable JSON object in `text`"""
+    extractor = JSONExtractor(accept)
+    extractor.feed(text)
+    return extractor.finish()
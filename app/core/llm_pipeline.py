@@ -14,23 +14,320 @@
 #     )
 #     return response['choices'][0]['message']['content']
 
-import google.generativeai as genai
+import asyncio
+import json
 import os
+import random
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 
 # 讀取 API 金鑰
 api_key = os.getenv("GEMINI_API_KEY")
 genai.configure(api_key=api_key)
 
-# 建立 Gemini 模型 client
-model = genai.GenerativeModel("gemini-1.5-flash-8b") # small & stable 小型模型，專為較低智慧程度的任務而設計
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-8b") # small & stable 小型模型，專為較低智慧程度的任務而設計
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "max_output_tokens": 1024
+}
+# Gemini JSON mode: the model emits a bare JSON object instead of prose or fenced code
+if os.getenv("LLM_JSON_MODE", "true").lower() == "true":
+    GENERATION_CONFIG["response_mime_type"] = "application/json"
+
+# Errors worth another attempt: rate limiting, overload and timeouts
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+
+# Awaited before each generation started from the current context, e.g. a job worker's rate limit
+_generation_gate: ContextVar[Optional[Callable[[], Awaitable[None]]]] = ContextVar("generation_gate", default=None)
+
+
+def pace_generations(acquire: Callable[[], Awaitable[None]]) -> None:
+    """Make every generation started from the current context wait on `acquire()` first"""
+    _generation_gate.set(acquire)
+
+
+class LLMBackend(ABC):
+    """Interface every LLM backend implements"""
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> str:
+        ...
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the completion in chunks; backends without streaming yield it whole"""
+        yield await self.generate(prompt)
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through the SDK's native async generation"""
+    name = "gemini"
+
+    def __init__(self, model_name: str = MODEL_NAME, generation_config: Optional[Dict[str, Any]] = None):
+        self.model_name = model_name
+        self.generation_config = generation_config or GENERATION_CONFIG
+        # 建立 Gemini 模型 client
+        self.model = genai.GenerativeModel(model_name)
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config=self.generation_config
+        )
+        return response.text
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config=self.generation_config,
+            stream=True
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+FAKE_RESPONSE = json.dumps({
+    "summary": {
+        "summary": "測試摘要",
+        "strengths": "測試優勢",
+        "concerns": "測試困難",
+        "priority_item": "測試優先項目"
+    },
+    "suggestions": {
+        "strategy": "測試策略"
+    }
+}, ensure_ascii=False)
+
+FAKE_PLAN_RESPONSE = json.dumps({
+    "overall_summary": "測試整體摘要",
+    "strengths": "測試優勢",
+    "concerns": "測試困難",
+    "priority_goals": "測試優先目標",
+    "support_plan": "測試支持計畫"
+}, ensure_ascii=False)
+
+FAKE_PROGRESS_RESPONSE = json.dumps({
+    "summary": "測試摘要",
+    "improvements": "測試進步",
+    "regressions": "測試退步",
+    "recommendations": "測試建議"
+}, ensure_ascii=False)
+
+# A field only that prompt's JSON schema asks for -> canned answer matching the schema
+FAKE_RESPONSES_BY_FIELD = {
+    '"overall_summary"': FAKE_PLAN_RESPONSE,
+    '"improvements"': FAKE_PROGRESS_RESPONSE,
+}
+
+
+class FakeBackend(LLMBackend):
+    """
+    Offline backend that answers after a fixed delay, for tests and load testing.
+    Without a fixed `response` it answers the synthesis and progress prompts
+    with their own schema and every other prompt with an AnalysisResult.
+    """
+    name = "fake"
+
+    def __init__(self, response: Optional[str] = None, latency: float = 0.0):
+        self.model_name = "fake"
+        self.generation_config = {}
+        self.response = response or FAKE_RESPONSE
+        self.fixed = response is not None
+        self.latency = latency
+        self.calls = 0
 
-def llm_pipeline(prompt: str) -> str:
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": 0.7,
-            "top_p": 0.95,
-            "max_output_tokens": 1024
+    def answer(self, prompt: str) -> str:
+        if not self.fixed:
+            for field, response in FAKE_RESPONSES_BY_FIELD.items():
+                if field in prompt:
+                    return response
+        return self.response
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self.answer(prompt)
+
+    async def stream(self, prompt: str, chunk_size: int = 16) -> AsyncIterator[str]:
+        self.calls += 1
+        response = self.answer(prompt)
+        chunks = [response[i:i + chunk_size] for i in range(0, len(response), chunk_size)]
+        for chunk in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            yield chunk
+
+
+class LLMClient:
+    """
+    Async front door to an LLM backend.
+
+    Caps concurrent generations with a semaphore, bounds every attempt with a
+    timeout and retries transient failures with full-jitter exponential backoff.
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        max_concurrency: int = 4,
+        timeout: float = 60.0,
+        max_retries: int = 2,
+        backoff_base: float = 1.0,
+        backoff_max: float = 10.0
+    ):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._calls = 0
+        self._retries = 0
+        self._timeouts = 0
+        self._failures = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._slots_loop = loop
+        return self._slots
+
+    @staticmethod
+    async def _pass_gate() -> None:
+        gate = _generation_gate.get()
+        if gate is not None:
+            await gate()
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max, base * 2^attempt)]"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def generate(self, prompt: str) -> str:
+        """Generate a completion for `prompt`"""
+        await self._pass_gate()
+        self._calls += 1
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore():
+                    self._in_flight += 1
+                    self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+                    try:
+                        return await asyncio.wait_for(self.backend.generate(prompt), self.timeout)
+                    finally:
+                        self._in_flight -= 1
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._timeouts += 1
+                if attempt >= self.max_retries:
+                    self._failures += 1
+                    raise
+                self._retries += 1
+                await asyncio.sleep(self.backoff_delay(attempt))
+                attempt += 1
+            except Exception:
+                self._failures += 1
+                raise
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream a completion for `prompt` chunk by chunk.
+
+        The timeout applies to each chunk, and a failed attempt is only retried
+        if nothing has been yielded to the caller yet.
+        """
+        await self._pass_gate()
+        self._calls += 1
+        attempt = 0
+        while True:
+            emitted = False
+            try:
+                async with self._semaphore():
+                    self._in_flight += 1
+                    self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+                    chunks = self.backend.stream(prompt)
+                    try:
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                            except StopAsyncIteration:
+                                return
+                            emitted = True
+                            yield chunk
+                    finally:
+                        self._in_flight -= 1
+                        await chunks.aclose()
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._timeouts += 1
+                if emitted or attempt >= self.max_retries:
+                    self._failures += 1
+                    raise
+                self._retries += 1
+                await asyncio.sleep(self.backoff_delay(attempt))
+                attempt += 1
+            except Exception:
+                self._failures += 1
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of concurrency and retry counters"""
+        return {
+            "backend": self.backend.name,
+            "model": getattr(self.backend, "model_name", None),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "calls": self._calls,
+            "retries": self._retries,
+            "timeouts": self._timeouts,
+            "failures": self._failures,
         }
-    )
-    return response.text
\ No newline at end of file
+
+
+def create_backend() -> LLMBackend:
+    """Build the backend selected by LLM_BACKEND (gemini | fake)"""
+    backend = os.getenv("LLM_BACKEND", "gemini")
+    if backend == "fake":
+        return FakeBackend(latency=float(os.getenv("LLM_FAKE_LATENCY_SECONDS", "1.0")))
+    if backend == "gemini":
+        return GeminiBackend()
+    raise ValueError(f"Unsupported LLM backend: {backend}")
+
+
+llm_client = LLMClient(
+    create_backend(),
+    # At least the 7 forms (A–G) of a case-year, so its fan-out runs in one wave
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "60")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "2"))
+)
+
+
+def set_backend(backend: LLMBackend) -> None:
+    """Swap the backend used by the shared client, e.g. for an offline load test"""
+    llm_client.backend = backend
+
+
+async def llm_pipeline(prompt: str) -> str:
+    return await llm_client.generate(prompt)
+
+
+def llm_stream(prompt: str) -> AsyncIterator[str]:
+    return llm_client.stream(prompt)
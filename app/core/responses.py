@@ -0,0 +1,27 @@
+from typing import Any, Dict, List, Type, Union
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+Rows = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+
+def shaped_response(payload: Rows, model: Type[BaseModel], response: Response) -> ORJSONResponse:
+    """
+    Serialize rows that already have `model`'s shape straight through orjson.
+
+    Returning a model-shaped dict normally has FastAPI validate it into the
+    response_model and dump it back out before rendering, which dominates the
+    cost of large payloads like form content. Here the rows only lose the
+    columns the model doesn't declare (e.g. the packed-score columns), so keep
+    using it for rows from our own tables, never for input that needs checking.
+    Headers already set on `response` (ETag, X-Next-Cursor) are carried over.
+    """
+    fields = model.model_fields
+    if isinstance(payload, list):
+        content = [{k: v for k, v in row.items() if k in fields} for row in payload]
+    else:
+        content = {k: v for k, v in payload.items() if k in fields}
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return ORJSONResponse(content, headers=headers)
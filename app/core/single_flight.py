@@ -0,0 +1,78 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight execution.
+
+    The first caller for a key runs the work as a task; callers that arrive
+    while it is still running await the same task instead of repeating it.
+    The task is shielded, so a leader that disconnects does not cancel the
+    work its followers are waiting on. Coalescing is per process.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._leaders = 0
+        self._followers = 0
+
+    def in_flight(self, key: Hashable) -> Optional[asyncio.Future]:
+        """The pending execution for `key`, if there is one"""
+        return self._flights.get(key)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn()` unless a call for `key` is already running, then share its result"""
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._followers += 1
+            return await asyncio.shield(flight)
+
+        self._leaders += 1
+        flight = asyncio.ensure_future(fn())
+        self._flights[key] = flight
+        flight.add_done_callback(lambda _: self._forget(key, flight))
+        return await asyncio.shield(flight)
+
+    def start(self, key: Hashable) -> asyncio.Future:
+        """
+        Register work for `key` that the caller drives itself (e.g. a stream);
+        settle it with `finish` so waiting callers are released.
+        """
+        self._leaders += 1
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        flight.add_done_callback(lambda _: self._forget(key, flight))
+        return flight
+
+    def finish(self, flight: asyncio.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Settle a flight registered with `start`"""
+        if flight.done():
+            return
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            # The leader went away mid-flight; followers get an ordinary error instead
+            error = RuntimeError(f"{self.name} call was interrupted")
+        if error is not None:
+            flight.set_exception(error)
+            # Followers re-raise it; keep asyncio from logging it as never retrieved
+            flight.exception()
+        else:
+            flight.set_result(result)
+
+    async def join(self, flight: asyncio.Future) -> Any:
+        """Wait for someone else's flight as a follower"""
+        self._followers += 1
+        return await asyncio.shield(flight)
+
+    def _forget(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of how many calls were coalesced"""
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self._leaders,
+            "followers": self._followers,
+        }
@@ -1,71 +1,240 @@
-from supabase import create_client, Client
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
 from dotenv import load_dotenv
+import asyncio
 import os
 from typing import Dict, List, Optional, Any
 
+from app.core.dataloader import current_loaders, loader_for
+
 # Load environment variables
 load_dotenv()
 
-# Initialize Supabase client
-supabase: Client = create_client(
-    supabase_url=os.getenv("SUPABASE_URL"),
-    supabase_key=os.getenv("SUPABASE_KEY")
-)
+# Maximum number of Supabase round trips allowed in flight at once
+MAX_CONCURRENT_QUERIES = int(os.getenv("SUPABASE_MAX_CONCURRENCY", "20"))
+QUERY_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "30"))
+
+# Upper bound on ids per `in.(...)` filter so the request URL stays a sane length
+IN_FILTER_CHUNK_SIZE = 500
+
+# The async client owns one pooled httpx session, so it is created once per event loop
+_client: Optional[AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_client_lock: Optional[asyncio.Lock] = None
+_query_slots: Optional[asyncio.Semaphore] = None
+
+
+async def get_client() -> AsyncClient:
+    """Get the shared async Supabase client, creating it on first use"""
+    global _client, _client_loop, _client_lock, _query_slots
+    loop = asyncio.get_running_loop()
+    if _client is not None and _client_loop is loop:
+        return _client
+
+    if _client_loop is not loop:
+        _client = None
+        _client_loop = loop
+        _client_lock = asyncio.Lock()
+        _query_slots = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+
+    async with _client_lock:
+        if _client is None:
+            _client = await acreate_client(
+                supabase_url=os.getenv("SUPABASE_URL"),
+                supabase_key=os.getenv("SUPABASE_KEY"),
+                options=AsyncClientOptions(postgrest_client_timeout=QUERY_TIMEOUT_SECONDS)
+            )
+    return _client
+
+
+async def get_table(name: str):
+    """Get a request builder for a table on the shared client"""
+    client = await get_client()
+    return client.table(name)
+
+
+async def execute(query) -> Any:
+    """Execute a request builder without exceeding the concurrency limit"""
+    async with _query_slots:
+        return await query.execute()
+
 
 class SupabaseService:
     @staticmethod
     async def get_all(table: str) -> List[Dict[str, Any]]:
         """Fetch all records from a table"""
-        response = supabase.table(table).select("*").execute()
+        query = (await get_table(table)).select("*")
+        response = await execute(query)
         return response.data
 
     @staticmethod
     async def get_by_id(table: str, id: Any) -> Optional[Dict[str, Any]]:
-        """Fetch a single record by ID"""
-        response = supabase.table(table).select("*").eq("id", id).execute()
+        """Fetch a single record by ID, batched and memoized within a request"""
+        loader = SupabaseService._loader(table)
+        if loader is not None:
+            row = await loader.load(id)
+            return dict(row) if row else None
+        query = (await get_table(table)).select("*").eq("id", id)
+        response = await execute(query)
         return response.data[0] if response.data else None
 
+    @staticmethod
+    async def get_by_ids(table: str, ids: List[Any], columns: str = "*") -> List[Dict[str, Any]]:
+        """
+        Fetch all records whose ID is in `ids` with one `in` query per chunk.
+        Within a request the rows come through the request's loader for `columns`.
+        """
+        unique_ids = list(dict.fromkeys(i for i in ids if i is not None))
+        if not unique_ids:
+            return []
+        loader = SupabaseService._loader(table, columns)
+        if loader is not None:
+            return [dict(row) for row in await loader.load_many(unique_ids) if row]
+        return await SupabaseService._fetch_by_ids(table, unique_ids, columns)
+
+    @staticmethod
+    def _loader(table: str, columns: str = "*"):
+        if columns != "*" and "id" not in (column.strip() for column in columns.split(",")):
+            # Rows without their id can't be matched back to the ids asked for
+            return None
+        return loader_for(table, lambda ids: SupabaseService._fetch_by_ids(table, ids, columns), columns)
+
+    @staticmethod
+    async def _fetch_by_ids(table: str, unique_ids: List[Any], columns: str = "*") -> List[Dict[str, Any]]:
+        chunks = [
+            unique_ids[i:i + IN_FILTER_CHUNK_SIZE]
+            for i in range(0, len(unique_ids), IN_FILTER_CHUNK_SIZE)
+        ]
+        queries = [(await get_table(table)).select(columns).in_("id", chunk) for chunk in chunks]
+        responses = await asyncio.gather(*[execute(query) for query in queries])
+        return [row for response in responses for row in response.data]
+
+    @staticmethod
+    def _forget(table: str, id: Any = None) -> None:
+        """Drop what this request's loader remembers about rows a write touched"""
+        for loader in current_loaders(table):
+            loader.clear(id)
+
     @staticmethod
     async def create(table: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new record"""
-        response = supabase.table(table).insert(data).execute()
+        query = (await get_table(table)).insert(data)
+        response = await execute(query)
+        row = response.data[0] if response.data else None
+        SupabaseService._forget(table, row["id"] if row and "id" in row else None)
+        return row
+
+    @staticmethod
+    async def create_many(table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert several records with one multi-row insert; returns them in input order"""
+        if not rows:
+            return []
+        query = (await get_table(table)).insert(rows)
+        response = await execute(query)
+        SupabaseService._forget(table)
+        return response.data
+
+    @staticmethod
+    async def upsert(table: str, data: Dict[str, Any], on_conflict: str) -> Dict[str, Any]:
+        """Insert a record, or update the existing one that conflicts on `on_conflict`"""
+        query = (await get_table(table)).upsert(data, on_conflict=on_conflict)
+        response = await execute(query)
+        SupabaseService._forget(table)
         return response.data[0] if response.data else None
 
     @staticmethod
     async def update(table: str, id: Any, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a record by ID"""
-        response = supabase.table(table).update(data).eq("id", id).execute()
+        query = (await get_table(table)).update(data).eq("id", id)
+        response = await execute(query)
+        SupabaseService._forget(table, id)
         return response.data[0] if response.data else None
 
+    @staticmethod
+    async def update_where(table: str, filters: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Update every record matching all `filters`"""
+        query = (await get_table(table)).update(data)
+        for key, value in filters.items():
+            query = query.eq(key, value)
+        response = await execute(query)
+        SupabaseService._forget(table)
+        return response.data or []
+
     @staticmethod
     async def delete(table: str, id: Any) -> bool:
         """Delete a record by ID"""
-        response = supabase.table(table).delete().eq("id", id).execute()
+        query = (await get_table(table)).delete().eq("id", id)
+        response = await execute(query)
+        SupabaseService._forget(table, id)
         return bool(response.data)
 
+    @staticmethod
+    async def delete_older_than(table: str, column: str, cutoff: Any) -> int:
+        """Delete every record whose `column` is before `cutoff`, returning how many went"""
+        query = (await get_table(table)).delete().lt(column, cutoff)
+        response = await execute(query)
+        SupabaseService._forget(table)
+        return len(response.data or [])
+
     @staticmethod
     async def query(
         table: str,
         filters: Optional[Dict[str, Any]] = None,
         order_by: Optional[str] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        columns: str = "*",
+        descending: bool = False,
+        offset: int = 0
     ) -> List[Dict[str, Any]]:
-        """Query records with filters, ordering, and limit"""
-        query = supabase.table(table).select("*")
-        
+        """Query records with filters, ordering, limit and offset"""
+        query = (await get_table(table)).select(columns)
+
         if filters:
             for key, value in filters.items():
                 query = query.eq(key, value)
-        
+
         if order_by:
-            query = query.order(order_by)
-            
-        if limit:
+            query = query.order(order_by, desc=descending)
+
+        if offset:
+            query = query.range(offset, offset + (limit or 1) - 1)
+        elif limit:
             query = query.limit(limit)
-            
-        response = query.execute()
-        return response.data 
-    
+
+        response = await execute(query)
+        return response.data
+
+    @staticmethod
+    async def get_page(
+        table: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        after_id: Optional[Any] = None,
+        limit: int = 100,
+        in_filters: Optional[Dict[str, List[Any]]] = None,
+        overlap_filters: Optional[Dict[str, List[Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Fetch one keyset page of records ordered by ID, starting after `after_id`"""
+        query = (await get_table(table)).select(columns)
+
+        if filters:
+            for key, value in filters.items():
+                query = query.eq(key, value)
+
+        if in_filters:
+            for key, values in in_filters.items():
+                query = query.in_(key, values)
+
+        if overlap_filters:
+            for key, values in overlap_filters.items():
+                query = query.ov(key, values)
+
+        if after_id is not None:
+            query = query.gt("id", after_id)
+
+        query = query.order("id").limit(limit)
+        response = await execute(query)
+        return response.data
+
     @staticmethod
     async def query_field_by_conditions(
         table: str,
@@ -73,19 +242,19 @@ class SupabaseService:
         field: str
     ) -> Optional[Any]:
         """Query a single field value with multiple conditions"""
-        query = supabase.table(table).select(field)
+        query = (await get_table(table)).select(field)
         for key, value in filters.items():
             query = query.eq(key, value)
-        response = query.execute()
+        response = await execute(query)
         if response.data and field in response.data[0]:
             return response.data[0][field]
         return None
-    
+
     @staticmethod
     async def get_by_filter(table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Get all records by filter"""
-        response = supabase.table(table).select("*")
+        query = (await get_table(table)).select("*")
         for key, value in filters.items():
-            response = response.eq(key, value)
-        response = response.execute()
+            query = query.eq(key, value)
+        response = await execute(query)
         return response.data
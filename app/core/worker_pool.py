@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class WorkerPoolBusy(Exception):
+    """Raised when a worker pool's queue is full and the job is rejected"""
+
+
+class WorkerPool:
+    """
+    Bounded thread pool for CPU-heavy calls made from async handlers.
+
+    At most `max_workers` jobs run at once and at most `max_queue` jobs may wait;
+    anything beyond that is rejected with WorkerPoolBusy instead of piling up.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._peak_queued = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Run `fn(*args)` on the pool without blocking the event loop"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise WorkerPoolBusy(f"{self.name} pool is saturated")
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+        job = {"started": False, "abandoned": False}
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._call, fn, args, time.perf_counter(), job)
+        except asyncio.CancelledError:
+            with self._lock:
+                if not job["started"]:
+                    # The job never reached a worker, so _call won't free its queue slot
+                    job["abandoned"] = True
+                    self._queued -= 1
+            raise
+
+    def _call(self, fn: Callable, args: tuple, submitted_at: float, job: Dict[str, bool]) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            if job["abandoned"]:
+                return None
+            job["started"] = True
+            self._queued -= 1
+            self._running += 1
+            self._total_wait += started_at - submitted_at
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._total_run += time.perf_counter() - started_at
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and throughput counters"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "running": self._running,
+                "peak_queued": self._peak_queued,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait / completed * 1000, 2) if completed else 0.0,
+                "avg_run_ms": round(self._total_run / completed * 1000, 2) if completed else 0.0,
+            }
+
+
+# bcrypt releases the GIL, so a thread per core gives real parallelism
+password_pool = WorkerPool(
+    "password_hashing",
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)),
+    max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "256"))
+)
@@ -1,28 +1,115 @@
-import pandas as pd
+"""
+Compile Form_Metadata.csv into the form templates served by the API.
+
+Writes app/data/form.json (form_type -> item list), a manifest with the CSV hash
+and each form type's template version, and an archive copy of every template
+version under app/data/templates/ so forms packed against an older version can
+still be expanded. Nothing is rebuilt when the CSV hash matches the manifest.
+
+    python -m app.data.generate_form
+    python -m app.data.generate_form --force
+"""
+import argparse
+import csv
+import hashlib
 import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.core.form_templates import TEMPLATE_ARCHIVE_DIR, FormTemplate
+
+DATA_DIR = Path(__file__).resolve().parent
+CSV_PATH = DATA_DIR / "Form_Metadata.csv"
+OUTPUT_PATH = DATA_DIR / "form.json"
+MANIFEST_PATH = DATA_DIR / "form_manifest.json"
+COLUMNS = ["source_form", "core_area", "activity", "item", "subitem"]
 
-meta_path = "app/data/form_metadata.csv"
-df_meta = pd.read_csv(meta_path, skiprows=1, sep=None, engine="python")
-df_meta.columns = ["source_form", "core_area", "activity", "item", "subitem"]
 
-forms_data = {}
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-for form in sorted(df_meta["source_form"].unique()):
-    form_df = df_meta[df_meta["source_form"] == form]
-    form_records = []
-    for _, row in form_df.iterrows():
-        entry = {
+
+def read_metadata(path: Path) -> Iterator[Dict[str, str]]:
+    """Stream the CSV rows, skipping the banner line exported above the header"""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = csv.reader(f)
+        for row in rows:
+            if [cell.strip() for cell in row[:len(COLUMNS)]] == COLUMNS:
+                break
+        for row in rows:
+            if any(cell.strip() for cell in row):
+                yield dict(zip(COLUMNS, (cell.strip() for cell in row)))
+
+
+def compile_templates(rows: Iterable[Dict[str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group rows by form type, keeping the CSV order of the items"""
+    templates: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        templates.setdefault(row["source_form"], []).append({
             "activity": row["activity"],
             "item": row["item"],
-            "subitem": row["subitem"] if not pd.isna(row["subitem"]) else None,
+            "subitem": row["subitem"] or None,
             "core_area": row["core_area"],
             "support_type": None
-        }
-        form_records.append(entry)
-    forms_data[f"form_{form}"] = form_records
+        })
+    return {form_type: templates[form_type] for form_type in sorted(templates)}
+
+
+def load_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path: Path, data: Any, indent: Optional[int] = 2) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+
+
+def build(
+    csv_path: Path = CSV_PATH,
+    output_path: Path = OUTPUT_PATH,
+    manifest_path: Path = MANIFEST_PATH,
+    archive_dir: Path = TEMPLATE_ARCHIVE_DIR,
+    force: bool = False
+) -> Dict[str, Any]:
+    """Compile the templates unless the CSV is unchanged; returns the manifest"""
+    source_hash = file_hash(csv_path)
+    manifest = load_manifest(manifest_path)
+    if not force and manifest and manifest["source_hash"] == source_hash and output_path.exists():
+        return dict(manifest, rebuilt=False)
+
+    templates = compile_templates(read_metadata(csv_path))
+    versions = {}
+    for form_type, items in templates.items():
+        template = FormTemplate(form_type, items)
+        versions[form_type] = template.version
+        archive_path = archive_dir / f"{template.version}.json"
+        if not archive_path.exists():
+            write_json(archive_path, {"form_type": form_type, "items": template.items})
+
+    write_json(output_path, templates)
+    manifest = {
+        "source_hash": source_hash,
+        "versions": versions,
+        "item_counts": {form_type: len(items) for form_type, items in templates.items()}
+    }
+    write_json(manifest_path, manifest)
+    return dict(manifest, rebuilt=True)
 
-output_path = "app/data/form.json"
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(forms_data, f, ensure_ascii=False, indent=2)
 
-output_path
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", type=Path, default=CSV_PATH)
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    parser.add_argument("--manifest", type=Path, default=MANIFEST_PATH)
+    parser.add_argument("--force", action="store_true", help="rebuild even if the CSV is unchanged")
+    args = parser.parse_args()
+    result = build(args.csv, args.output, args.manifest, force=args.force)
+    print(("compiled " if result["rebuilt"] else "unchanged, skipped ") + json.dumps(result["versions"]))
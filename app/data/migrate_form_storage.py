@@ -0,0 +1,75 @@
+"""
+Convert existing `forms` rows between full and packed storage.
+
+Run after migrations/004_packed_form_scores.sql has been applied:
+
+    python -m app.data.migrate_form_storage --dry-run
+    python -m app.data.migrate_form_storage            # content -> template_version + scores
+    python -m app.data.migrate_form_storage --expand   # back to content, e.g. before a rollback
+
+Rows whose content does not follow the current template are left untouched and reported.
+"""
+import argparse
+import asyncio
+
+from app.core.form_templates import get_template, get_template_version, pack_scores, unpack_scores
+from app.core.supabase_client import SupabaseService
+
+TABLE_NAME = "forms"
+
+
+def pack_row(row):
+    """The update that packs a full row, or None when it is already packed or off-template"""
+    if not row.get("content"):
+        return None
+    template = get_template(row["form_type"])
+    scores = template.compact(row["content"])
+    return {"content": None, "template_version": template.version, "scores": pack_scores(scores)}
+
+
+def expand_row(row):
+    """The update that restores `content` on a packed row, or None when it is already full"""
+    if row.get("content") or not row.get("scores"):
+        return None
+    template = get_template_version(row["template_version"])
+    return {"content": template.expand(unpack_scores(row["scores"])), "template_version": None, "scores": None}
+
+
+async def migrate(expand: bool, dry_run: bool, page_size: int):
+    convert = expand_row if expand else pack_row
+    counts = {"converted": 0, "unchanged": 0, "skipped": 0}
+    after_id = None
+    while True:
+        page = await SupabaseService.get_page(
+            TABLE_NAME,
+            columns="id,form_type,content,template_version,scores",
+            after_id=after_id,
+            limit=page_size
+        )
+        for row in page:
+            try:
+                update = convert(row)
+            except ValueError as e:
+                counts["skipped"] += 1
+                print(f"skip form {row['id']}: {e}")
+                continue
+            if update is None:
+                counts["unchanged"] += 1
+                continue
+            if not dry_run:
+                await SupabaseService.update(TABLE_NAME, row["id"], update)
+            counts["converted"] += 1
+        if len(page) < page_size:
+            break
+        after_id = page[-1]["id"]
+    print(("dry run: " if dry_run else "") + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expand", action="store_true", help="restore content from packed scores")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(migrate(args.expand, args.dry_run, args.page_size))
@@ -1,9 +1,23 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from app.controllers import user_controller, auth_controller, case_controller, form_controller, llm_controller
+from app.controllers import (
+    user_controller, auth_controller, case_controller, form_controller, llm_controller, metrics_controller,
+    analytics_controller
+)
+from app.core.worker_pool import WorkerPoolBusy
+from app.core.form_templates import load_templates
+from app.core.dataloader import request_scope
+from app.core.compression import CompressionMiddleware
 
-app = FastAPI(title="GuardTree API", version="1.0")
+# Request-scoped dataloaders batch and memoize by-id lookups within each request
+app = FastAPI(
+    title="GuardTree API",
+    version="1.0",
+    dependencies=[Depends(request_scope)],
+    default_response_class=ORJSONResponse,
+)
 
 # Configure CORS
 app.add_middleware(
@@ -12,14 +26,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cross-origin clients need these to page through listings and revalidate
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Brotli/gzip for responses above COMPRESSION_MINIMUM_SIZE; SSE streams pass through
+app.add_middleware(CompressionMiddleware)
+
 # Include routers
 app.include_router(auth_controller.router)
 app.include_router(user_controller.router)
 app.include_router(llm_controller.router)
 app.include_router(case_controller.router)
 app.include_router(form_controller.router)
+app.include_router(metrics_controller.router)
+app.include_router(analytics_controller.router)
+
+@app.on_event("startup")
+async def load_form_templates():
+    load_templates()
+
+@app.exception_handler(WorkerPoolBusy)
+async def worker_pool_busy_handler(request: Request, exc: WorkerPoolBusy):
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 @app.get("/")
 async def root():
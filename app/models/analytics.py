@@ -0,0 +1,69 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from app.models.form import FormType
+from app.models.llm_analysis_result import ProgressNarrative
+
+
+class ScoreStats(BaseModel):
+    # Forms with a scored (0-4) answer; -1 and unanswered items are left out of the statistics
+    n: int
+    mean: Optional[float]
+    percentiles: Dict[str, Optional[float]]
+    # Count of each support_type ("-1".."4") plus "null" for unanswered
+    distribution: Dict[str, int]
+
+
+class ItemStats(ScoreStats):
+    activity: str
+    item: str
+    subitem: Optional[str]
+    core_area: str
+
+
+class ActivityStats(ScoreStats):
+    activity: str
+    core_area: str
+
+
+class CohortStats(BaseModel):
+    year: int
+    form_type: FormType
+    case_types: List[str]
+    form_count: int
+    template_version: str
+    items: List[ItemStats]
+    activities: List[ActivityStats]
+
+
+class ItemDelta(BaseModel):
+    activity: str
+    item: str
+    subitem: Optional[str]
+    core_area: str
+    before: Optional[int]
+    after: Optional[int]
+    # after - before; a lower support_type means less support is needed
+    delta: Optional[int]
+    trend: str
+
+
+class ActivityDelta(BaseModel):
+    activity: str
+    core_area: str
+    before: Optional[float]
+    after: Optional[float]
+    delta: Optional[float]
+    trend: str
+
+
+class ProgressDiff(BaseModel):
+    case_id: int
+    form_type: FormType
+    from_year: int
+    to_year: int
+    template_version: str
+    # Number of items per trend: improved / regressed / unchanged / not_comparable
+    counts: Dict[str, int]
+    items: List[ItemDelta]
+    activities: List[ActivityDelta]
+    narrative: Optional[ProgressNarrative] = None
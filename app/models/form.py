@@ -26,6 +26,26 @@ class FormRecordCreate(BaseModel):
     form_type: FormType
     content: List[FormItem]
 
+class FormRecordCompactCreate(BaseModel):
+    case_id: int
+    user_id: int
+    year: int
+    form_type: FormType
+    # One support_type per template item, in template order
+    scores: List[Optional[int]]
+    template_version: Optional[str] = None
+
+class FormTemplateItem(BaseModel):
+    activity: str
+    item: str
+    subitem: Optional[str]
+    core_area: str
+
+class FormTemplateResponse(BaseModel):
+    form_type: FormType
+    version: str
+    items: List[FormTemplateItem]
+
 class FormRecord(FormRecordCreate):
     id: int
     created_at: datetime
@@ -38,6 +58,19 @@ class FormRecordResponse(FormRecord):
     case_name: Optional[str] = None
     user_name: Optional[str] = None
 
+class FormBulkRowResult(BaseModel):
+    # Position of the row in the upload (array index or NDJSON line among non-blank lines)
+    index: int
+    status: str  # "created" | "error"
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class FormBulkImportResult(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[FormBulkRowResult]
+
 class FormMetadata(BaseModel):
     id: int
     case_id: int
@@ -12,3 +12,16 @@ class Suggestions(BaseModel):
 class AnalysisResult(BaseModel):
     summary: Summary
     suggestions: Suggestions
+
+class CaseSupportPlan(BaseModel):
+    overall_summary: str
+    strengths: str
+    concerns: str
+    priority_goals: str
+    support_plan: str
+
+class ProgressNarrative(BaseModel):
+    summary: str
+    improvements: str
+    regressions: str
+    recommendations: str
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, model_validator
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+from app.models.form import FormType
+
+class AnalysisTarget(BaseModel):
+    case_id: int
+    year: int
+    form_type: FormType
+
+class AnalysisJobFilter(BaseModel):
+    year: int
+    form_types: Optional[List[FormType]] = None
+    case_ids: Optional[List[int]] = None
+
+class AnalysisJobCreate(BaseModel):
+    targets: Optional[List[AnalysisTarget]] = None
+    filter: Optional[AnalysisJobFilter] = None
+
+    @model_validator(mode="after")
+    def check_targets_or_filter(self):
+        if not self.targets and not self.filter:
+            raise ValueError("Either targets or filter is required")
+        return self
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class AnalysisJobItem(AnalysisTarget):
+    status: JobStatus
+    error: Optional[str] = None
+
+class AnalysisJob(BaseModel):
+    id: str
+    status: JobStatus
+    total: int
+    completed: int
+    failed: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    items: Optional[List[AnalysisJobItem]] = None
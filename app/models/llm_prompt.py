@@ -1,12 +1,12 @@
-class LLMPrompt:
-    @staticmethod
-    def generate_analysis_prompt(form_data: str, form_type: str) -> str:
-        form_activity = LLMPrompt.get_form_activity(form_type)
-        return f"""
+import json
+from typing import Any, Dict, List
+
+
+ANALYSIS_TEMPLATE = """
 你是一個繁體中文專家系統，請根據以下個案表單資料，分析並產出以下格式的 JSON 結果：
 
-其中，activity 代表活動內容，item 代表項目，subitem 代表細項，core_area 代表這份表單所對應代的核心能力領域，
-support type 為教保員評估服務對象在這個項目的分數：4 代表需完全肢體協助；3 代表需部份身體協助； 2 代表需示範/口頭/手勢提示；1 代表須監督陪同；0 代表不須協助；-1 代表不適用（可忽略該細項）。
+表單資料依核心能力領域（【】內）與活動內容分組，其下每一行為「項目／細項=支持類型分數」，沒有細項時省略細項。
+支持類型分數為教保員評估服務對象在這個項目的分數：4 代表需完全肢體協助；3 代表需部份身體協助； 2 代表需示範/口頭/手勢提示；1 代表須監督陪同；0 代表不須協助；-1 代表不適用（可忽略該細項）；? 代表未填寫。
 
 請輸出以下 JSON 格式：
 {{
@@ -28,7 +28,152 @@ support type 為教保員評估服務對象在這個項目的分數：4 代表
 - 請仔細閱讀表單內容，並僅根據表單中的資訊，提出實用建議，避免任何推測與與表單無關的建議。若資料不足，請說明原因，勿自行臆測。
 
 表單資料：
-{form_data}
+"""
+
+
+class LLMPrompt:
+    # Form type -> prompt prefix with the activity list already rendered in
+    _templates: Dict[str, str] = {}
+
+    @staticmethod
+    def generate_analysis_prompt(form_data: Any, form_type: str) -> str:
+        return LLMPrompt.template_for(form_type) + LLMPrompt.encode_form_content(form_data) + "\n"
+
+    @staticmethod
+    def template_for(form_type: str) -> str:
+        """The fixed part of the analysis prompt for `form_type`, rendered once and reused"""
+        template = LLMPrompt._templates.get(form_type)
+        if template is None:
+            template = ANALYSIS_TEMPLATE.format(form_activity=LLMPrompt.get_form_activity(form_type))
+            LLMPrompt._templates[form_type] = template
+        return template
+
+    @staticmethod
+    def encode_form_content(content: Any) -> str:
+        """
+        Serialise form items as a dense table grouped by core area and activity,
+        instead of repeating every key and the activity on each item.
+        """
+        if not isinstance(content, list):
+            return str(content)
+
+        lines: List[str] = []
+        core_area = activity = None
+        for item in content:
+            if hasattr(item, "dict"):
+                item = item.dict()
+            if item.get("core_area") != core_area:
+                core_area = item.get("core_area")
+                lines.append(f"【{core_area}】")
+                activity = None
+            if item.get("activity") != activity:
+                activity = item.get("activity")
+                lines.append(activity)
+            label = item.get("item")
+            if item.get("subitem"):
+                label = f"{label}／{item['subitem']}"
+            support_type = item.get("support_type")
+            lines.append(f" {label}={'?' if support_type is None else support_type}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def generate_reanalysis_prompt(
+        previous: Dict[str, Any],
+        changed_content: List[Any],
+        removed_activities: List[str],
+        form_type: str
+    ) -> str:
+        removed = "、".join(removed_activities) if removed_activities else "無"
+        return f"""
+你是一個繁體中文專家系統。以下是服務對象一份表單先前的分析結果（JSON），之後教保員更新了部分活動的評估分數。
+請僅修訂與下列「已更新的活動」相關的摘要、優勢、困難、優先項目與策略建議內容，其餘與這些活動無關的內容請逐字保留，
+並以與先前分析結果完全相同的 JSON 格式回傳完整的分析結果。策略建議請維持**依據{LLMPrompt.get_form_activity(form_type)}列點敘述**。
+
+表單資料依核心能力領域（【】內）與活動內容分組，其下每一行為「項目／細項=支持類型分數」，沒有細項時省略細項。
+支持類型分數：4 代表需完全肢體協助；3 代表需部份身體協助； 2 代表需示範/口頭/手勢提示；1 代表須監督陪同；0 代表不須協助；-1 代表不適用（可忽略該細項）；? 代表未填寫。
+
+注意：
+- 請完整回傳 JSON 格式
+- 不要遺漏任何欄位
+- 字串內禁止換行
+- 僅根據表單中的資訊修訂，避免任何推測。
+
+先前分析結果：
+{json.dumps(previous, ensure_ascii=False)}
+
+已更新的活動：
+{LLMPrompt.encode_form_content(changed_content)}
+
+已移除的活動：{removed}
+"""
+
+    @staticmethod
+    def generate_progress_prompt(diff: Dict[str, Any]) -> str:
+        """Prompt built from the year-over-year diff only, never the full forms"""
+        changed = [
+            f"{item['activity']}｜{item['item']}{'／' + item['subitem'] if item['subitem'] else ''}："
+            f"{item['before']}→{item['after']}"
+            for item in diff["items"]
+            if item["trend"] in ("improved", "regressed")
+        ]
+        activities = [
+            f"{activity['activity']}：{activity['before']}→{activity['after']}"
+            for activity in diff["activities"]
+            if activity["trend"] in ("improved", "regressed")
+        ]
+        return f"""
+你是一個繁體中文專家系統。以下是服務對象 {diff['from_year']} 年與 {diff['to_year']} 年同一份支持需求評估表單（{diff['form_type']}）之間有變化的項目。
+分數為支持類型：4 代表需完全肢體協助；3 代表需部份身體協助； 2 代表需示範/口頭/手勢提示；1 代表須監督陪同；0 代表不須協助。分數下降代表進步，上升代表退步。
+
+請輸出以下 JSON 格式：
+{{
+"summary": "請條列說明服務對象這一年來整體的進步與退步情形。",
+"improvements": "請找出進步最明顯的活動與項目。",
+"regressions": "請找出退步、需要關注的活動與項目，並推測可能需要確認的原因。",
+"recommendations": "請依據上述變化，提出下一年度支持策略的調整建議。"
+}}
+
+注意：
+- 請完整回傳 JSON 格式
+- 不要遺漏任何欄位
+- 字串內禁止換行
+- 僅根據下列變化提出建議，避免任何推測。
+
+項目數量：進步 {diff['counts']['improved']}、退步 {diff['counts']['regressed']}、不變 {diff['counts']['unchanged']}
+
+活動平均分數變化：
+{chr(10).join(activities) or "無"}
+
+項目分數變化：
+{chr(10).join(changed) or "無"}
+"""
+
+    @staticmethod
+    def generate_synthesis_prompt(analyses: Dict[str, Dict[str, Any]]) -> str:
+        form_summaries = "\n".join(
+            f"[{form_type}] {json.dumps(analysis, ensure_ascii=False)}"
+            for form_type, analysis in sorted(analyses.items())
+        )
+        return f"""
+你是一個繁體中文專家系統，以下是同一位服務對象在同一年度各份支持需求評估表單（A–G）的個別分析結果，
+每份表單對應一個核心能力領域。請綜合所有領域，找出跨領域的共同模式，產出整體支持計畫，並輸出以下格式的 JSON 結果：
+
+{{
+"overall_summary": "請綜合各領域分析，條列說明服務對象整體的支持需求狀況。",
+"strengths": "請找出跨領域共同呈現的優勢。",
+"concerns": "請找出跨領域共同呈現、需要關注的困難。",
+"priority_goals": "請依據各領域的優先項目，排序出整體最急迫的支持目標，並說明原因。",
+"support_plan": "請依據上述優先目標，列點敘述具體、可跨領域執行的支持策略。"
+}}
+
+注意：
+- 請完整回傳 JSON 格式
+- 不要遺漏任何欄位
+- 字串內禁止換行
+- 僅根據下列各表單分析結果提出建議，避免任何推測。
+
+各表單分析結果：
+{form_summaries}
 """
     @staticmethod
     def get_form_activity(form_type: str) -> str:
@@ -1,34 +1,84 @@
+import os
 from typing import List, Dict, Any, Optional
 import bcrypt
 from app.core.supabase_client import SupabaseService
+from app.core.cache_backend import create_cache_backend
 
 from app.models.case import Case, CaseCreate, CaseUpdate
 
 
+# Cases are read on nearly every request and rarely written; see CACHE_BACKEND for multi-worker setups
+case_cache = create_cache_backend(
+    "cases",
+    max_size=int(os.getenv("CASE_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CASE_CACHE_TTL_SECONDS", "300"))
+)
+ALL_CASES_KEY = "all"
+
+
 class CaseRepository:
     TABLE_NAME = "cases"
     
     @staticmethod
     async def get_all_cases() -> List[Case]:
-        """Get all cases from the database"""
-        return await SupabaseService.get_all(CaseRepository.TABLE_NAME)
+        """Get all cases, from the case cache when possible"""
+        cases = await case_cache.get(ALL_CASES_KEY)
+        if cases is None:
+            cases = await SupabaseService.get_all(CaseRepository.TABLE_NAME)
+            await case_cache.set(ALL_CASES_KEY, cases)
+        return cases
     
     @staticmethod
     async def get_case_by_id(case_id: int) -> Optional[Case]:
-        """Get a specific case by ID"""
-        return await SupabaseService.get_by_id(CaseRepository.TABLE_NAME, case_id)
+        """Get a specific case by ID, from the case cache when possible"""
+        case = await case_cache.get(f"id:{case_id}")
+        if case is None:
+            case = await SupabaseService.get_by_id(CaseRepository.TABLE_NAME, case_id)
+            # Misses are not cached so a newly created case shows up at once
+            if case is not None:
+                await case_cache.set(f"id:{case_id}", case)
+        return case
+    
+    @staticmethod
+    async def get_cases_by_ids(case_ids: List[int], columns: str = "*") -> List[Case]:
+        """Get all cases whose ID is in `case_ids` in a single query"""
+        return await SupabaseService.get_by_ids(CaseRepository.TABLE_NAME, case_ids, columns)
+    
+    @staticmethod
+    async def get_case_ids_by_types(types: List[str], page_size: int = 1000) -> List[int]:
+        """Get the ID of every case tagged with any of `types`, paging through by ID"""
+        case_ids = []
+        after_id = None
+        while True:
+            page = await SupabaseService.get_page(
+                CaseRepository.TABLE_NAME,
+                columns="id",
+                after_id=after_id,
+                limit=page_size,
+                overlap_filters={"types": types}
+            )
+            case_ids.extend(row["id"] for row in page)
+            if len(page) < page_size:
+                return case_ids
+            after_id = page[-1]["id"]
     
     @staticmethod
     async def create_case(case_data: CaseCreate) -> Case:
         """Create a new case"""
-        return await SupabaseService.create(CaseRepository.TABLE_NAME, case_data)
+        created = await SupabaseService.create(CaseRepository.TABLE_NAME, case_data)
+        await case_cache.delete(ALL_CASES_KEY)
+        return created
     
     @staticmethod
     async def update_case(case_id: int, case_data: CaseUpdate) -> Case:
         """Update case information"""
-        return await SupabaseService.update(CaseRepository.TABLE_NAME, case_id, case_data)
+        updated = await SupabaseService.update(CaseRepository.TABLE_NAME, case_id, case_data)
+        await case_cache.delete(f"id:{case_id}", ALL_CASES_KEY)
+        return updated
     
     @staticmethod
     async def delete_case(case_id: int) -> bool:
         """Delete a case"""
-        return await SupabaseService.delete(CaseRepository.TABLE_NAME, case_id)
+        deleted = await SupabaseService.delete(CaseRepository.TABLE_NAME, case_id)
+        await case_cache.delete(f"id:{case_id}", ALL_CASES_KEY)
+        return deleted
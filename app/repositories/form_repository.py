@@ -1,23 +1,65 @@
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Optional
 from app.core.supabase_client import SupabaseService
+from app.core.form_templates import get_template, get_template_version, pack_scores, unpack_scores
 
 class FormRepository:
     TABLE_NAME = "forms"
-    
+    # Columns backing FormMetadata; listings never pull the large `content` JSON
+    METADATA_COLUMNS = "id,case_id,user_id,year,form_type,created_at,updated_at"
+    # "packed" stores template_version + packed scores instead of the FormItem list;
+    # needs the columns from migrations/004_packed_form_scores.sql
+    PACKED_STORAGE = os.getenv("FORM_STORAGE_MODE", "full").lower() == "packed"
+    CONTENT_COLUMNS = "content,template_version,scores" if PACKED_STORAGE else "content"
+
     @staticmethod
-    async def get_all() -> List[Dict[str, Any]]:
-        """Get all form entries from the database"""
-        return await SupabaseService.get_all(FormRepository.TABLE_NAME)
-   
+    def pack(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Swap `content` for template_version + packed scores when it matches the current template"""
+        if not FormRepository.PACKED_STORAGE or not data.get("content"):
+            return data
+        form_type = getattr(data["form_type"], "value", data["form_type"])
+        template = get_template(form_type)
+        try:
+            scores = template.compact(data["content"])
+        except ValueError:
+            # Content that does not follow the template is stored as is
+            return data
+        return dict(data, content=None, template_version=template.version, scores=pack_scores(scores))
+
+    @staticmethod
+    def expand(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Rebuild `content` on read for a row stored packed"""
+        if row and row.get("content") is None and row.get("scores"):
+            template = get_template_version(row["template_version"])
+            row["content"] = template.expand(unpack_scores(row["scores"]))
+        return row
+    
     @staticmethod
     async def get_by_id(row_id: int):
         """Get a specific form entry by ID"""
-        return await SupabaseService.get_by_id(FormRepository.TABLE_NAME, row_id)
+        return FormRepository.expand(await SupabaseService.get_by_id(FormRepository.TABLE_NAME, row_id))
+
+    @staticmethod
+    async def get_metadata(row_id: int) -> Optional[Dict[str, Any]]:
+        """Get a form entry's metadata (no content) by ID"""
+        rows = await SupabaseService.query(
+            FormRepository.TABLE_NAME, filters={"id": row_id}, columns=FormRepository.METADATA_COLUMNS
+        )
+        return rows[0] if rows else None
 
     @staticmethod
     async def create(data: dict):
         """Create a new form entry"""
-        return await SupabaseService.create(FormRepository.TABLE_NAME, data)
+        created = await SupabaseService.create(FormRepository.TABLE_NAME, FormRepository.pack(data))
+        return FormRepository.expand(created)
+
+    @staticmethod
+    async def create_many(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several form entries with one multi-row insert"""
+        created = await SupabaseService.create_many(
+            FormRepository.TABLE_NAME, [FormRepository.pack(row) for row in rows]
+        )
+        return [FormRepository.expand(row) for row in created]
 
     @staticmethod
     async def delete(row_id: int):
@@ -25,6 +67,89 @@ class FormRepository:
         return await SupabaseService.delete(FormRepository.TABLE_NAME, row_id)
 
     @staticmethod
-    async def get_by_case_id(case_id: int):
-        """Get all form entries by case_id"""
-        return await SupabaseService.get_by_filter(FormRepository.TABLE_NAME, {"case_id": case_id})
+    async def get_metadata_page(
+        case_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Get one page of form metadata (no content), optionally for a single case"""
+        filters = {"case_id": case_id} if case_id is not None else None
+        return await SupabaseService.get_page(
+            FormRepository.TABLE_NAME,
+            columns=FormRepository.METADATA_COLUMNS,
+            filters=filters,
+            after_id=after_id,
+            limit=limit
+        )
+
+    @staticmethod
+    async def get_form_keys(
+        year: int,
+        form_types: Optional[List[str]] = None,
+        case_ids: Optional[List[int]] = None,
+        page_size: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Get (case_id, year, form_type) of every form matching the filter, paging through by ID"""
+        in_filters = {}
+        if form_types:
+            in_filters["form_type"] = form_types
+        if case_ids:
+            in_filters["case_id"] = case_ids
+
+        keys = []
+        after_id = None
+        while True:
+            page = await SupabaseService.get_page(
+                FormRepository.TABLE_NAME,
+                columns="id,case_id,year,form_type",
+                filters={"year": year},
+                after_id=after_id,
+                limit=page_size,
+                in_filters=in_filters or None
+            )
+            keys.extend(page)
+            if len(page) < page_size:
+                return keys
+            after_id = page[-1]["id"]
+
+    @staticmethod
+    async def get_score_rows(year: int, form_type: str, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Get id, case_id and stored scores/content of every form of one type and year"""
+        rows = []
+        after_id = None
+        while True:
+            page = await SupabaseService.get_page(
+                FormRepository.TABLE_NAME,
+                columns=f"id,case_id,{FormRepository.CONTENT_COLUMNS}",
+                filters={"year": year, "form_type": form_type},
+                after_id=after_id,
+                limit=page_size
+            )
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            after_id = page[-1]["id"]
+
+    @staticmethod
+    def score_vector(row: Dict[str, Any], template) -> Optional[List[Optional[int]]]:
+        """
+        A row's support types aligned to `template`, read straight from packed
+        storage when possible; None for content that does not follow the template.
+        """
+        if row.get("content") is None and row.get("template_version") == template.version:
+            return unpack_scores(row["scores"])
+        try:
+            return template.compact(FormRepository.expand(row)["content"] or [])
+        except ValueError:
+            return None
+
+    @staticmethod
+    async def get_case_score_rows(case_id: int, form_type: str, years: List[int]) -> List[Dict[str, Any]]:
+        """Get year and stored scores/content of a case's forms of one type for `years`, in one query"""
+        return await SupabaseService.get_page(
+            FormRepository.TABLE_NAME,
+            columns=f"id,year,{FormRepository.CONTENT_COLUMNS}",
+            filters={"case_id": case_id, "form_type": form_type},
+            in_filters={"year": years},
+            limit=len(years) * 10
+        )
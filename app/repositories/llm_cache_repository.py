@@ -0,0 +1,50 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from app.core.supabase_client import SupabaseService
+
+
+class LLMCacheRepository:
+    TABLE_NAME = "LLMResultCache"
+
+    @staticmethod
+    async def get_result(prompt_hash: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result row (result + created_at) by prompt hash"""
+        rows = await SupabaseService.query(
+            LLMCacheRepository.TABLE_NAME,
+            filters={"prompt_hash": prompt_hash},
+            limit=1
+        )
+        return rows[0] if rows else None
+
+    @staticmethod
+    async def save_result(prompt_hash: str, model: str, result: Dict[str, Any]):
+        """Store a result under its prompt hash, replacing any older entry"""
+        data = {
+            "prompt_hash": prompt_hash,
+            "model": model,
+            "result": result,
+            "created_at": datetime.now().isoformat()
+        }
+        return await SupabaseService.upsert(LLMCacheRepository.TABLE_NAME, data, on_conflict="prompt_hash")
+
+    @staticmethod
+    async def delete_before(cutoff: datetime) -> int:
+        """Delete every cached result created before `cutoff`"""
+        return await SupabaseService.delete_older_than(
+            LLMCacheRepository.TABLE_NAME,
+            "created_at",
+            cutoff.isoformat()
+        )
+
+    @staticmethod
+    async def newest_created_at(rank: int) -> Optional[str]:
+        """created_at of the `rank`-th newest cached result (1 = newest), or None if there are fewer"""
+        rows = await SupabaseService.query(
+            LLMCacheRepository.TABLE_NAME,
+            order_by="created_at",
+            descending=True,
+            offset=rank - 1,
+            limit=1,
+            columns="created_at"
+        )
+        return rows[0]["created_at"] if rows else None
@@ -1,39 +1,103 @@
-from typing import Optional
+import os
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from app.core.supabase_client import SupabaseService
+from app.repositories.form_repository import FormRepository
 from app.models.llm_analysis_result import AnalysisResult
 
 class LLMRepository:
     FILLED_TABLE = "forms"
     ANALYSIS_TABLE = "LifeSupportFormAnalysis"
+    # Needs the unique index from migrations/001_unique_analysis_per_form.sql;
+    # keeps multiple uvicorn workers from inserting duplicate analyses for one form
+    UPSERT_ANALYSIS = os.getenv("LLM_ANALYSIS_UPSERT", "false").lower() == "true"
+    # Needs the activity_digests column from migrations/003_analysis_activity_digests.sql
+    INCREMENTAL_ANALYSIS = os.getenv("LLM_INCREMENTAL_ANALYSIS", "false").lower() == "true"
 
     @staticmethod
-    async def get_question_value(case_id: str, year: int, form_type: str):
-        filters = {
-            "case_id": case_id,
-            "year": year,
-            "form_type": form_type
-        }
-        return await SupabaseService.query_field_by_conditions(
+    def analysis_columns() -> str:
+        columns = "summary,suggestions"
+        if LLMRepository.INCREMENTAL_ANALYSIS:
+            columns += ",activity_digests"
+        return columns
+
+    @staticmethod
+    async def get_form_with_analysis(case_id: int, year: int, form_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a form's id and content together with its stored analysis in one query.
+
+        Returns {"id", "content", "analysis", "digests"} where analysis is an AnalysisResult
+        or None and digests are the per-activity digests it was generated from (None unless
+        incremental analysis is enabled), or None when the form does not exist.
+        """
+        rows = await SupabaseService.query(
             LLMRepository.FILLED_TABLE,
-            filters,
-            "content"
+            filters={
+                "case_id": case_id,
+                "year": year,
+                "form_type": form_type
+            },
+            limit=1,
+            columns=f"id,{FormRepository.CONTENT_COLUMNS},{LLMRepository.ANALYSIS_TABLE}({LLMRepository.analysis_columns()})"
         )
-    
-    async def get_form_id(case_id: str, year: int, form_type: str):
-        filters = {
-            "case_id": case_id,
-            "year": year,
-            "form_type": form_type
+        if not rows:
+            return None
+        row = FormRepository.expand(rows[0])
+        return {
+            "id": row["id"],
+            "content": row.get("content"),
+            "analysis": LLMRepository._embedded_analysis(row.get(LLMRepository.ANALYSIS_TABLE)),
+            "digests": LLMRepository._embedded_digests(row.get(LLMRepository.ANALYSIS_TABLE))
         }
-        return await SupabaseService.query_field_by_conditions(
+
+    @staticmethod
+    async def get_case_forms_with_analysis(case_id: int, year: int) -> List[Dict[str, Any]]:
+        """Fetch every form of a case-year with its stored analysis in one query"""
+        rows = await SupabaseService.query(
             LLMRepository.FILLED_TABLE,
-            filters,
-            "id"
+            filters={
+                "case_id": case_id,
+                "year": year
+            },
+            order_by="form_type",
+            columns=f"id,form_type,{FormRepository.CONTENT_COLUMNS},{LLMRepository.ANALYSIS_TABLE}({LLMRepository.analysis_columns()})"
         )
+        return [
+            {
+                "id": row["id"],
+                "form_type": row["form_type"],
+                "content": row.get("content"),
+                "analysis": LLMRepository._embedded_analysis(row.get(LLMRepository.ANALYSIS_TABLE)),
+                "digests": LLMRepository._embedded_digests(row.get(LLMRepository.ANALYSIS_TABLE))
+            }
+            for row in map(FormRepository.expand, rows)
+        ]
+
+    @staticmethod
+    def _embedded_analysis(embedded: Any) -> Optional[AnalysisResult]:
+        # PostgREST embeds a list for one-to-many and an object once filled_form_id is unique
+        if isinstance(embedded, list):
+            embedded = embedded[0] if embedded else None
+        if not embedded or not embedded.get("summary"):
+            return None
+        return AnalysisResult(summary=embedded["summary"], suggestions=embedded["suggestions"])
+
+    @staticmethod
+    def _embedded_digests(embedded: Any) -> Optional[Dict[str, str]]:
+        if isinstance(embedded, list):
+            embedded = embedded[0] if embedded else None
+        if not embedded:
+            return None
+        return embedded.get("activity_digests")
 
     @staticmethod
-    async def save_analysis_result(filled_form_id: int, suggestions: dict, summary: dict, form_type: str):
+    async def save_analysis_result(
+        filled_form_id: int,
+        suggestions: dict,
+        summary: dict,
+        form_type: str,
+        activity_digests: Optional[Dict[str, str]] = None
+    ):
         data = {
             "filled_form_id": filled_form_id,
             "created_at": datetime.now().isoformat(),
@@ -41,27 +105,26 @@ class LLMRepository:
             "summary": summary,
             "form_type": form_type
         }
+        if LLMRepository.INCREMENTAL_ANALYSIS and activity_digests is not None:
+            data["activity_digests"] = activity_digests
+        if LLMRepository.UPSERT_ANALYSIS:
+            return await SupabaseService.upsert(LLMRepository.ANALYSIS_TABLE, data, on_conflict="filled_form_id")
         return await SupabaseService.create(LLMRepository.ANALYSIS_TABLE, data)
 
     @staticmethod
-    async def get_analysis_result(filled_form_id: int) -> Optional[AnalysisResult]:
-        filters = {
-            "filled_form_id": filled_form_id,
-        }
-        summary_result = await SupabaseService.query_field_by_conditions(
+    async def update_analysis_result(
+        filled_form_id: int,
+        suggestions: dict,
+        summary: dict,
+        activity_digests: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        """Overwrite the stored analysis of a form after an incremental re-analysis"""
+        return await SupabaseService.update_where(
             LLMRepository.ANALYSIS_TABLE,
-            filters,
-            "summary"
-        )
-        suggestions_result = await SupabaseService.query_field_by_conditions(
-            LLMRepository.ANALYSIS_TABLE,
-            filters,
-            "suggestions"
-        )
-        if not summary_result:
-            return None
-
-        return AnalysisResult(
-            summary=summary_result,
-            suggestions=suggestions_result
+            {"filled_form_id": filled_form_id},
+            {
+                "suggestions": suggestions,
+                "summary": summary,
+                "activity_digests": activity_digests
+            }
         )
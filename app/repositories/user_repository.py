@@ -1,6 +1,7 @@
 from typing import List, Dict, Optional, TypedDict
 import bcrypt
 from app.core.supabase_client import SupabaseService
+from app.core.worker_pool import password_pool
 
 
 class UserDict(TypedDict):
@@ -27,6 +28,11 @@ class UserRepository:
         """Get a specific user by ID"""
         return await SupabaseService.get_by_id(UserRepository.TABLE_NAME, user_id)
     
+    @staticmethod
+    async def get_users_by_ids(user_ids: List[int], columns: str = "*") -> List[UserDict]:
+        """Get all users whose ID is in `user_ids` in a single query"""
+        return await SupabaseService.get_by_ids(UserRepository.TABLE_NAME, user_ids, columns)
+    
     @staticmethod
     async def get_user_by_email(email: str) -> Optional[UserDict]:
         """Get a user by email"""
@@ -40,7 +46,7 @@ class UserRepository:
     async def create_user(user_data: Dict) -> UserDict:
         """Create a new user"""
         # Hash the password before storing
-        user_data["password"] = UserRepository._hash_password(user_data["password"])
+        user_data["password"] = await UserRepository.hash_password_async(user_data["password"])
         # Ensure activate is boolean with default True
         if "activate" not in user_data:
             user_data["activate"] = True
@@ -56,7 +62,7 @@ class UserRepository:
         
         # If password is included in update, hash it
         if "password" in update_data:
-            update_data["password"] = UserRepository._hash_password(update_data["password"])
+            update_data["password"] = await UserRepository.hash_password_async(update_data["password"])
         
         # Ensure activate is boolean if provided
         if "activate" in update_data and not isinstance(update_data["activate"], bool):
@@ -71,7 +77,7 @@ class UserRepository:
     @staticmethod
     async def update_password(user_id: int, new_password: str) -> UserDict:
         """Update user password"""
-        hashed_password = UserRepository._hash_password(new_password)
+        hashed_password = await UserRepository.hash_password_async(new_password)
         return await SupabaseService.update(
             UserRepository.TABLE_NAME, 
             user_id, 
@@ -97,4 +103,14 @@ class UserRepository:
         return bcrypt.checkpw(
             plain_password.encode('utf-8'),
             hashed_password.encode('utf-8')
-        )
\ No newline at end of file
+        )
+    
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        """Hash a password on the password worker pool instead of the event loop"""
+        return await password_pool.run(UserRepository._hash_password, password)
+    
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the password worker pool instead of the event loop"""
+        return await password_pool.run(UserRepository.verify_password, plain_password, hashed_password)
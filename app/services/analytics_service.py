@@ -0,0 +1,216 @@
+import asyncio
+import os
+import warnings
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.core.cache import TTLCache
+from app.core.form_templates import FormTemplate, get_template
+from app.repositories.case_repository import CaseRepository
+from app.repositories.form_repository import FormRepository
+from app.services.llm_service import LLMService
+
+PERCENTILES = (25, 50, 75, 90)
+SUPPORT_VALUES = (-1, 0, 1, 2, 3, 4)
+TRENDS = ("improved", "regressed", "unchanged", "not_comparable")
+
+# Cleared on every form write; the TTL bounds staleness across uvicorn workers
+cohort_cache = TTLCache(
+    "cohort_stats",
+    max_size=int(os.getenv("ANALYTICS_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "600"))
+)
+
+
+class AnalyticsService:
+    @staticmethod
+    async def cohort_stats(year: int, form_type: str, case_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Per-item and per-activity support_type statistics over every matching form"""
+        case_types = sorted(set(case_types or []))
+        key = (year, form_type, tuple(case_types))
+        cached = cohort_cache.get(key)
+        if cached is not None:
+            return cached
+
+        template = get_template(form_type)
+        rows = await FormRepository.get_score_rows(year, form_type)
+        if case_types and rows:
+            case_ids = set(await CaseRepository.get_case_ids_by_types(case_types))
+            rows = [row for row in rows if row["case_id"] in case_ids]
+        # Decoding and the NumPy pass scale with the cohort; keep them off the event loop
+        stats = await asyncio.to_thread(AnalyticsService._cohort_stats_of, template, rows)
+        stats.update(year=year, form_type=form_type, case_types=case_types)
+        cohort_cache.set(key, stats)
+        return stats
+
+    @staticmethod
+    async def progress(case_id: int, form_type: str, from_year: int, to_year: int, narrative: bool = False) -> Dict[str, Any]:
+        """Per-item and per-activity change of a case's form between two years"""
+        template = get_template(form_type)
+        rows = await FormRepository.get_case_score_rows(case_id, form_type, [from_year, to_year])
+        vectors = {row["year"]: FormRepository.score_vector(row, template) for row in rows}
+        for year in (from_year, to_year):
+            if vectors.get(year) is None:
+                raise HTTPException(status_code=404, detail=f"Form {form_type} for {year} not found")
+
+        diff = await asyncio.to_thread(AnalyticsService.compute_diff, template, vectors[from_year], vectors[to_year])
+        diff.update(case_id=case_id, form_type=form_type, from_year=from_year, to_year=to_year)
+        if narrative:
+            diff["narrative"] = await LLMService.narrate_progress(diff)
+        return diff
+
+    @staticmethod
+    def _cohort_stats_of(template: FormTemplate, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        vectors = [v for v in (FormRepository.score_vector(row, template) for row in rows) if v is not None]
+        return AnalyticsService.compute_stats(template, vectors)
+
+    @staticmethod
+    def compute_diff(template: FormTemplate, before: List[Optional[int]], after: List[Optional[int]]) -> Dict[str, Any]:
+        """
+        Vectorised deltas between two score vectors aligned to `template`.
+        Items are comparable only when scored (0-4) in both years.
+        """
+        scores = np.array(
+            [[np.nan if score is None or score < 0 else score for score in vector] for vector in (before, after)],
+            dtype=float
+        )
+        item_delta = scores[1] - scores[0]
+
+        activities, membership = AnalyticsService._membership(template)
+        answered = ~np.isnan(scores)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            activity_scores = (np.nan_to_num(scores) @ membership) / (answered @ membership)
+        # Compare activities over the items scored in both years only
+        both = answered.all(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            activity_delta = (np.nan_to_num(item_delta) @ membership) / (both @ membership)
+
+        item_trends = AnalyticsService._trends(item_delta)
+        core_areas = {item["activity"]: item["core_area"] for item in template.items}
+        counts = {trend: 0 for trend in TRENDS}
+        for trend in item_trends:
+            counts[trend] += 1
+
+        return {
+            "template_version": template.version,
+            "counts": counts,
+            "items": [
+                dict(
+                    item,
+                    before=before[position],
+                    after=after[position],
+                    delta=None if np.isnan(item_delta[position]) else int(item_delta[position]),
+                    trend=item_trends[position]
+                )
+                for position, item in enumerate(template.items)
+            ],
+            "activities": [
+                dict(
+                    activity=activity,
+                    core_area=core_areas[activity],
+                    before=AnalyticsService._rounded(activity_scores[0, column]),
+                    after=AnalyticsService._rounded(activity_scores[1, column]),
+                    delta=AnalyticsService._rounded(activity_delta[column]),
+                    trend=trend
+                )
+                for column, (activity, trend) in enumerate(zip(activities, AnalyticsService._trends(activity_delta)))
+            ]
+        }
+
+    @staticmethod
+    def _trends(deltas: np.ndarray) -> List[str]:
+        # A lower support_type means less support is needed
+        trends = np.select([np.isnan(deltas), deltas < 0, deltas > 0], ["not_comparable", "improved", "regressed"], "unchanged")
+        return trends.tolist()
+
+    @staticmethod
+    def _membership(template: FormTemplate):
+        """Activities in template order and the items x activities 0/1 matrix"""
+        activities = list(dict.fromkeys(item["activity"] for item in template.items))
+        membership = np.zeros((len(template), len(activities)))
+        for position, item in enumerate(template.items):
+            membership[position, activities.index(item["activity"])] = 1
+        return activities, membership
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop every cached cohort; called after forms are created or deleted"""
+        cohort_cache.clear()
+
+    @staticmethod
+    def compute_stats(template: FormTemplate, vectors: List[List[Optional[int]]]) -> Dict[str, Any]:
+        """
+        One batched NumPy pass over a forms x items score matrix.
+        Activity statistics are over each form's mean score within the activity.
+        """
+        raw = np.array(
+            [[np.nan if score is None else score for score in vector] for vector in vectors],
+            dtype=float
+        ).reshape(len(vectors), len(template))
+        scored = np.where(raw >= 0, raw, np.nan)
+
+        activities, membership = AnalyticsService._membership(template)
+
+        item_counts = {str(v): (raw == v).sum(axis=0) for v in SUPPORT_VALUES}
+        item_counts["null"] = np.isnan(raw).sum(axis=0)
+        answered = ~np.isnan(scored)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            activity_scores = (np.nan_to_num(scored) @ membership) / (answered @ membership)
+
+        item_summary = AnalyticsService._summarize(scored)
+        activity_summary = AnalyticsService._summarize(activity_scores)
+        core_areas = {item["activity"]: item["core_area"] for item in template.items}
+
+        return {
+            "form_count": len(vectors),
+            "template_version": template.version,
+            "items": [
+                dict(
+                    item,
+                    **item_summary[position],
+                    distribution={value: int(counts[position]) for value, counts in item_counts.items()}
+                )
+                for position, item in enumerate(template.items)
+            ],
+            "activities": [
+                dict(
+                    activity=activity,
+                    core_area=core_areas[activity],
+                    **activity_summary[column],
+                    distribution={
+                        value: int(counts @ membership[:, column]) for value, counts in item_counts.items()
+                    }
+                )
+                for column, activity in enumerate(activities)
+            ]
+        }
+
+    @staticmethod
+    def _summarize(matrix: np.ndarray) -> List[Dict[str, Any]]:
+        """n, mean and percentiles of every column, ignoring NaN"""
+        with warnings.catch_warnings():
+            # All-NaN columns (nothing scored) are expected and reported as null
+            warnings.simplefilter("ignore", RuntimeWarning)
+            counts = (~np.isnan(matrix)).sum(axis=0)
+            means = np.nanmean(matrix, axis=0) if len(matrix) else np.full(matrix.shape[1], np.nan)
+            percentiles = (
+                np.nanpercentile(matrix, PERCENTILES, axis=0) if len(matrix)
+                else np.full((len(PERCENTILES), matrix.shape[1]), np.nan)
+            )
+        return [
+            {
+                "n": int(counts[column]),
+                "mean": AnalyticsService._rounded(means[column]),
+                "percentiles": {
+                    f"p{p}": AnalyticsService._rounded(percentiles[row, column])
+                    for row, p in enumerate(PERCENTILES)
+                }
+            }
+            for column in range(matrix.shape[1])
+        ]
+
+    @staticmethod
+    def _rounded(value: float) -> Optional[float]:
+        return None if np.isnan(value) else round(float(value), 3)
@@ -1,21 +1,28 @@
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import orjson
 from fastapi import HTTPException
+from pydantic import ValidationError
+from app.models.form import FormRecordCreate
 from app.repositories.case_repository import CaseRepository
 from app.repositories.user_repository import UserRepository
 from app.repositories.form_repository import FormRepository
+from app.core.form_templates import get_template
+from app.services.analytics_service import AnalyticsService
+
+FORM_PAGE_SIZE = 100
+MAX_FORM_PAGE_SIZE = 1000
+# Rows per multi-row insert of a bulk import, and the most rows one upload may carry
+BULK_CHUNK_SIZE = int(os.getenv("FORM_BULK_CHUNK_SIZE", "500"))
+MAX_BULK_ROWS = int(os.getenv("FORM_BULK_MAX_ROWS", "20000"))
 
 class FormService:
     @staticmethod
-    async def get_all():
-        records = await FormRepository.get_all()
-        for r in records:
-            for k in list(r.keys()):
-                if k not in ["id", "case_id", "user_id", "year", "form_type", "created_at", "updated_at"]:
-                    r.pop(k, None)
-            case = await CaseRepository.get_case_by_id(r["case_id"])
-            user = await UserRepository.get_user_by_id(r["user_id"])
-            r["case_name"] = case["name"] if case else None
-            r["user_name"] = user["name"] if user else None
-        return records
+    async def get_all(after_id=None, limit=FORM_PAGE_SIZE):
+        records = await FormRepository.get_metadata_page(after_id=after_id, limit=limit)
+        return await FormService.attach_names(records)
 
     @staticmethod
     async def get_by_id(form_id):
@@ -29,6 +36,21 @@ class FormService:
         record["user_name"] = user["name"] if user else None
         return record
 
+    @staticmethod
+    async def get_version(form_id):
+        """
+        The form's metadata with case/user names: everything a client-visible change
+        touches, without loading the content. Serves as the form's ETag validator.
+        """
+        record = await FormRepository.get_metadata(form_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Form not found")
+        case = await CaseRepository.get_case_by_id(record["case_id"])
+        user = await UserRepository.get_user_by_id(record["user_id"])
+        record["case_name"] = case["name"] if case else None
+        record["user_name"] = user["name"] if user else None
+        return record
+
     @staticmethod
     async def create(data):
         case_id = data["case_id"]
@@ -40,7 +62,178 @@ class FormService:
         if not user:
             raise HTTPException(status_code=400, detail="user_id not found")
         create_data = {k: data[k] for k in ["case_id", "user_id", "year", "form_type", "content"] if k in data}
-        return await FormRepository.create(create_data)
+        created = await FormRepository.create(create_data)
+        AnalyticsService.invalidate()
+        return created
+
+    @staticmethod
+    async def create_compact(data):
+        """Create a form submitted as a score vector aligned to the form type's template"""
+        template = get_template(getattr(data["form_type"], "value", data["form_type"]))
+        if data.get("template_version") and data["template_version"] != template.version:
+            raise HTTPException(
+                status_code=409,
+                detail=f"template_version mismatch, current version is {template.version}"
+            )
+        try:
+            content = template.expand(data["scores"])
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return await FormService.create(dict(data, content=content))
+
+    @staticmethod
+    def parse_bulk(body: bytes, ndjson: bool) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+        """
+        Split a bulk upload (NDJSON or a JSON array) into (index, form) pairs that
+        pass FormRecordCreate, and error results for the rows that don't
+        """
+        if ndjson:
+            lines = [line for line in body.splitlines() if line.strip()]
+            FormService._check_bulk_size(len(lines))
+            return FormService._parse_lines(lines, 0)
+        try:
+            raw_rows = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(raw_rows, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        FormService._check_bulk_size(len(raw_rows))
+        return FormService._validate_rows(raw_rows, 0)
+
+    @staticmethod
+    async def read_bulk(
+        chunks: AsyncIterator[bytes],
+        ndjson: bool
+    ) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+        """
+        parse_bulk over a request body as it arrives. NDJSON is validated one received
+        chunk of lines at a time, so an oversized upload is refused before the rest is
+        read; a JSON array can only be parsed whole. Parsing runs in a worker thread.
+        """
+        if not ndjson:
+            body = b"".join([chunk async for chunk in chunks])
+            return await asyncio.to_thread(FormService.parse_bulk, body, False)
+
+        rows, errors = [], []
+        seen = 0
+        pending = b""
+        async for chunk in chunks:
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            seen = await FormService._read_lines(lines, seen, rows, errors)
+        await FormService._read_lines([pending], seen, rows, errors)
+        return rows, errors
+
+    @staticmethod
+    async def _read_lines(lines: List[bytes], seen: int, rows: list, errors: list) -> int:
+        """Parse the next complete NDJSON lines into `rows`/`errors`; returns the rows seen so far"""
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            return seen
+        FormService._check_bulk_size(seen + len(lines))
+        chunk_rows, chunk_errors = await asyncio.to_thread(FormService._parse_lines, lines, seen)
+        rows.extend(chunk_rows)
+        errors.extend(chunk_errors)
+        return seen + len(lines)
+
+    @staticmethod
+    def _check_bulk_size(count: int) -> None:
+        if count > MAX_BULK_ROWS:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ROWS} forms per upload")
+
+    @staticmethod
+    def _parse_lines(lines: List[bytes], start: int):
+        raw_rows = []
+        for line in lines:
+            try:
+                raw_rows.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                raw_rows.append(ValueError("invalid JSON"))
+        return FormService._validate_rows(raw_rows, start)
+
+    @staticmethod
+    def _validate_rows(raw_rows: List[Any], start: int):
+        rows, errors = [], []
+        for index, raw in enumerate(raw_rows, start):
+            if isinstance(raw, Exception):
+                errors.append(FormService.bulk_error(index, str(raw)))
+                continue
+            try:
+                rows.append((index, FormRecordCreate.model_validate(raw).model_dump(mode="json")))
+            except ValidationError as e:
+                error = e.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                errors.append(FormService.bulk_error(index, f"{location}: {error['msg']}" if location else error["msg"]))
+        return rows, errors
+
+    @staticmethod
+    def bulk_error(index: int, error: str) -> Dict[str, Any]:
+        return {"index": index, "status": "error", "error": error}
+
+    @staticmethod
+    async def bulk_create(
+        rows: List[Tuple[int, Dict[str, Any]]],
+        errors: List[Dict[str, Any]],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Create the parsed forms of a bulk upload, yielding the row results one batch
+        at a time: first the rows rejected up front, then each inserted chunk.
+
+        Case and user ids are checked with one set-based lookup per table instead of
+        two lookups per form, and the rest go in with one multi-row insert per chunk.
+        A chunk the database rejects fails as a whole; the other chunks still land.
+        """
+        case_ids = {data["case_id"] for _, data in rows}
+        user_ids = {data["user_id"] for _, data in rows}
+        cases, users = await asyncio.gather(
+            CaseRepository.get_cases_by_ids(list(case_ids), columns="id"),
+            UserRepository.get_users_by_ids(list(user_ids), columns="id"),
+        )
+        known_cases = {c["id"] for c in cases}
+        known_users = {u["id"] for u in users}
+
+        valid = []
+        for index, data in rows:
+            if data["case_id"] not in known_cases:
+                errors.append(FormService.bulk_error(index, "case_id not found"))
+            elif data["user_id"] not in known_users:
+                errors.append(FormService.bulk_error(index, "user_id not found"))
+            else:
+                valid.append((index, data))
+        if errors:
+            yield sorted(errors, key=lambda result: result["index"])
+
+        created_any = False
+        try:
+            for start in range(0, len(valid), chunk_size):
+                chunk = valid[start:start + chunk_size]
+                try:
+                    created = await FormRepository.create_many([data for _, data in chunk])
+                except Exception as e:
+                    yield [FormService.bulk_error(index, str(e)) for index, _ in chunk]
+                    continue
+                created_any = True
+                yield [
+                    {"index": index, "status": "created", "id": row["id"]}
+                    for (index, _), row in zip(chunk, created)
+                ]
+        finally:
+            if created_any:
+                AnalyticsService.invalidate()
+
+    @staticmethod
+    async def collect_bulk(batches: AsyncIterator[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run a bulk import to the end and summarize it"""
+        results = [result async for batch in batches for result in batch]
+        results.sort(key=lambda result: result["index"])
+        created = sum(1 for result in results if result["status"] == "created")
+        return {"total": len(results), "created": created, "failed": len(results) - created, "results": results}
+
+    @staticmethod
+    def get_template(form_type: str):
+        template = get_template(form_type)
+        return {"form_type": form_type, "version": template.version, "items": template.items}
 
     @staticmethod
     async def delete(form_id: int):
@@ -48,20 +241,29 @@ class FormService:
         if not form:
             raise HTTPException(status_code=404, detail="Form not found")
         await FormRepository.delete(form_id)
+        AnalyticsService.invalidate()
         return {"message": "Deleted successfully"}
 
     @staticmethod
-    async def get_by_case_id(case_id):
+    async def get_by_case_id(case_id, after_id=None, limit=FORM_PAGE_SIZE):
         case = await CaseRepository.get_case_by_id(case_id)
         if not case:
             raise HTTPException(status_code=400, detail="case_id not found")
-        records = await FormRepository.get_by_case_id(case_id)
+        records = await FormRepository.get_metadata_page(case_id=case_id, after_id=after_id, limit=limit)
+        return await FormService.attach_names(records)
+
+    @staticmethod
+    async def attach_names(records):
+        """Fill in case_name/user_name with one batched lookup per table"""
+        case_ids = {r["case_id"] for r in records}
+        user_ids = {r["user_id"] for r in records}
+        cases, users = await asyncio.gather(
+            CaseRepository.get_cases_by_ids(list(case_ids), columns="id,name"),
+            UserRepository.get_users_by_ids(list(user_ids), columns="id,name"),
+        )
+        case_names = {c["id"]: c["name"] for c in cases}
+        user_names = {u["id"]: u["name"] for u in users}
         for r in records:
-            for k in list(r.keys()):
-                if k not in ["id", "case_id", "user_id", "year", "form_type", "created_at", "updated_at"]:
-                    r.pop(k, None)
-            case = await CaseRepository.get_case_by_id(r["case_id"])
-            user = await UserRepository.get_user_by_id(r["user_id"])
-            r["case_name"] = case["name"] if case else None
-            r["user_name"] = user["name"] if user else None
-        return records
\ No newline at end of file
+            r["case_name"] = case_names.get(r["case_id"])
+            r["user_name"] = user_names.get(r["user_id"])
+        return records
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.core.cache import TTLCache
+from app.core.llm_pipeline import llm_client
+from app.repositories.llm_cache_repository import LLMCacheRepository
+
+CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# The table tier needs migrations/002_llm_result_cache.sql
+PERSISTENT_CACHE = os.getenv("LLM_PERSISTENT_CACHE", "false").lower() == "true"
+# Rows the table tier keeps; pruning runs every PRUNE_EVERY writes, so it can run
+# over by at most that many rows in between
+MAX_TABLE_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "10000"))
+PRUNE_EVERY = 100
+
+memory_tier = TTLCache(
+    "llm_results",
+    max_size=int(os.getenv("LLM_CACHE_SIZE", "512")),
+    ttl=CACHE_TTL_SECONDS
+)
+
+
+class LLMCacheService:
+    """
+    Content-addressed cache of validated LLM results.
+
+    Keys hash the fully rendered prompt together with the model and its
+    generation config, so identical inputs reuse a result no matter which
+    form or case they came from. Lookups try the in-process LRU first and
+    then the LLMResultCache table.
+    """
+    _stats = {"memory_hits": 0, "table_hits": 0, "misses": 0, "writes": 0, "pruned": 0}
+
+    @staticmethod
+    def key_for(prompt: str) -> str:
+        """Hash of prompt + model + generation config"""
+        backend = llm_client.backend
+        material = json.dumps({
+            "model": getattr(backend, "model_name", backend.name),
+            "generation_config": getattr(backend, "generation_config", {}),
+            "prompt": prompt
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    async def get(key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, or None"""
+        result = memory_tier.get(key)
+        if result is not None:
+            LLMCacheService._stats["memory_hits"] += 1
+            return result
+
+        if PERSISTENT_CACHE:
+            row = await LLMCacheRepository.get_result(key)
+            if row and not LLMCacheService._expired(row["created_at"]):
+                LLMCacheService._stats["table_hits"] += 1
+                memory_tier.set(key, row["result"])
+                return row["result"]
+
+        LLMCacheService._stats["misses"] += 1
+        return None
+
+    @staticmethod
+    async def put(key: str, result: Dict[str, Any]) -> None:
+        """Store a validated result in both tiers"""
+        memory_tier.set(key, result)
+        if not PERSISTENT_CACHE:
+            return
+        backend = llm_client.backend
+        await LLMCacheRepository.save_result(key, getattr(backend, "model_name", backend.name), result)
+        LLMCacheService._stats["writes"] += 1
+        if LLMCacheService._stats["writes"] % PRUNE_EVERY == 0:
+            await LLMCacheService._prune()
+
+    @staticmethod
+    async def _prune() -> None:
+        """Drop expired rows, then the oldest rows beyond MAX_TABLE_ROWS"""
+        cutoff = datetime.now() - timedelta(seconds=CACHE_TTL_SECONDS)
+        pruned = await LLMCacheRepository.delete_before(cutoff)
+        oldest_kept = await LLMCacheRepository.newest_created_at(MAX_TABLE_ROWS)
+        if oldest_kept is not None:
+            pruned += await LLMCacheRepository.delete_before(datetime.fromisoformat(oldest_kept).replace(tzinfo=None))
+        LLMCacheService._stats["pruned"] += pruned
+
+    @staticmethod
+    def _expired(created_at: str) -> bool:
+        created = datetime.fromisoformat(created_at).replace(tzinfo=None)
+        return datetime.now() - created > timedelta(seconds=CACHE_TTL_SECONDS)
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        """Hit/miss counters for both tiers"""
+        stats = dict(LLMCacheService._stats)
+        lookups = stats["memory_hits"] + stats["table_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["table_hits"]) / lookups, 4) if lookups else 0.0
+        stats["persistent"] = PERSISTENT_CACHE
+        stats["memory_tier"] = memory_tier.stats()
+        return stats
@@ -0,0 +1,160 @@
+import asyncio
+import contextvars
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.llm_pipeline import pace_generations
+from app.core.rate_limiter import RateLimiter
+from app.models.llm_job import AnalysisJobCreate, AnalysisJobFilter, JobStatus
+from app.repositories.form_repository import FormRepository
+from app.services.llm_service import LLMService
+
+JOB_WORKERS = int(os.getenv("LLM_JOB_WORKERS", "2"))
+JOB_RATE_PER_MINUTE = float(os.getenv("LLM_JOB_RATE_PER_MINUTE", "60"))
+MAX_RETAINED_JOBS = 100
+
+
+class LLMJobService:
+    """
+    In-process queue of bulk analysis jobs.
+
+    Items are analysed by a small pool of background workers through
+    LLMService.analyze_case, so each result is saved as soon as it finishes
+    and the shared LLM concurrency limit, single-flight and result cache all
+    apply. Generations the workers start are also paced by a token bucket
+    (LLM_JOB_RATE_PER_MINUTE); items whose analysis is reused take no token.
+    Job progress lives in the memory of the worker process that accepted it.
+    """
+    _jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    _queue: Optional[asyncio.Queue] = None
+    _queue_loop: Optional[asyncio.AbstractEventLoop] = None
+    _workers: List[asyncio.Task] = []
+    _rate_limiter = RateLimiter(JOB_RATE_PER_MINUTE)
+
+    @staticmethod
+    async def create_job(request: AnalysisJobCreate) -> Dict[str, Any]:
+        """Queue every requested (case_id, year, form_type) and return the job"""
+        if request.targets:
+            targets = [t.model_dump(mode="json") for t in request.targets]
+        else:
+            targets = await LLMJobService._expand_filter(request.filter)
+
+        unique_targets = list(dict.fromkeys((t["case_id"], t["year"], t["form_type"]) for t in targets))
+        LLMJobService._make_room()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": JobStatus.QUEUED if unique_targets else JobStatus.COMPLETED,
+            "items": [
+                {"case_id": case_id, "year": year, "form_type": form_type, "status": JobStatus.QUEUED, "error": None}
+                for case_id, year, form_type in unique_targets
+            ],
+            "completed": 0,
+            "failed": 0,
+            "created_at": datetime.now(),
+            "finished_at": None if unique_targets else datetime.now()
+        }
+        LLMJobService._jobs[job["id"]] = job
+
+        queue = LLMJobService._ensure_workers()
+        for item in job["items"]:
+            queue.put_nowait((job, item))
+        return LLMJobService.summarize(job)
+
+    @staticmethod
+    def _make_room() -> None:
+        """
+        Evict the oldest finished jobs until a new one fits. Queued and running
+        jobs are never evicted, so a new job is refused while they fill every slot.
+        """
+        jobs = LLMJobService._jobs
+        finished = iter([job_id for job_id, job in jobs.items() if job["finished_at"] is not None])
+        while len(jobs) >= MAX_RETAINED_JOBS:
+            job_id = next(finished, None)
+            if job_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="進行中的分析工作過多，請稍後再試"
+                )
+            del jobs[job_id]
+
+    @staticmethod
+    def get_job(job_id: str, include_items: bool = False) -> Optional[Dict[str, Any]]:
+        """Current progress of a job, or None if unknown"""
+        job = LLMJobService._jobs.get(job_id)
+        if job is None:
+            return None
+        return LLMJobService.summarize(job, include_items)
+
+    @staticmethod
+    def summarize(job: Dict[str, Any], include_items: bool = False) -> Dict[str, Any]:
+        summary = {k: v for k, v in job.items() if k != "items"}
+        summary["total"] = len(job["items"])
+        if include_items:
+            summary["items"] = [dict(item) for item in job["items"]]
+        return summary
+
+    @staticmethod
+    async def _expand_filter(job_filter: AnalysisJobFilter) -> List[Dict[str, Any]]:
+        form_types = [t.value for t in job_filter.form_types] if job_filter.form_types else None
+        return await FormRepository.get_form_keys(job_filter.year, form_types, job_filter.case_ids)
+
+    @staticmethod
+    def _ensure_workers() -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if LLMJobService._queue is None or LLMJobService._queue_loop is not loop:
+            LLMJobService._queue = asyncio.Queue()
+            LLMJobService._queue_loop = loop
+            # Workers outlive the request that starts them, so they get a fresh context
+            # rather than a copy of its request-scoped state (e.g. dataloaders)
+            LLMJobService._workers = [
+                loop.create_task(LLMJobService._worker(LLMJobService._queue), context=contextvars.Context())
+                for _ in range(JOB_WORKERS)
+            ]
+        return LLMJobService._queue
+
+    @staticmethod
+    async def _worker(queue: asyncio.Queue):
+        pace_generations(lambda: LLMJobService._rate_limiter.acquire())
+        while True:
+            job, item = await queue.get()
+            try:
+                await LLMJobService._run_item(job, item)
+            finally:
+                queue.task_done()
+
+    @staticmethod
+    async def _run_item(job: Dict[str, Any], item: Dict[str, Any]):
+        job["status"] = JobStatus.RUNNING
+        item["status"] = JobStatus.RUNNING
+        try:
+            await LLMService.analyze_case(item["case_id"], item["year"], item["form_type"])
+            item["status"] = JobStatus.COMPLETED
+            job["completed"] += 1
+        except Exception as e:
+            item["status"] = JobStatus.FAILED
+            item["error"] = str(e)
+            job["failed"] += 1
+
+        if job["completed"] + job["failed"] == len(job["items"]):
+            job["status"] = JobStatus.FAILED if job["completed"] == 0 else JobStatus.COMPLETED
+            job["finished_at"] = datetime.now()
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        """Queue depth and job counts"""
+        queue = LLMJobService._queue
+        return {
+            "workers": JOB_WORKERS,
+            "rate_per_minute": JOB_RATE_PER_MINUTE,
+            "queued_items": queue.qsize() if queue else 0,
+            "active_jobs": sum(
+                1 for job in LLMJobService._jobs.values()
+                if job["status"] in (JobStatus.QUEUED, JobStatus.RUNNING)
+            ),
+            "retained_jobs": len(LLMJobService._jobs),
+        }
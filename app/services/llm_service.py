@@ -1,68 +1,322 @@
+import asyncio
+import hashlib
 import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
 from app.repositories.llm_repository import LLMRepository
 from app.models.llm_prompt import LLMPrompt
-from app.core.llm_pipeline import llm_pipeline
-from app.models.llm_analysis_result import AnalysisResult
+from app.core.llm_pipeline import llm_pipeline, llm_stream
+from app.core.single_flight import SingleFlight
+from app.core.json_extractor import JSONExtractor
+from app.services.llm_cache_service import LLMCacheService
+from app.models.llm_analysis_result import AnalysisResult, CaseSupportPlan, ProgressNarrative
+
+# Concurrent analyses of the same (case_id, year, form_type) share one generation
+analysis_flights = SingleFlight("analysis")
+
+
+class FormNotFound(ValueError):
+    """Raised when the form (or case-year) to analyse has no filled-in content"""
+
 
 class LLMService:
+    # How model output fared in parse_response_to_json
+    _parse_stats = {"parsed": 0, "repaired": 0, "failed": 0}
+
     @staticmethod
-    def run_llm(prompt: str) -> str:
-        response = llm_pipeline(prompt)
+    async def run_llm(prompt: str) -> str:
+        response = await llm_pipeline(prompt)
         return response
 
     @staticmethod
-    def clean_json_text(response_text: str) -> str:
-        if response_text.startswith("```json"):
-            response_text = response_text[len("```json"):].strip()
-        if response_text.endswith("```"):
-            response_text = response_text[:-3].strip()
-        return response_text
+    def parse_response_to_json(response_text: str, model: Type[BaseModel] = AnalysisResult) -> BaseModel:
+        """
+        Find the object that validates as `model` anywhere in the model output,
+        repairing it if the output was cut off, instead of requiring bare JSON.
+        """
+        extractor = LLMService.extractor_for(model)
+        extractor.feed(response_text)
+        result_dict = extractor.finish()
+        if result_dict is None:
+            LLMService._parse_stats["failed"] += 1
+            raise ValueError("LLM 回傳的格式無法解析成 JSON")
+        LLMService._parse_stats["repaired" if extractor.repaired else "parsed"] += 1
+        return model(**result_dict)
 
     @staticmethod
-    def parse_response_to_json(response_text: str) -> AnalysisResult:
-        cleaned_text = LLMService.clean_json_text(response_text)
-        try:
-            result_dict = json.loads(cleaned_text)
-        except json.JSONDecodeError:
-            raise ValueError("LLM 回傳的格式無法解析成 JSON")
-        return AnalysisResult(**result_dict)
+    def extractor_for(model: Type[BaseModel]) -> JSONExtractor:
+        def validates(value: Dict[str, Any]) -> bool:
+            try:
+                model(**value)
+            except ValidationError:
+                return False
+            return True
+        return JSONExtractor(accept=validates)
+
+    @staticmethod
+    def parse_stats() -> Dict[str, Any]:
+        """Snapshot of how often model output could not be parsed"""
+        stats = dict(LLMService._parse_stats)
+        total = sum(stats.values())
+        stats["failure_rate"] = round(stats["failed"] / total, 4) if total else 0.0
+        return stats
     
     @staticmethod
     async def analyze_case(case_id: int, year: int, form_type: str):
-        form_data = await LLMRepository.get_question_value(case_id, year, form_type)
-        if not form_data:
-            raise ValueError("Form not found")
+        return await analysis_flights.do(
+            (case_id, year, form_type),
+            lambda: LLMService._analyze_case(case_id, year, form_type)
+        )
+
+    @staticmethod
+    async def _analyze_case(case_id: int, year: int, form_type: str):
+        form = await LLMService._fetch_form(case_id, year, form_type)
+        return await LLMService._analyze_loaded(form, form_type)
+
+    @staticmethod
+    async def _analyze_loaded(form: Dict[str, Any], form_type: str) -> Dict[str, Any]:
+        """Reuse, incrementally refresh or generate the analysis of an already-fetched form"""
+        if form["analysis"]:
+            changed, removed = LLMService.changed_activities(form)
+            if not changed and not removed:
+                return form["analysis"].dict()
+            return await LLMService._reanalyze(form, form_type, changed, removed)
+        return await LLMService._generate_analysis(form["id"], form["content"], form_type)
+
+    @staticmethod
+    async def _generate_analysis(form_id: int, form_data, form_type: str) -> Dict[str, Any]:
+        """Analyse already-loaded form content, reusing a cached result for an identical prompt"""
+        prompt = LLMPrompt.generate_analysis_prompt(form_data, form_type)
+        cache_key = LLMCacheService.key_for(prompt)
+        cached_result = await LLMCacheService.get(cache_key)
+        if cached_result:
+            return await LLMService.store_analysis(form_id, form_type, AnalysisResult(**cached_result), form_data)
+
+        response_text = await LLMService.run_llm(prompt)
+        return await LLMService.save_analysis(form_id, form_type, response_text, cache_key, form_data)
+
+    @staticmethod
+    async def _reanalyze(form: Dict[str, Any], form_type: str, changed: List[str], removed: List[str]) -> Dict[str, Any]:
+        """
+        Revise a stored analysis after some activities changed: only the changed
+        activities' items and the previous result go to the model, and the
+        revised result overwrites the stored row.
+        """
+        changed_content = [item for item in form["content"] if item.get("activity") in changed]
+        prompt = LLMPrompt.generate_reanalysis_prompt(form["analysis"].dict(), changed_content, removed, form_type)
+        response_text = await LLMService.run_llm(prompt)
+        analysis_result = LLMService.parse_response_to_json(response_text)
+        await LLMRepository.update_analysis_result(
+            filled_form_id=form["id"],
+            suggestions=analysis_result.suggestions.dict(),
+            summary=analysis_result.summary.dict(),
+            activity_digests=LLMService.activity_digests(form["content"])
+        )
+        return analysis_result.dict()
+
+    @staticmethod
+    def activity_digests(content: Any) -> Dict[str, str]:
+        """Digest of each activity's items and scores, keyed by activity"""
+        if not isinstance(content, list):
+            return {}
+        grouped: Dict[str, List[Any]] = {}
+        for item in content:
+            grouped.setdefault(item.get("activity"), []).append(
+                [item.get("item"), item.get("subitem"), item.get("support_type")]
+            )
+        return {
+            activity: hashlib.sha256(json.dumps(items, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+            for activity, items in grouped.items()
+        }
+
+    @staticmethod
+    def changed_activities(form: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        """
+        (changed, removed) activities since the stored analysis was generated.
+        Both are empty when incremental analysis is off or the analysis has no digests.
+        """
+        stored = form.get("digests")
+        if not LLMRepository.INCREMENTAL_ANALYSIS or not stored:
+            return [], []
+        current = LLMService.activity_digests(form["content"])
+        changed = [activity for activity, digest in current.items() if stored.get(activity) != digest]
+        removed = [activity for activity in stored if activity not in current]
+        return changed, removed
+
+    @staticmethod
+    async def analyze_case_year(case_id: int, year: int) -> Dict[str, Any]:
+        """
+        Analyse every form (A–G) of a case-year and synthesise one support plan.
+
+        Stored per-form analyses are reused; only the missing ones are generated,
+        concurrently, so wall-clock time tracks the slowest form rather than the sum.
+        """
+        forms = await LLMRepository.get_case_forms_with_analysis(case_id, year)
+        forms = [form for form in forms if form["content"]]
+        if not forms:
+            raise FormNotFound("Form not found")
 
-        form_id = await LLMRepository.get_form_id(case_id, year, form_type)
-        existing_result = await LLMService.get_analysis_result(case_id, year, form_type)
-        if existing_result:
-            return existing_result
+        async def analysis_for(form):
+            if form["analysis"] and not any(LLMService.changed_activities(form)):
+                return form["analysis"].dict()
+            return await analysis_flights.do(
+                (case_id, year, form["form_type"]),
+                lambda: LLMService._analyze_loaded(form, form["form_type"])
+            )
+
+        results = await asyncio.gather(*[analysis_for(form) for form in forms])
+        analyses = {form["form_type"]: result for form, result in zip(forms, results)}
+        plan = await analysis_flights.do(
+            ("plan", case_id, year),
+            lambda: LLMService._synthesize_plan(analyses)
+        )
+        return {
+            "case_id": case_id,
+            "year": year,
+            "forms": analyses,
+            "plan": plan
+        }
+
+    @staticmethod
+    async def _synthesize_plan(analyses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        prompt = LLMPrompt.generate_synthesis_prompt(analyses)
+        cache_key = LLMCacheService.key_for(prompt)
+        cached_plan = await LLMCacheService.get(cache_key)
+        if cached_plan:
+            return cached_plan
+
+        response_text = await LLMService.run_llm(prompt)
+        plan = LLMService.parse_response_to_json(response_text, CaseSupportPlan).dict()
+        await LLMCacheService.put(cache_key, plan)
+        return plan
+
+    @staticmethod
+    async def narrate_progress(diff: Dict[str, Any]) -> Dict[str, Any]:
+        """Describe a year-over-year diff; only the changed items are sent to the model"""
+        prompt = LLMPrompt.generate_progress_prompt(diff)
+        cache_key = LLMCacheService.key_for(prompt)
+        cached_narrative = await LLMCacheService.get(cache_key)
+        if cached_narrative:
+            return cached_narrative
+
+        response_text = await LLMService.run_llm(prompt)
+        narrative = LLMService.parse_response_to_json(response_text, ProgressNarrative).dict()
+        await LLMCacheService.put(cache_key, narrative)
+        return narrative
+
+    @staticmethod
+    async def stream_analysis(case_id: int, year: int, form_type: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Look the form up, then return an iterator of (event, data) pairs:
+        `token` events while the model generates and one final `result` event.
+        Raises ValueError up front if the form does not exist.
+        """
+        form = await LLMService._fetch_form(case_id, year, form_type)
+        form_id, form_data = form["id"], form["content"]
+        if form["analysis"]:
+            if any(LLMService.changed_activities(form)):
+                # A small edit: refresh incrementally rather than streaming a full generation
+                return LLMService._replay_analysis(case_id, year, form_type)
+            return LLMService._replay_result(form["analysis"].dict())
+
+        pending = analysis_flights.in_flight((case_id, year, form_type))
+        if pending is not None:
+            return LLMService._replay_flight(pending)
 
         prompt = LLMPrompt.generate_analysis_prompt(form_data, form_type)
-        response_text = LLMService.run_llm(prompt)
+        cache_key = LLMCacheService.key_for(prompt)
+        cached_result = await LLMCacheService.get(cache_key)
+        if cached_result:
+            result = await LLMService.store_analysis(form_id, form_type, AnalysisResult(**cached_result), form_data)
+            return LLMService._replay_result(result)
+
+        return LLMService._stream_events((case_id, year, form_type), form_id, form_data, prompt, cache_key)
+
+    @staticmethod
+    async def _replay_result(result: Dict[str, Any]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        yield "result", result
+
+    @staticmethod
+    async def _replay_analysis(case_id: int, year: int, form_type: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        yield "result", await LLMService.analyze_case(case_id, year, form_type)
+
+    @staticmethod
+    async def _replay_flight(flight) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        yield "result", await analysis_flights.join(flight)
+
+    @staticmethod
+    async def _stream_events(key: Tuple[int, int, str], form_id: int, form_data, prompt: str, cache_key: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        # Register the flight only once the stream is actually consumed, so a
+        # response that is dropped before its first pull leaves nothing behind
+        pending = analysis_flights.in_flight(key)
+        if pending is not None:
+            yield "result", await analysis_flights.join(pending)
+            return
+        form_type = key[2]
+        flight = analysis_flights.start(key)
+        try:
+            chunks = []
+            extractor = LLMService.extractor_for(AnalysisResult)
+            stream = llm_stream(prompt)
+            try:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    yield "token", {"text": chunk}
+                    # Stop generating as soon as a valid result has arrived; anything after it is chatter
+                    if extractor.feed(chunk) is not None:
+                        break
+            finally:
+                await stream.aclose()
+            result = await LLMService.save_analysis(form_id, form_type, "".join(chunks), cache_key, form_data)
+        except BaseException as e:
+            analysis_flights.finish(flight, error=e)
+            raise
+        analysis_flights.finish(flight, result=result)
+        yield "result", result
+
+    @staticmethod
+    async def _fetch_form(case_id: int, year: int, form_type: str) -> Dict[str, Any]:
+        form = await LLMRepository.get_form_with_analysis(case_id, year, form_type)
+        if not form or not form["content"]:
+            raise FormNotFound("Form not found")
+        return form
+
+    @staticmethod
+    async def load_form(case_id: int, year: int, form_type: str):
+        """Return (form_id, form content, existing analysis or None) for a form in one round trip"""
+        form = await LLMService._fetch_form(case_id, year, form_type)
+        existing_result = form["analysis"].dict() if form["analysis"] else None
+        return form["id"], form["content"], existing_result
+
+    @staticmethod
+    async def save_analysis(
+        form_id: int,
+        form_type: str,
+        response_text: str,
+        cache_key: Optional[str] = None,
+        form_data: Any = None
+    ) -> Dict[str, Any]:
+        """Validate the model output as an AnalysisResult, persist it and cache it under `cache_key`"""
         analysis_result = LLMService.parse_response_to_json(response_text)
+        result = await LLMService.store_analysis(form_id, form_type, analysis_result, form_data)
+        if cache_key:
+            await LLMCacheService.put(cache_key, result)
+        return result
 
+    @staticmethod
+    async def store_analysis(form_id: int, form_type: str, analysis_result: AnalysisResult, form_data: Any = None) -> Dict[str, Any]:
+        """Persist an analysis for a form, with digests of the content it was generated from"""
         await LLMRepository.save_analysis_result(
             filled_form_id=form_id,
             suggestions=analysis_result.suggestions.dict(),
             summary=analysis_result.summary.dict(),
-            form_type=form_type
+            form_type=form_type,
+            activity_digests=LLMService.activity_digests(form_data)
         )
 
         return analysis_result.dict()
     
     @staticmethod
     async def get_analysis_result(case_id: int, year: int, form_type: str):
-        form_data = await LLMRepository.get_question_value(case_id, year, form_type)
-        if not form_data:
-            raise ValueError("Form not found")
-
-        form_id = await LLMRepository.get_form_id(case_id, year, form_type)
-
-        existing_result = await LLMRepository.get_analysis_result(
-            filled_form_id=form_id,
-        )
-        if existing_result:
-            return existing_result.dict()
-
-        return None
+        _, _, existing_result = await LLMService.load_form(case_id, year, form_type)
+        return existing_result
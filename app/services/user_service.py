@@ -1,6 +1,7 @@
 from typing import List, Dict, Optional
 from fastapi import HTTPException, status
 
+from app.core.auth import invalidate_principal
 from app.repositories.user_repository import UserRepository, UserDict
 from app.models.user import (
     UserCreate, UserUpdate, AdminUserUpdate
@@ -109,10 +110,13 @@ class UserService:
                         detail="Failed to update user"
                     )
             
+            invalidate_principal(user_id)
             print(f"Updated user: {updated_user}")
             return updated_user
         except Exception as e:
             print(f"Error in admin_update_user: {e}")
+            # A partial update may already have been written
+            invalidate_principal(user_id)
             raise e
 
     @staticmethod
@@ -141,7 +145,7 @@ class UserService:
                     )
                 
                 # Verify old password
-                if not UserRepository.verify_password(user_data.old_password, user["password"]):
+                if not await UserRepository.verify_password_async(user_data.old_password, user["password"]):
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail="Incorrect old password"
@@ -175,10 +179,13 @@ class UserService:
                         detail="Failed to update password"
                     )
             
+            invalidate_principal(user_id)
             print(f"Updated user: {updated_user}")
             return updated_user
         except Exception as e:
             print(f"Error in update_user: {e}")
+            # A partial update may already have been written
+            invalidate_principal(user_id)
             raise e
 
     @staticmethod
@@ -196,6 +203,7 @@ class UserService:
         
         # Delete user
         success = await UserRepository.delete_user(user_id)
+        invalidate_principal(user_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,71 @@
+"""
+Form storage benchmark: full FormItem content vs packed scores.
+
+Uses the app/data/form.json templates with random support types and compares,
+per form type, the JSON size of the stored row, the CPU cost of preparing an
+insert (pack + serialise) and of reading one back (parse + expand), plus the
+transfer time of the row at a given bandwidth.
+
+    python -m benchmarks.form_storage
+    python -m benchmarks.form_storage --bandwidth-mbps 20
+"""
+import argparse
+import json
+import random
+import time
+
+from app.core.form_templates import get_template, get_templates, pack_scores, unpack_scores
+
+
+def full_row(content):
+    return {"content": content}
+
+
+def packed_row(template, content):
+    return {"content": None, "template_version": template.version, "scores": pack_scores(template.compact(content))}
+
+
+def timed(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def run(rounds: int, bandwidth_mbps: float):
+    rng = random.Random(0)
+    bytes_per_second = bandwidth_mbps * 1_000_000 / 8
+    print(f"{'form':<5}{'full bytes':>11}{'packed bytes':>13}{'insert full':>13}{'insert packed':>15}"
+          f"{'read full':>11}{'read packed':>13}{'wire full':>11}{'wire packed':>13}")
+    totals = [0, 0]
+    for form_type, template in get_templates().items():
+        content = template.expand([rng.choice([None, -1, 0, 1, 2, 3, 4]) for _ in range(len(template))])
+        full_json = json.dumps(full_row(content), ensure_ascii=False)
+        packed_json = json.dumps(packed_row(template, content), ensure_ascii=False)
+        full_size, packed_size = len(full_json.encode("utf-8")), len(packed_json.encode("utf-8"))
+        totals[0] += full_size
+        totals[1] += packed_size
+
+        insert_full = timed(lambda: json.dumps(full_row(content), ensure_ascii=False), rounds)
+        insert_packed = timed(lambda: json.dumps(packed_row(template, content), ensure_ascii=False), rounds)
+        read_full = timed(lambda: json.loads(full_json)["content"], rounds)
+
+        def read_packed():
+            row = json.loads(packed_json)
+            return get_template(form_type).expand(unpack_scores(row["scores"]))
+
+        print(
+            f"{form_type:<5}{full_size:>11}{packed_size:>13}"
+            f"{insert_full * 1e6:>11.1f}us{insert_packed * 1e6:>13.1f}us"
+            f"{read_full * 1e6:>9.1f}us{timed(read_packed, rounds) * 1e6:>11.1f}us"
+            f"{full_size / bytes_per_second * 1e3:>9.2f}ms{packed_size / bytes_per_second * 1e3:>11.2f}ms"
+        )
+    print(f"total row bytes: {totals[0]} -> {totals[1]} ({1 - totals[1] / totals[0]:.0%} smaller)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--bandwidth-mbps", type=float, default=100.0)
+    args = parser.parse_args()
+    run(args.rounds, args.bandwidth_mbps)
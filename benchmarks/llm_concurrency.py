@@ -0,0 +1,48 @@
+"""
+Offline LLM concurrency benchmark.
+
+Drives the shared LLMClient with the fake backend and shows that wall-clock
+time follows ceil(requests / LLM_MAX_CONCURRENCY) * latency instead of
+requests * latency, while the event loop stays responsive.
+
+    python -m benchmarks.llm_concurrency --requests 32 --concurrency 8 --latency 0.5
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.llm_pipeline import FakeBackend, LLMClient
+
+
+async def run(requests: int, concurrency: int, latency: float):
+    client = LLMClient(FakeBackend(latency=latency), max_concurrency=concurrency)
+
+    ticks = 0
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal ticks
+        while not stop.is_set():
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*[client.generate(f"prompt {i}") for i in range(requests)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+
+    print(f"requests={requests} concurrency={concurrency} latency={latency}s")
+    print(f"wall clock: {elapsed:.2f}s (serial would be {requests * latency:.2f}s)")
+    print(f"event loop heartbeats during run: {ticks}")
+    print(client.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.latency))
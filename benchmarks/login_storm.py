@@ -0,0 +1,97 @@
+"""
+Login storm benchmark.
+
+Fires a burst of concurrent logins at the app while polling an unrelated
+endpoint (GET /) and reports that endpoint's latency percentiles. With
+--inline, bcrypt runs on the event loop like it used to, for comparison.
+
+Runs fully in-process against an in-memory user, no Supabase needed:
+
+    python -m benchmarks.login_storm --logins 64
+    python -m benchmarks.login_storm --logins 64 --inline
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+import httpx
+
+from app.main import app
+from app.repositories.user_repository import UserRepository
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def poll(client, stop, samples):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def run(logins: int, inline: bool):
+    user = {
+        "id": 1,
+        "name": "Benchmark User",
+        "email": "bench@example.com",
+        "password": UserRepository._hash_password("secret"),
+        "activate": True,
+    }
+
+    async def get_user_by_email(email):
+        return user
+
+    UserRepository.get_user_by_email = staticmethod(get_user_by_email)
+    if inline:
+        async def verify_inline(plain, hashed):
+            return UserRepository.verify_password(plain, hashed)
+        UserRepository.verify_password_async = staticmethod(verify_inline)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        idle, storm = [], []
+
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll(client, stop, idle))
+        await asyncio.sleep(1)
+        stop.set()
+        await poller
+
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll(client, stop, storm))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/auth/login", data={"username": user["email"], "password": "secret"})
+            for _ in range(logins)
+        ])
+        storm_seconds = time.perf_counter() - start
+        stop.set()
+        await poller
+
+    ok = sum(1 for r in responses if r.status_code == 200)
+    print(f"mode: {'inline bcrypt' if inline else 'worker pool'}")
+    print(f"logins: {ok}/{logins} ok in {storm_seconds:.2f}s")
+    for label, samples in (("idle", idle), ("storm", storm)):
+        print(
+            f"GET / during {label:5}: n={len(samples):4} "
+            f"p50={statistics.median(samples):7.2f}ms p99={percentile(samples, 99):7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--inline", action="store_true", help="verify passwords on the event loop")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.inline))
@@ -0,0 +1,99 @@
+"""
+Prompt size benchmark.
+
+Builds the analysis prompt for every form type in app/data/form.json, once with
+the old encoding (the raw `content` list interpolated verbatim) and once with
+LLMPrompt's compact table, then reports prompt tokens, build time and the
+generation latency of a fake backend whose prefill cost scales with tokens.
+
+    python -m benchmarks.prompt_size
+    python -m benchmarks.prompt_size --gemini   # exact token counts and real latency, needs GEMINI_API_KEY
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from pathlib import Path
+
+from app.core.llm_pipeline import FakeBackend, GeminiBackend
+from app.models.llm_prompt import ANALYSIS_TEMPLATE, LLMPrompt
+
+FORM_PATH = Path(__file__).resolve().parent.parent / "app" / "data" / "form.json"
+
+
+def legacy_prompt(content, form_type: str) -> str:
+    """The prompt as it was built before compact encoding: f-string plus repr of the content"""
+    prompt = ANALYSIS_TEMPLATE.format(form_activity=LLMPrompt.get_form_activity(form_type))
+    return f"{prompt}{content}\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough offline count: one token per CJK character, about four characters per other token"""
+    cjk = len(re.findall(r"[　-鿿＀-￯]", text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class PrefillBackend(FakeBackend):
+    """Fake backend whose latency grows with the prompt, like a real model's prefill"""
+
+    def __init__(self, seconds_per_token: float):
+        super().__init__(latency=0.0)
+        self.seconds_per_token = seconds_per_token
+
+    async def generate(self, prompt: str) -> str:
+        self.latency = estimate_tokens(prompt) * self.seconds_per_token
+        return await super().generate(prompt)
+
+
+async def measure(backend, prompt: str) -> float:
+    start = time.perf_counter()
+    await backend.generate(prompt)
+    return time.perf_counter() - start
+
+
+def build_time(builder, content, form_type: str, rounds: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        builder(content, form_type)
+    return (time.perf_counter() - start) / rounds
+
+
+async def run(use_gemini: bool, seconds_per_token: float):
+    forms = json.loads(FORM_PATH.read_text(encoding="utf-8"))
+    rng = random.Random(0)
+    backend = GeminiBackend() if use_gemini else PrefillBackend(seconds_per_token)
+
+    def count(prompt: str) -> int:
+        if use_gemini:
+            return backend.model.count_tokens(prompt).total_tokens
+        return estimate_tokens(prompt)
+
+    print(f"{'form':<5}{'tokens before':>14}{'tokens after':>14}{'saved':>8}"
+          f"{'build before':>14}{'build after':>13}{'latency before':>16}{'latency after':>15}")
+    totals = [0, 0]
+    for form_type, items in forms.items():
+        # form.json is an empty template; fill in plausible support types
+        content = [dict(item, support_type=rng.randint(-1, 4)) for item in items]
+        before, after = legacy_prompt(content, form_type), LLMPrompt.generate_analysis_prompt(content, form_type)
+        tokens_before, tokens_after = count(before), count(after)
+        totals[0] += tokens_before
+        totals[1] += tokens_after
+        print(
+            f"{form_type:<5}{tokens_before:>14}{tokens_after:>14}{1 - tokens_after / tokens_before:>8.0%}"
+            f"{build_time(legacy_prompt, content, form_type) * 1e6:>12.1f}us"
+            f"{build_time(LLMPrompt.generate_analysis_prompt, content, form_type) * 1e6:>11.1f}us"
+            f"{await measure(backend, before):>15.2f}s{await measure(backend, after):>14.2f}s"
+        )
+    print(f"total prompt tokens: {totals[0]} -> {totals[1]} ({1 - totals[1] / totals[0]:.0%} fewer)")
+    if not use_gemini:
+        print("token counts are estimates; pass --gemini for exact counts")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gemini", action="store_true", help="count tokens and time generation against Gemini")
+    parser.add_argument("--seconds-per-token", type=float, default=0.0002, help="fake backend prefill cost")
+    args = parser.parse_args()
+    asyncio.run(run(args.gemini, args.seconds_per_token))
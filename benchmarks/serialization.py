@@ -0,0 +1,104 @@
+"""
+Response serialization benchmark.
+
+Builds representative payloads for the largest read endpoints and reports, per
+endpoint, the CPU time to turn the repository rows into a response body on
+three paths, and the bytes on the wire uncompressed, gzipped and brotli'd:
+
+  model+json    response_model validate + dump, stdlib json (the old default)
+  model+orjson  response_model validate + dump, orjson (routes returning dicts)
+  shaped        field filter + orjson, no validation (app.core.responses)
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --cases 2000 --page-size 1000
+"""
+import argparse
+import random
+import time
+import zlib
+from typing import List
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.core.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from app.core.form_templates import get_templates
+from app.core.responses import shaped_response
+from app.models.case import Case
+from app.models.form import FormMetadata, FormRecordResponse
+
+TIMESTAMP = "2024-05-01T08:30:00.123456+00:00"
+
+
+def form_record(rng: random.Random):
+    form_type, template = max(get_templates().items(), key=lambda entry: len(entry[1]))
+    content = template.expand([rng.choice([None, -1, 0, 1, 2, 3, 4]) for _ in range(len(template))])
+    return {
+        "id": 1, "case_id": 1, "user_id": 1, "year": 2024, "form_type": form_type, "content": content,
+        "created_at": TIMESTAMP, "updated_at": TIMESTAMP, "case_name": "王小明", "user_name": "陳老師"
+    }
+
+
+def cases(rng: random.Random, count: int):
+    return [{
+        "id": i, "name": f"個案{i}", "birthdate": "2015-03-0%d" % (i % 9 + 1),
+        "caseDescription": "需要在日常生活與社會參與方面的協助" * rng.randint(1, 4),
+        "gender": rng.choice(["男", "女"]), "types": rng.sample(["自閉症", "智能障礙", "肢體障礙", "學習障礙"], 2),
+        "created_at": TIMESTAMP, "updated_at": TIMESTAMP
+    } for i in range(count)]
+
+
+def metadata_page(rng: random.Random, size: int):
+    return [{
+        "id": i, "case_id": rng.randint(1, 500), "user_id": rng.randint(1, 20), "year": 2024,
+        "form_type": rng.choice("ABCDEFG"), "created_at": TIMESTAMP, "updated_at": TIMESTAMP,
+        "case_name": "王小明", "user_name": "陳老師"
+    } for i in range(size)]
+
+
+def timed(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def run(rounds: int, case_count: int, page_size: int):
+    rng = random.Random(0)
+    endpoints = [
+        ("GET /forms/{id}", form_record(rng), FormRecordResponse, FormRecordResponse),
+        ("GET /cases/", cases(rng, case_count), List[Case], Case),
+        ("GET /forms/", metadata_page(rng, page_size), List[FormMetadata], FormMetadata),
+    ]
+    print(f"{'endpoint':<17}{'model+json':>12}{'model+orjson':>14}{'shaped':>10}"
+          f"{'bytes':>10}{'gzip':>9}{'br':>9}")
+    for name, payload, response_model, row_model in endpoints:
+        adapter = TypeAdapter(response_model)
+
+        def model_json():
+            return JSONResponse(adapter.dump_python(adapter.validate_python(payload), mode="json")).body
+
+        def model_orjson():
+            return ORJSONResponse(adapter.dump_python(adapter.validate_python(payload), mode="json")).body
+
+        def shaped():
+            return shaped_response(payload, row_model, Response()).body
+
+        body = shaped()
+        gzipped = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        gzip_size = len(gzipped.compress(body) + gzipped.flush())
+        br_size = f"{len(brotli.compress(body, quality=BROTLI_QUALITY)):>9}" if brotli else f"{'-':>9}"
+        print(
+            f"{name:<17}{timed(model_json, rounds) * 1e3:>10.3f}ms{timed(model_orjson, rounds) * 1e3:>12.3f}ms"
+            f"{timed(shaped, rounds) * 1e3:>8.3f}ms{len(body):>10}{gzip_size:>9}{br_size}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--cases", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    run(args.rounds, args.cases, args.page_size)
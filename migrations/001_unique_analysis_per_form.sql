@@ -0,0 +1,13 @@
+-- One analysis row per filled form.
+-- Lets LLMRepository.save_analysis_result upsert on filled_form_id
+-- (enable with LLM_ANALYSIS_UPSERT=true) so concurrent workers cannot
+-- insert duplicate analyses for the same form.
+
+-- Keep the newest row when duplicates already exist
+DELETE FROM "LifeSupportFormAnalysis" a
+USING "LifeSupportFormAnalysis" b
+WHERE a.filled_form_id = b.filled_form_id
+  AND a.id < b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS "LifeSupportFormAnalysis_filled_form_id_key"
+    ON "LifeSupportFormAnalysis" (filled_form_id);
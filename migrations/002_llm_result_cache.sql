@@ -0,0 +1,13 @@
+-- Content-addressed cache of LLM analysis results.
+-- prompt_hash is sha256(model + generation config + rendered prompt), see
+-- LLMCacheService.key_for. Enable with LLM_PERSISTENT_CACHE=true.
+
+CREATE TABLE IF NOT EXISTS "LLMResultCache" (
+    prompt_hash text PRIMARY KEY,
+    model       text NOT NULL,
+    result      jsonb NOT NULL,
+    created_at  timestamp NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS "LLMResultCache_created_at_idx"
+    ON "LLMResultCache" (created_at);
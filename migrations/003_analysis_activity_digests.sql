@@ -0,0 +1,7 @@
+-- Per-activity digests of the form content an analysis was generated from.
+-- Lets LLMService re-analyse only the activities whose items changed
+-- (enable with LLM_INCREMENTAL_ANALYSIS=true). Rows written before this
+-- migration keep NULL and are treated as up to date.
+
+ALTER TABLE "LifeSupportFormAnalysis"
+    ADD COLUMN IF NOT EXISTS activity_digests jsonb;
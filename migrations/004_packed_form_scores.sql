@@ -0,0 +1,18 @@
+-- Packed storage for form scores.
+-- With FORM_STORAGE_MODE=packed, forms that follow the current template are
+-- stored as the template version plus one signed byte per item (base64),
+-- and `content` is left NULL; the API rebuilds `content` on read.
+-- Existing rows can be converted with `python -m app.data.migrate_form_storage`.
+
+ALTER TABLE forms
+    ADD COLUMN IF NOT EXISTS template_version text,
+    ADD COLUMN IF NOT EXISTS scores text;
+
+ALTER TABLE forms
+    ALTER COLUMN content DROP NOT NULL;
+
+ALTER TABLE forms
+    DROP CONSTRAINT IF EXISTS forms_content_or_scores;
+ALTER TABLE forms
+    ADD CONSTRAINT forms_content_or_scores
+    CHECK (content IS NOT NULL OR (template_version IS NOT NULL AND scores IS NOT NULL));
@@ -6,10 +6,27 @@ import jwt
 from datetime import datetime, timedelta
 
 from app.main import app
-from app.core.auth import SECRET_KEY, ALGORITHM
+from app.core.auth import SECRET_KEY, ALGORITHM, principal_cache
+from app.services.llm_cache_service import memory_tier as llm_result_cache
+from app.services.analytics_service import cohort_cache
+from app.repositories.case_repository import case_cache
 from app.repositories.user_repository import UserRepository
 
 
+@pytest.fixture(autouse=True)
+async def clear_caches():
+    """
+    Keep cached users, cases and LLM results from leaking between tests
+    """
+    for cache in (principal_cache, llm_result_cache, cohort_cache):
+        cache.clear()
+    await case_cache.clear()
+    yield
+    for cache in (principal_cache, llm_result_cache, cohort_cache):
+        cache.clear()
+    await case_cache.clear()
+
+
 @pytest.fixture
 def client() -> Generator:
     """
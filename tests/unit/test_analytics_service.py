@@ -0,0 +1,109 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.form_templates import get_template, pack_scores
+from app.services.analytics_service import AnalyticsService
+
+
+def test_compute_stats_per_item_and_activity():
+    template = get_template("B")
+    size = len(template)
+    vectors = [[0] * size, [4] * size, [None] * size, [-1] * size]
+    vectors[0][1] = 2
+
+    stats = AnalyticsService.compute_stats(template, vectors)
+
+    first, second = stats["items"][0], stats["items"][1]
+    assert stats["form_count"] == 4
+    assert first["n"] == 2 and first["mean"] == 2.0
+    assert first["percentiles"]["p50"] == 2.0
+    assert first["distribution"] == {"-1": 1, "0": 1, "1": 0, "2": 0, "3": 0, "4": 1, "null": 1}
+    assert second["mean"] == 3.0
+
+    activity = stats["activities"][0]
+    assert activity["activity"] == template.items[0]["activity"]
+    assert activity["n"] == 2
+    items_in_activity = sum(1 for item in template.items if item["activity"] == activity["activity"])
+    assert sum(activity["distribution"].values()) == 4 * items_in_activity
+
+
+def test_compute_stats_without_forms():
+    stats = AnalyticsService.compute_stats(get_template("B"), [])
+    assert stats["form_count"] == 0
+    assert stats["items"][0]["mean"] is None
+
+
+@pytest.mark.asyncio
+async def test_cohort_stats_filters_by_case_type_and_caches():
+    template = get_template("D")
+    rows = [
+        {"id": 1, "case_id": 10, "content": template.expand([1] * len(template))},
+        {"id": 2, "case_id": 20, "content": None, "template_version": template.version, "scores": pack_scores([3] * len(template))},
+        {"id": 3, "case_id": 30, "content": [{"activity": "不符合範本"}]},
+    ]
+    with patch("app.repositories.form_repository.FormRepository.get_score_rows", AsyncMock(return_value=rows)) as mock_rows, \
+         patch("app.repositories.case_repository.CaseRepository.get_case_ids_by_types", AsyncMock(return_value=[20, 30])):
+        stats = await AnalyticsService.cohort_stats(2025, "D", ["自閉症"])
+        again = await AnalyticsService.cohort_stats(2025, "D", ["自閉症"])
+
+    assert stats["form_count"] == 1
+    assert stats["items"][0]["mean"] == 3.0
+    assert again is stats
+    mock_rows.assert_awaited_once()
+
+    AnalyticsService.invalidate()
+    with patch("app.repositories.form_repository.FormRepository.get_score_rows", AsyncMock(return_value=[])) as mock_rows:
+        await AnalyticsService.cohort_stats(2025, "D", ["自閉症"])
+    mock_rows.assert_awaited_once()
+
+
+def test_compute_diff_flags_improvements_and_regressions():
+    template = get_template("B")
+    size = len(template)
+    before = [2] * size
+    after = [2] * size
+    after[0] = 1          # less support needed
+    after[1] = 4          # more support needed
+    before[2] = None      # not answered last year
+    after[3] = -1         # not applicable this year
+
+    diff = AnalyticsService.compute_diff(template, before, after)
+
+    trends = [item["trend"] for item in diff["items"][:5]]
+    assert trends == ["improved", "regressed", "not_comparable", "not_comparable", "unchanged"]
+    assert diff["items"][1]["delta"] == 2
+    assert diff["counts"]["improved"] == 1 and diff["counts"]["not_comparable"] == 2
+    assert sum(diff["counts"].values()) == size
+    assert diff["activities"][0]["activity"] == template.items[0]["activity"]
+
+
+@pytest.mark.asyncio
+async def test_progress_sends_only_the_diff_to_the_llm():
+    template = get_template("B")
+    size = len(template)
+    rows = [
+        {"id": 1, "year": 2024, "content": template.expand([3] * size)},
+        {"id": 2, "year": 2025, "content": None, "template_version": template.version,
+         "scores": pack_scores([3] * (size - 1) + [1])},
+    ]
+    narrative = '{"summary": "s", "improvements": "i", "regressions": "r", "recommendations": "c"}'
+    with patch("app.repositories.form_repository.FormRepository.get_case_score_rows", AsyncMock(return_value=rows)), \
+         patch("app.services.llm_service.LLMService.run_llm", AsyncMock(return_value=narrative)) as mock_llm:
+        diff = await AnalyticsService.progress(1, "B", 2024, 2025, narrative=True)
+
+    assert diff["counts"]["improved"] == 1
+    assert diff["narrative"]["improvements"] == "i"
+    prompt = mock_llm.await_args.args[0]
+    last = template.items[-1]
+    assert f"{last['item']}：3→1" in prompt
+    assert template.items[0]["item"] not in prompt
+
+
+@pytest.mark.asyncio
+async def test_progress_missing_year():
+    from fastapi import HTTPException
+
+    with patch("app.repositories.form_repository.FormRepository.get_case_score_rows", AsyncMock(return_value=[])):
+        with pytest.raises(HTTPException) as excinfo:
+            await AnalyticsService.progress(1, "B", 2024, 2025)
+    assert excinfo.value.status_code == 404
@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException
+from jose import jwt
+from datetime import datetime, timedelta
+
+from app.core.auth import get_current_user, invalidate_principal, principal_cache, SECRET_KEY, ALGORITHM
+from app.core.cache import TTLCache
+
+
+def make_token(user_id: int) -> str:
+    return jwt.encode(
+        {"sub": str(user_id), "exp": datetime.utcnow() + timedelta(minutes=5)},
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_principal():
+    user = {"id": 7, "name": "Cached", "activate": True}
+    with patch("app.repositories.user_repository.UserRepository.get_user_by_id", AsyncMock(return_value=user)) as mock_get:
+        first = await get_current_user(make_token(7))
+        second = await get_current_user(make_token(7))
+
+    assert first == second == user
+    mock_get.assert_awaited_once_with(7)
+    assert principal_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_principal_forces_reload():
+    active = {"id": 7, "name": "User", "activate": True}
+    inactive = {"id": 7, "name": "User", "activate": False}
+    with patch("app.repositories.user_repository.UserRepository.get_user_by_id", AsyncMock(side_effect=[active, inactive])):
+        assert (await get_current_user(make_token(7)))["activate"] is True
+        invalidate_principal(7)
+        assert (await get_current_user(make_token(7)))["activate"] is False
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_unknown_user_not_cached():
+    with patch("app.repositories.user_repository.UserRepository.get_user_by_id", AsyncMock(return_value=None)):
+        with pytest.raises(HTTPException) as excinfo:
+            await get_current_user(make_token(99))
+    assert excinfo.value.status_code == 401
+    assert principal_cache.stats()["size"] == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache("test", max_size=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache("test", max_size=2, ttl=0)
+    cache.set(1, "a")
+
+    assert cache.get(1) is None
+    assert cache.stats()["expirations"] == 1
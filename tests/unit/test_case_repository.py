@@ -94,4 +94,35 @@ async def test_delete_case(mock_delete):
     result = await CaseRepository.delete_case(1)
 
     mock_delete.assert_called_once_with("cases", 1)
-    assert result is True
\ No newline at end of file
+    assert result is True
+
+@pytest.mark.asyncio
+async def test_case_reads_are_cached_until_a_write():
+    from unittest.mock import AsyncMock
+
+    case = {"id": 1, "name": "Case 1"}
+    with patch("app.core.supabase_client.SupabaseService.get_by_id", AsyncMock(return_value=case)) as mock_get_by_id, \
+         patch("app.core.supabase_client.SupabaseService.get_all", AsyncMock(return_value=[case])) as mock_get_all, \
+         patch("app.core.supabase_client.SupabaseService.update", AsyncMock(return_value=case)):
+        await CaseRepository.get_case_by_id(1)
+        await CaseRepository.get_case_by_id(1)
+        await CaseRepository.get_all_cases()
+        await CaseRepository.get_all_cases()
+        assert mock_get_by_id.await_count == 1
+        assert mock_get_all.await_count == 1
+
+        await CaseRepository.update_case(1, {"name": "new"})
+        await CaseRepository.get_case_by_id(1)
+        await CaseRepository.get_all_cases()
+        assert mock_get_by_id.await_count == 2
+        assert mock_get_all.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_case_is_not_cached():
+    from unittest.mock import AsyncMock
+
+    with patch("app.core.supabase_client.SupabaseService.get_by_id", AsyncMock(return_value=None)) as mock_get_by_id:
+        assert await CaseRepository.get_case_by_id(99) is None
+        assert await CaseRepository.get_case_by_id(99) is None
+    assert mock_get_by_id.await_count == 2
@@ -0,0 +1,98 @@
+import gzip
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from app.core.compression import CompressionMiddleware, brotli, choose_encoding
+
+PAYLOAD = [{"activity": "飲食", "item": f"使用餐具 {i}", "support_type": i % 5} for i in range(200)]
+
+
+def make_app():
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/chunks")
+    async def chunks():
+        async def body():
+            for i in range(50):
+                yield f"chunk {i} 資料\n".encode()
+        return StreamingResponse(body(), media_type="text/plain")
+
+    @app.get("/events")
+    async def events():
+        async def body():
+            yield b"data: 1\n\n"
+            yield b"data: 2\n\n"
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    return app
+
+
+async def get(path, accept_encoding):
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Read the raw bytes so the assertions see what went over the wire
+        async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+            return response, b"".join([chunk async for chunk in response.aiter_raw()])
+
+
+@pytest.mark.asyncio
+async def test_large_json_is_gzipped():
+    response, raw = await get("/large", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-length"] == str(len(raw))
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert gzip.decompress(raw).decode().startswith('[{"activity":"飲食"')
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(brotli is None, reason="brotli not installed")
+async def test_brotli_is_preferred_when_accepted():
+    response, raw = await get("/large", "gzip, br")
+    assert response.headers["content-encoding"] == "br"
+    assert len(brotli.decompress(raw)) > len(raw)
+
+
+@pytest.mark.asyncio
+async def test_small_and_unaccepted_responses_are_untouched():
+    response, raw = await get("/small", "gzip, br")
+    assert "content-encoding" not in response.headers
+    assert raw == b'{"ok":true}'
+
+    response, _ = await get("/large", "identity")
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_is_compressed_chunk_by_chunk():
+    response, raw = await get("/chunks", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw).decode() == "".join(f"chunk {i} 資料\n" for i in range(50))
+
+
+@pytest.mark.asyncio
+async def test_event_stream_is_never_compressed():
+    response, raw = await get("/events", "gzip, br")
+    assert "content-encoding" not in response.headers
+    assert raw == b"data: 1\n\ndata: 2\n\n"
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip;q=1.0, br;q=0.9") == ("br" if brotli else "gzip")
+    assert choose_encoding("deflate") is None
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("br;q=0, gzip") == "gzip"
+    assert choose_encoding("*") == ("br" if brotli else "gzip")
+    assert choose_encoding("*, gzip;q=0, br;q=0") is None
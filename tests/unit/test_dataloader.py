@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.dataloader import DataLoader, begin_request_scope
+from app.core.supabase_client import SupabaseService
+
+
+def rows_for(ids):
+    return [{"id": int(i), "name": f"row {i}"} for i in ids if int(i) != 404]
+
+
+@pytest.mark.asyncio
+async def test_loads_in_one_tick_share_a_batch():
+    batch_fn = AsyncMock(side_effect=rows_for)
+    loader = DataLoader(batch_fn)
+
+    first, second, missing, again = await asyncio.gather(
+        loader.load(1), loader.load(2), loader.load(404), loader.load(1)
+    )
+
+    assert first["name"] == "row 1" and second["name"] == "row 2"
+    assert missing is None and again is first
+    batch_fn.assert_awaited_once_with([1, 2, 404])
+
+    assert await loader.load("2") == second
+    assert await loader.load(2) is second
+    assert loader.batches == 1
+
+    loader.clear(2)
+    assert await loader.load("2") == second
+    assert loader.batches == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_not_memoized():
+    loader = DataLoader(AsyncMock(side_effect=[RuntimeError("down"), rows_for([1])]))
+    with pytest.raises(RuntimeError):
+        await loader.load(1)
+    assert (await loader.load(1))["id"] == 1
+
+
+@pytest.mark.asyncio
+async def test_request_scope_dedupes_lookups_and_forgets_writes():
+    begin_request_scope()
+    with patch("app.core.supabase_client.SupabaseService._fetch_by_ids", AsyncMock(side_effect=lambda table, ids, columns="*": rows_for(ids))) as mock_fetch, \
+         patch("app.core.supabase_client.execute", AsyncMock(return_value=SimpleNamespace(data=[{"id": 1}]))), \
+         patch("app.core.supabase_client.get_table", AsyncMock(return_value=MagicMock())):
+        case = await SupabaseService.get_by_id("cases", 1)
+        cases = await SupabaseService.get_by_ids("cases", [1, 2])
+        assert mock_fetch.await_count == 2
+        assert [c["id"] for c in cases] == [1, 2]
+
+        case["name"] = "changed by caller"
+        assert (await SupabaseService.get_by_id("cases", 1))["name"] == "row 1"
+        assert mock_fetch.await_count == 2
+
+        await SupabaseService.update("cases", 1, {"name": "new"})
+        await SupabaseService.get_by_id("cases", 1)
+        assert mock_fetch.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_request_scope_keeps_projections_apart():
+    begin_request_scope()
+    with patch("app.core.supabase_client.SupabaseService._fetch_by_ids", AsyncMock(side_effect=lambda table, ids, columns="*": rows_for(ids))) as mock_fetch:
+        await SupabaseService.get_by_ids("users", [1, 2], columns="id,name")
+        await SupabaseService.get_by_ids("users", [1, 2], columns="id,name")
+        await SupabaseService.get_by_id("users", 1)
+
+    assert [call.args[2] for call in mock_fetch.await_args_list] == ["id,name", "*"]
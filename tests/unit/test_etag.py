@@ -0,0 +1,69 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+
+from app.core.etag import compute_etag, with_etag
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_first_request_gets_payload_and_etag():
+    response = Response()
+    payload = {"id": 1, "name": "個案"}
+
+    assert with_etag(make_request(), response, payload) is payload
+    assert response.headers["ETag"] == compute_etag(payload)
+
+
+def test_matching_if_none_match_returns_304():
+    payload = [{"id": 1}]
+    etag = compute_etag(payload)
+
+    result = with_etag(make_request(f'"other", W/{etag}'), Response(), payload)
+
+    assert result.status_code == 304
+    assert result.headers["ETag"] == etag
+
+
+def test_etag_changes_with_payload():
+    assert compute_etag({"id": 1, "name": "a"}) != compute_etag({"id": 1, "name": "b"})
+    assert compute_etag({"a": 1, "b": 2}) == compute_etag({"b": 2, "a": 1})
+
+
+@pytest.mark.asyncio
+async def test_form_detail_304_skips_loading_content():
+    from app.controllers import form_controller
+
+    version = {"id": 5, "case_id": 1, "user_id": 2, "updated_at": "2024-05-01T00:00:00", "case_name": "c", "user_name": "u"}
+    get_by_id = AsyncMock(return_value={**version, "content": []})
+    with patch("app.services.form_service.FormService.get_version", AsyncMock(return_value=version)), \
+         patch("app.services.form_service.FormService.get_by_id", get_by_id):
+        first = Response()
+        record = await form_controller.get_by_id(5, make_request(), first, current_user={})
+        assert json.loads(record.body)["content"] == []
+        assert record.headers["ETag"] == first.headers["ETag"]
+
+        result = await form_controller.get_by_id(5, make_request(first.headers["ETag"]), Response(), current_user={})
+
+    assert result.status_code == 304
+    assert get_by_id.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_form_service_version_has_names_but_no_content():
+    from app.services.form_service import FormService
+
+    metadata = {"id": 5, "case_id": 1, "user_id": 2, "year": 2024, "form_type": "A", "updated_at": "2024-05-01T00:00:00"}
+    with patch("app.repositories.form_repository.FormRepository.get_metadata", AsyncMock(return_value=metadata)), \
+         patch("app.repositories.case_repository.CaseRepository.get_case_by_id", AsyncMock(return_value={"id": 1, "name": "c"})), \
+         patch("app.repositories.user_repository.UserRepository.get_user_by_id", AsyncMock(return_value={"id": 2, "name": "u"})):
+        version = await FormService.get_version(5)
+
+    assert version["case_name"] == "c" and version["user_name"] == "u"
+    assert "content" not in version
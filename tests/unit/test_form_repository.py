@@ -32,14 +32,54 @@ async def test_get_by_id(form_record_data):
         got = await FormRepository.get_by_id(1)
         assert got["id"] == 1
 
-@pytest.mark.asyncio
-async def test_get_all(form_record_data):
-    with patch("app.core.supabase_client.SupabaseService.get_all", AsyncMock(return_value=[{"id": 1, **form_record_data}])):
-        all_forms = await FormRepository.get_all()
-        assert any(f["id"] == 1 for f in all_forms)
-
 @pytest.mark.asyncio
 async def test_delete():
     with patch("app.core.supabase_client.SupabaseService.delete", AsyncMock(return_value=True)):
         deleted = await FormRepository.delete(1)
         assert deleted
+
+@pytest.mark.asyncio
+async def test_get_metadata_page_projects_columns():
+    with patch("app.core.supabase_client.SupabaseService.get_page", AsyncMock(return_value=[{"id": 2}])) as mock_page:
+        page = await FormRepository.get_metadata_page(case_id=1, after_id=1, limit=10)
+        assert page == [{"id": 2}]
+        mock_page.assert_awaited_once_with(
+            "forms",
+            columns=FormRepository.METADATA_COLUMNS,
+            filters={"case_id": 1},
+            after_id=1,
+            limit=10
+        )
+        assert "content" not in FormRepository.METADATA_COLUMNS
+
+
+@pytest.mark.asyncio
+async def test_packed_storage_round_trip(monkeypatch):
+    from app.core.form_templates import get_template
+
+    monkeypatch.setattr(FormRepository, "PACKED_STORAGE", True)
+    template = get_template("E")
+    content = template.expand([2] * len(template))
+    data = {"case_id": 1, "user_id": 1, "year": 2025, "form_type": "E", "content": content}
+
+    async def fake_create(table, row):
+        return {"id": 1, **row}
+
+    with patch("app.core.supabase_client.SupabaseService.create", AsyncMock(side_effect=fake_create)) as mock_create:
+        created = await FormRepository.create(data)
+
+    stored = mock_create.await_args.args[1]
+    assert stored["content"] is None
+    assert stored["template_version"] == template.version
+    assert len(stored["scores"]) < 200
+    assert created["content"] == content
+
+
+@pytest.mark.asyncio
+async def test_packed_storage_keeps_off_template_content(monkeypatch):
+    monkeypatch.setattr(FormRepository, "PACKED_STORAGE", True)
+    data = {"case_id": 1, "user_id": 1, "year": 2025, "form_type": "E", "content": [{"activity": "自訂"}]}
+    with patch("app.core.supabase_client.SupabaseService.create", AsyncMock(return_value={"id": 1})) as mock_create:
+        await FormRepository.create(data)
+
+    assert mock_create.await_args.args[1] == data
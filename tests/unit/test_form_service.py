@@ -75,4 +75,144 @@ async def test_delete_not_found():
     with patch("app.repositories.form_repository.FormRepository.get_by_id", AsyncMock(return_value=None)):
         with pytest.raises(HTTPException) as excinfo:
             await FormService.delete(999)
-        assert excinfo.value.status_code == 404
\ No newline at end of file
+        assert excinfo.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_get_all_batches_name_lookups():
+    records = [
+        {"id": i, "case_id": i % 3, "user_id": i % 2, "year": 2024, "form_type": "A"}
+        for i in range(1000)
+    ]
+    get_cases = AsyncMock(return_value=[{"id": i, "name": f"case {i}"} for i in range(3)])
+    get_users = AsyncMock(return_value=[{"id": i, "name": f"user {i}"} for i in range(2)])
+    with patch("app.repositories.form_repository.FormRepository.get_metadata_page", AsyncMock(return_value=records)), \
+         patch("app.repositories.case_repository.CaseRepository.get_cases_by_ids", get_cases), \
+         patch("app.repositories.user_repository.UserRepository.get_users_by_ids", get_users):
+        result = await FormService.get_all(limit=1000)
+
+    get_cases.assert_awaited_once()
+    get_users.assert_awaited_once()
+    assert sorted(get_cases.await_args.args[0]) == [0, 1, 2]
+    assert result[4]["case_name"] == "case 1"
+    assert result[4]["user_name"] == "user 0"
+
+
+@pytest.mark.asyncio
+async def test_get_by_case_id_pages_metadata_only():
+    get_page = AsyncMock(return_value=[{"id": 11, "case_id": 1, "user_id": 1, "year": 2024, "form_type": "A"}])
+    with patch("app.repositories.case_repository.CaseRepository.get_case_by_id", AsyncMock(return_value={"id": 1, "name": "test case"})), \
+         patch("app.repositories.form_repository.FormRepository.get_metadata_page", get_page), \
+         patch("app.repositories.case_repository.CaseRepository.get_cases_by_ids", AsyncMock(return_value=[{"id": 1, "name": "test case"}])), \
+         patch("app.repositories.user_repository.UserRepository.get_users_by_ids", AsyncMock(return_value=[])):
+        result = await FormService.get_by_case_id(1, after_id=10, limit=50)
+
+    get_page.assert_awaited_once_with(case_id=1, after_id=10, limit=50)
+    assert result[0]["case_name"] == "test case"
+    assert result[0]["user_name"] is None
+
+
+@pytest.mark.asyncio
+async def test_create_compact_expands_scores():
+    from app.core.form_templates import get_template
+
+    template = get_template("D")
+    data = {"case_id": 1, "user_id": 1, "year": 2025, "form_type": "D",
+            "scores": [1] * len(template), "template_version": template.version}
+    with patch("app.services.form_service.FormService.create", AsyncMock(return_value={"id": 9})) as mock_create:
+        created = await FormService.create_compact(data)
+
+    assert created == {"id": 9}
+    content = mock_create.await_args.args[0]["content"]
+    assert len(content) == len(template)
+    assert content[0]["support_type"] == 1
+
+
+@pytest.mark.asyncio
+async def test_create_compact_rejects_stale_template_version():
+    data = {"case_id": 1, "user_id": 1, "year": 2025, "form_type": "D", "scores": [], "template_version": "old"}
+    with pytest.raises(HTTPException) as excinfo:
+        await FormService.create_compact(data)
+    assert excinfo.value.status_code == 409
+
+def bulk_row(case_id=1, user_id=1):
+    return {
+        "case_id": case_id, "user_id": user_id, "year": 2024, "form_type": "A",
+        "content": [{"activity": "a", "item": "i", "subitem": None, "core_area": "c", "support_type": 2}]
+    }
+
+def test_parse_bulk_ndjson_reports_bad_lines():
+    import json
+    body = "\n".join([json.dumps(bulk_row()), "{not json", "", json.dumps({"case_id": 1})]).encode()
+    rows, errors = FormService.parse_bulk(body, ndjson=True)
+    assert [index for index, _ in rows] == [0]
+    assert rows[0][1]["form_type"] == "A"
+    assert [(e["index"], e["error"]) for e in errors][0] == (1, "invalid JSON")
+    assert errors[1]["index"] == 2 and errors[1]["error"].startswith("user_id")
+
+@pytest.mark.asyncio
+async def test_read_bulk_parses_ndjson_split_across_chunks():
+    import json
+    body = "\n".join([json.dumps(bulk_row()), "{not json", "", json.dumps(bulk_row(case_id=2))]).encode()
+
+    async def chunks():
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    rows, errors = await FormService.read_bulk(chunks(), ndjson=True)
+    assert [index for index, _ in rows] == [0, 2]
+    assert rows[1][1]["case_id"] == 2
+    assert [(e["index"], e["error"]) for e in errors] == [(1, "invalid JSON")]
+
+@pytest.mark.asyncio
+async def test_read_bulk_refuses_oversized_ndjson_before_reading_it_all(monkeypatch):
+    monkeypatch.setattr("app.services.form_service.MAX_BULK_ROWS", 2)
+    read = []
+
+    async def chunks():
+        for line in [b"{}\n", b"{}\n", b"{}\n", b"{}\n"]:
+            read.append(line)
+            yield line
+
+    with pytest.raises(HTTPException) as excinfo:
+        await FormService.read_bulk(chunks(), ndjson=True)
+    assert excinfo.value.status_code == 413
+    assert len(read) == 3
+
+def test_parse_bulk_rejects_non_array():
+    with pytest.raises(HTTPException) as excinfo:
+        FormService.parse_bulk(b'{"case_id": 1}', ndjson=False)
+    assert excinfo.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_bulk_create_validates_ids_once_and_inserts_in_chunks():
+    rows = [(i, bulk_row(case_id=1 if i != 3 else 99)) for i in range(7)]
+    get_cases = AsyncMock(return_value=[{"id": 1}])
+    get_users = AsyncMock(return_value=[{"id": 1}])
+    next_id = iter(range(100, 200))
+    create_many = AsyncMock(side_effect=lambda chunk: [{"id": next(next_id)} for _ in chunk])
+    with patch("app.repositories.case_repository.CaseRepository.get_cases_by_ids", get_cases), \
+         patch("app.repositories.user_repository.UserRepository.get_users_by_ids", get_users), \
+         patch("app.repositories.form_repository.FormRepository.create_many", create_many), \
+         patch("app.services.analytics_service.AnalyticsService.invalidate") as invalidate:
+        summary = await FormService.collect_bulk(FormService.bulk_create(rows, [], chunk_size=4))
+
+    get_cases.assert_awaited_once()
+    get_users.assert_awaited_once()
+    assert [len(call.args[0]) for call in create_many.await_args_list] == [4, 2]
+    assert summary["total"] == 7 and summary["created"] == 6 and summary["failed"] == 1
+    assert summary["results"][3] == {"index": 3, "status": "error", "error": "case_id not found"}
+    assert summary["results"][6] == {"index": 6, "status": "created", "id": 105}
+    invalidate.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_bulk_create_failed_chunk_does_not_stop_the_rest():
+    rows = [(i, bulk_row()) for i in range(4)]
+    create_many = AsyncMock(side_effect=[RuntimeError("insert failed"), [{"id": 1}, {"id": 2}]])
+    with patch("app.repositories.case_repository.CaseRepository.get_cases_by_ids", AsyncMock(return_value=[{"id": 1}])), \
+         patch("app.repositories.user_repository.UserRepository.get_users_by_ids", AsyncMock(return_value=[{"id": 1}])), \
+         patch("app.repositories.form_repository.FormRepository.create_many", create_many):
+        batches = [batch async for batch in FormService.bulk_create(rows, [], chunk_size=2)]
+
+    assert [r["status"] for r in batches[0]] == ["error", "error"]
+    assert batches[0][0]["error"] == "insert failed"
+    assert [r["id"] for r in batches[1]] == [1, 2]
@@ -0,0 +1,58 @@
+import pytest
+
+from app.core.form_templates import get_template, load_templates
+
+
+def test_templates_are_indexed_by_item_key():
+    templates = load_templates()
+    assert set(templates) == {"A", "B", "C", "D", "E", "F", "G"}
+
+    template = get_template("A")
+    first = template.items[0]
+    assert template.index[(first["activity"], first["item"], first["subitem"])] == 0
+    assert len(template.index) == len(template) == 72
+    assert len(template.version) == 12
+
+
+def test_expand_scores_into_form_items():
+    template = get_template("B")
+    scores = [i % 5 for i in range(len(template))]
+    scores[1] = None
+
+    content = template.expand(scores)
+
+    assert len(content) == len(template)
+    assert content[0] == dict(template.items[0], support_type=0)
+    assert content[1]["support_type"] is None
+
+
+@pytest.mark.parametrize("scores", [[0], [7] * 23])
+def test_expand_rejects_bad_vectors(scores):
+    with pytest.raises(ValueError):
+        get_template("B").expand(scores)
+
+
+def test_unknown_form_type():
+    with pytest.raises(ValueError):
+        get_template("Z")
+
+
+def test_pack_round_trip_keeps_nulls():
+    from app.core.form_templates import pack_scores, unpack_scores
+
+    scores = [None, -1, 0, 4, 2]
+    assert unpack_scores(pack_scores(scores)) == scores
+
+
+def test_compact_is_inverse_of_expand_regardless_of_order():
+    template = get_template("G")
+    scores = [i % 6 - 1 for i in range(len(template))]
+    content = list(reversed(template.expand(scores)))
+    assert template.compact(content) == scores
+
+    with pytest.raises(ValueError):
+        template.compact(content[1:])
+
+    content[0] = dict(content[0], core_area="changed")
+    with pytest.raises(ValueError):
+        template.compact(content)
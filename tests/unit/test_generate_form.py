@@ -0,0 +1,30 @@
+import json
+
+from app.core import form_templates
+from app.data.generate_form import CSV_PATH, OUTPUT_PATH, build
+
+
+def test_build_reproduces_form_json_and_skips_when_unchanged(tmp_path):
+    output, manifest, archive = tmp_path / "form.json", tmp_path / "manifest.json", tmp_path / "templates"
+
+    first = build(CSV_PATH, output, manifest, archive)
+    second = build(CSV_PATH, output, manifest, archive)
+
+    assert first["rebuilt"] is True
+    assert second["rebuilt"] is False
+    assert json.loads(output.read_text(encoding="utf-8")) == json.loads(OUTPUT_PATH.read_text(encoding="utf-8"))
+    assert first["versions"]["A"] == form_templates.get_template("A").version
+    assert sorted(p.stem for p in archive.iterdir()) == sorted(first["versions"].values())
+
+
+def test_archived_version_is_resolvable(tmp_path, monkeypatch):
+    archive = tmp_path / "templates"
+    archive.mkdir()
+    items = [{"activity": "1. 舊活動", "item": "1. 舊項目", "subitem": None, "core_area": "個人發展"}]
+    old = form_templates.FormTemplate("A", items)
+    (archive / f"{old.version}.json").write_text(json.dumps({"form_type": "A", "items": items}), encoding="utf-8")
+    monkeypatch.setattr(form_templates, "TEMPLATE_ARCHIVE_DIR", archive)
+
+    template = form_templates.get_template_version(old.version)
+
+    assert template.expand([3])[0]["item"] == "1. 舊項目"
@@ -0,0 +1,49 @@
+from app.core.json_extractor import JSONExtractor, extract_json
+
+
+def test_extracts_object_surrounded_by_prose():
+    text = '好的，以下是分析結果：\n```\n{"a": {"b": "含有 } 與 \\" 的字串"}, "c": [1, 2]}\n```\n希望有幫助！'
+    assert extract_json(text) == {"a": {"b": '含有 } 與 " 的字串'}, "c": [1, 2]}
+
+
+def test_skips_objects_that_are_not_accepted():
+    text = 'example: {"x": 1} answer: {"summary": "s"}'
+    assert extract_json(text, accept=lambda value: "summary" in value) == {"summary": "s"}
+
+
+def test_stray_brace_in_prose_does_not_swallow_the_object():
+    extractor = JSONExtractor()
+    assert extractor.feed('我會用 { 符號開始，結果如下：') is None
+    assert extractor.feed('{"a": {"b": 1}, "c": [{"d": 2}]} 之後的說明') == {"a": {"b": 1}, "c": [{"d": 2}]}
+    assert extractor.repaired is False
+
+    assert extract_json('Use { for objects. Result: {"a": 1}') == {"a": 1}
+    assert extract_json('Use { to start "objects. Result: {"a": 1}') == {"a": 1}
+
+
+def test_forgives_trailing_commas():
+    assert extract_json('{"a": [1, 2,], "b": 3,}') == {"a": [1, 2], "b": 3}
+
+
+def test_feed_returns_object_as_soon_as_it_closes():
+    extractor = JSONExtractor()
+    assert extractor.feed('前言 {"a": ') is None
+    assert extractor.feed('1}') == {"a": 1}
+    assert extractor.repaired is False
+
+
+def test_repairs_truncated_output():
+    extractor = JSONExtractor()
+    extractor.feed('{"summary": {"summary": "完整", "strengths": "被截斷的字')
+    assert extractor.finish() == {"summary": {"summary": "完整", "strengths": "被截斷的字"}}
+    assert extractor.repaired is True
+
+
+def test_repair_backs_off_to_last_complete_member():
+    extractor = JSONExtractor(accept=lambda value: "a" in value)
+    extractor.feed('{"a": 1, "b": {"c": ')
+    assert extractor.finish() == {"a": 1}
+
+
+def test_no_object_found():
+    assert extract_json("模型沒有回傳 JSON") is None
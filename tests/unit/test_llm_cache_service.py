@@ -0,0 +1,59 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from app.services import llm_cache_service
+from app.services.llm_cache_service import LLMCacheService
+
+
+def test_key_depends_on_prompt_and_generation_config():
+    key = LLMCacheService.key_for("prompt")
+
+    assert key == LLMCacheService.key_for("prompt")
+    assert key != LLMCacheService.key_for("other prompt")
+    with patch.dict(llm_cache_service.llm_client.backend.generation_config, {"temperature": 0.1}):
+        assert key != LLMCacheService.key_for("prompt")
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_hit():
+    await LLMCacheService.put("key", {"summary": "cached"})
+
+    assert await LLMCacheService.get("key") == {"summary": "cached"}
+
+
+@pytest.mark.asyncio
+async def test_table_tier_hit_fills_memory(monkeypatch):
+    monkeypatch.setattr(llm_cache_service, "PERSISTENT_CACHE", True)
+    row = {"result": {"summary": "stored"}, "created_at": datetime.now().isoformat()}
+    with patch("app.repositories.llm_cache_repository.LLMCacheRepository.get_result", AsyncMock(return_value=row)) as mock_get:
+        assert await LLMCacheService.get("key") == {"summary": "stored"}
+        assert await LLMCacheService.get("key") == {"summary": "stored"}
+
+    mock_get.assert_awaited_once_with("key")
+
+
+@pytest.mark.asyncio
+async def test_expired_table_entry_is_a_miss(monkeypatch):
+    monkeypatch.setattr(llm_cache_service, "PERSISTENT_CACHE", True)
+    old = datetime.now() - timedelta(seconds=llm_cache_service.CACHE_TTL_SECONDS + 60)
+    row = {"result": {"summary": "stale"}, "created_at": old.isoformat()}
+    with patch("app.repositories.llm_cache_repository.LLMCacheRepository.get_result", AsyncMock(return_value=row)):
+        assert await LLMCacheService.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_prune_bounds_table_rows(monkeypatch):
+    monkeypatch.setattr(llm_cache_service, "PERSISTENT_CACHE", True)
+    monkeypatch.setattr(llm_cache_service, "MAX_TABLE_ROWS", 50)
+    monkeypatch.setitem(LLMCacheService._stats, "writes", llm_cache_service.PRUNE_EVERY - 1)
+    monkeypatch.setitem(LLMCacheService._stats, "pruned", 0)
+    oldest_kept = datetime(2026, 1, 1, 12, 0)
+    with patch("app.repositories.llm_cache_repository.LLMCacheRepository.save_result", AsyncMock()), \
+         patch("app.repositories.llm_cache_repository.LLMCacheRepository.newest_created_at", AsyncMock(return_value=oldest_kept.isoformat())) as mock_rank, \
+         patch("app.repositories.llm_cache_repository.LLMCacheRepository.delete_before", AsyncMock(side_effect=[2, 30])) as mock_delete:
+        await LLMCacheService.put("key", {"summary": "new"})
+
+    mock_rank.assert_awaited_once_with(50)
+    assert mock_delete.await_args_list[1].args == (oldest_kept,)
+    assert LLMCacheService._stats["pruned"] == 32
@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, patch
+
+from app.models.llm_job import AnalysisJobCreate, JobStatus
+from app.services.llm_job_service import LLMJobService, MAX_RETAINED_JOBS
+from app.core.rate_limiter import RateLimiter
+from app.core.dataloader import begin_request_scope, loader_for
+
+
+@pytest.fixture
+async def job_workers(monkeypatch):
+    monkeypatch.setattr(LLMJobService, "_rate_limiter", RateLimiter(0))
+    yield
+    # Stop this loop's workers before pytest-asyncio closes it
+    for worker in LLMJobService._workers:
+        worker.cancel()
+    await asyncio.gather(*LLMJobService._workers, return_exceptions=True)
+    LLMJobService._queue = None
+
+
+async def wait_for_job(job_id):
+    for _ in range(100):
+        job = LLMJobService.get_job(job_id, include_items=True)
+        if job["finished_at"]:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_job_runs_targets_and_reports_progress(job_workers):
+    request = AnalysisJobCreate(targets=[
+        {"case_id": 1, "year": 2025, "form_type": "A"},
+        {"case_id": 1, "year": 2025, "form_type": "B"},
+        {"case_id": 1, "year": 2025, "form_type": "A"},
+    ])
+    analyze = AsyncMock(side_effect=[{"ok": True}, ValueError("Form not found")])
+    with patch("app.services.llm_service.LLMService.analyze_case", analyze):
+        created = await LLMJobService.create_job(request)
+        assert created["total"] == 2
+        assert created["status"] == JobStatus.QUEUED
+
+        job = await wait_for_job(created["id"])
+
+    assert job["status"] == JobStatus.COMPLETED
+    assert job["completed"] == 1
+    assert job["failed"] == 1
+    failed = [item for item in job["items"] if item["status"] == JobStatus.FAILED]
+    assert failed[0]["error"] == "Form not found"
+
+
+@pytest.mark.asyncio
+async def test_job_expands_filter(job_workers):
+    request = AnalysisJobCreate(filter={"year": 2025, "form_types": ["A", "C"]})
+    keys = [{"id": 1, "case_id": 3, "year": 2025, "form_type": "A"}, {"id": 2, "case_id": 4, "year": 2025, "form_type": "C"}]
+    with patch("app.repositories.form_repository.FormRepository.get_form_keys", AsyncMock(return_value=keys)) as mock_keys, \
+         patch("app.services.llm_service.LLMService.analyze_case", AsyncMock(return_value={})):
+        created = await LLMJobService.create_job(request)
+        job = await wait_for_job(created["id"])
+
+    mock_keys.assert_awaited_once_with(2025, ["A", "C"], None)
+    assert job["completed"] == 2
+
+
+def test_job_request_requires_targets_or_filter():
+    with pytest.raises(ValueError):
+        AnalysisJobCreate()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_paces_acquisitions():
+    limiter = RateLimiter(rate_per_minute=600)  # one token every 0.1s
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert loop.time() - start >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_retention_evicts_only_finished_jobs(job_workers, monkeypatch):
+    monkeypatch.setattr(LLMJobService, "_jobs", type(LLMJobService._jobs)())
+    release = asyncio.Event()
+
+    async def held(*args):
+        await release.wait()
+
+    target = AnalysisJobCreate(targets=[{"case_id": 1, "year": 2025, "form_type": "A"}])
+    empty = AnalysisJobCreate(filter={"year": 2025})
+    with patch("app.services.llm_service.LLMService.analyze_case", AsyncMock(side_effect=held)), \
+         patch("app.repositories.form_repository.FormRepository.get_form_keys", AsyncMock(return_value=[])):
+        active = await LLMJobService.create_job(target)
+        for _ in range(MAX_RETAINED_JOBS):
+            await LLMJobService.create_job(empty)
+
+        assert LLMJobService.get_job(active["id"]) is not None
+        assert len(LLMJobService._jobs) == MAX_RETAINED_JOBS
+
+        for _ in range(MAX_RETAINED_JOBS - 1):
+            await LLMJobService.create_job(target)
+        with pytest.raises(HTTPException) as excinfo:
+            await LLMJobService.create_job(empty)
+        assert excinfo.value.status_code == 503
+
+        release.set()
+        await wait_for_job(active["id"])
+
+
+@pytest.mark.asyncio
+async def test_workers_do_not_inherit_the_request_scope(job_workers):
+    begin_request_scope()
+    seen = []
+
+    async def analyze(*args):
+        seen.append(loader_for("forms", AsyncMock()))
+
+    with patch("app.services.llm_service.LLMService.analyze_case", AsyncMock(side_effect=analyze)):
+        created = await LLMJobService.create_job(AnalysisJobCreate(targets=[{"case_id": 1, "year": 2025, "form_type": "A"}]))
+        await wait_for_job(created["id"])
+
+    assert seen == [None]
+
+
+@pytest.mark.asyncio
+async def test_only_items_that_generate_take_a_rate_token(job_workers, monkeypatch):
+    from app.core.llm_pipeline import FakeBackend, LLMClient
+
+    limiter = AsyncMock()
+    monkeypatch.setattr(LLMJobService, "_rate_limiter", limiter)
+    client = LLMClient(FakeBackend())
+
+    async def analyze(case_id, year, form_type):
+        # Form A already has an analysis; form B needs a generation
+        if form_type == "B":
+            await client.generate("prompt")
+
+    request = AnalysisJobCreate(targets=[
+        {"case_id": 1, "year": 2025, "form_type": "A"},
+        {"case_id": 1, "year": 2025, "form_type": "B"},
+    ])
+    with patch("app.services.llm_service.LLMService.analyze_case", AsyncMock(side_effect=analyze)):
+        created = await LLMJobService.create_job(request)
+        await wait_for_job(created["id"])
+
+    limiter.acquire.assert_awaited_once()
@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.core.llm_pipeline import LLMBackend, LLMClient, FakeBackend, FAKE_RESPONSE
+
+
+class FlakyBackend(LLMBackend):
+    name = "flaky"
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise google_exceptions.ResourceExhausted("quota")
+        return "ok"
+
+
+class SlowBackend(LLMBackend):
+    name = "slow"
+
+    async def generate(self, prompt: str) -> str:
+        await asyncio.sleep(1)
+        return "late"
+
+
+@pytest.mark.asyncio
+async def test_generate_with_fake_backend():
+    client = LLMClient(FakeBackend())
+    assert await client.generate("prompt") == FAKE_RESPONSE
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited_not_serialized():
+    backend = FakeBackend(latency=0.05)
+    client = LLMClient(backend, max_concurrency=4)
+
+    await asyncio.gather(*[client.generate("prompt") for _ in range(16)])
+
+    assert backend.calls == 16
+    assert client.stats()["peak_in_flight"] == 4
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors():
+    backend = FlakyBackend(failures=2)
+    client = LLMClient(backend, max_retries=2, backoff_base=0.001)
+
+    assert await client.generate("prompt") == "ok"
+    assert backend.calls == 3
+    assert client.stats()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    client = LLMClient(FlakyBackend(failures=5), max_retries=1, backoff_base=0.001)
+
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        await client.generate("prompt")
+    assert client.stats()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_per_attempt():
+    client = LLMClient(SlowBackend(), timeout=0.01, max_retries=1, backoff_base=0.001)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await client.generate("prompt")
+    assert client.stats()["timeouts"] == 2
+
+
+def test_backoff_is_jittered_and_capped():
+    client = LLMClient(FakeBackend(), backoff_base=1.0, backoff_max=5.0)
+    delays = [client.backoff_delay(10) for _ in range(50)]
+
+    assert all(0 <= d <= 5.0 for d in delays)
+    assert len(set(delays)) > 1
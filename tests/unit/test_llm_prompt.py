@@ -0,0 +1,28 @@
+from app.models.llm_prompt import LLMPrompt
+
+
+def test_encode_form_content_groups_by_area_and_activity():
+    content = [
+        {"activity": "1. 使用廁所", "item": "1. 小便", "subitem": None, "core_area": "個人發展", "support_type": 2},
+        {"activity": "1. 使用廁所", "item": "2. 大便", "subitem": "(1) 坐馬桶", "core_area": "個人發展", "support_type": None},
+        {"activity": "2. 處理衣物", "item": "1. 更換髒衣物", "subitem": None, "core_area": "個人發展", "support_type": -1},
+    ]
+
+    encoded = LLMPrompt.encode_form_content(content)
+
+    assert encoded.splitlines() == [
+        "【個人發展】",
+        "1. 使用廁所",
+        " 1. 小便=2",
+        " 2. 大便／(1) 坐馬桶=?",
+        "2. 處理衣物",
+        " 1. 更換髒衣物=-1",
+    ]
+    assert "None" not in encoded
+
+
+def test_analysis_prompt_reuses_precompiled_template():
+    first = LLMPrompt.generate_analysis_prompt([], "A")
+    assert LLMPrompt.template_for("A") is LLMPrompt.template_for("A")
+    assert first.startswith(LLMPrompt.template_for("A"))
+    assert "使用廁所" in first
@@ -2,12 +2,6 @@ import pytest
 from unittest.mock import AsyncMock, patch
 from app.repositories.llm_repository import LLMRepository
 
-@pytest.mark.asyncio
-async def test_get_question_value():
-    with patch("app.core.supabase_client.SupabaseService.query_field_by_conditions", new=AsyncMock(return_value="test_value")):
-        result = await LLMRepository.get_question_value("123", "2025", "questions_A")
-        assert result == "test_value"
-
 @pytest.mark.asyncio
 async def test_save_analysis_result():
     with patch("app.core.supabase_client.SupabaseService.create", new=AsyncMock(return_value={"id": 1})) as mock_create:
@@ -21,27 +15,43 @@ async def test_save_analysis_result():
         mock_create.assert_awaited_once()
 
 @pytest.mark.asyncio
-async def test_get_analysis_result_found():
-    with patch("app.core.supabase_client.SupabaseService.query_field_by_conditions", new=AsyncMock(side_effect=[
-        {
-            "summary": "test summary",
-            "strengths": "test strengths",
-            "concerns": "test concerns",
-            "priority_item": "test priority"
-        },  # summary_result
-        {
-            "strategy": "test strategy"
-        }  # suggestions_result
-    ])):
-        result = await LLMRepository.get_analysis_result(1, "questions_A")
-        assert result is not None
-        assert result.summary.summary == "test summary"
-        assert result.summary.strengths == "test strengths"
-        assert result.suggestions.strategy == "test strategy"
+async def test_get_form_with_analysis_embeds_analysis():
+    row = {
+        "id": 5,
+        "content": [{"activity": "1. 使用廁所"}],
+        "LifeSupportFormAnalysis": [{
+            "summary": {"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"},
+            "suggestions": {"strategy": "t"}
+        }]
+    }
+    with patch("app.core.supabase_client.SupabaseService.query", new=AsyncMock(return_value=[row])) as mock_query:
+        form = await LLMRepository.get_form_with_analysis(1, 2025, "A")
+
+    assert form["id"] == 5
+    assert form["content"] == row["content"]
+    assert form["analysis"].suggestions.strategy == "t"
+    assert "LifeSupportFormAnalysis(" in mock_query.await_args.kwargs["columns"]
+
+
+@pytest.mark.asyncio
+async def test_get_form_with_analysis_without_analysis():
+    row = {"id": 5, "content": [{"activity": "1. 使用廁所"}], "LifeSupportFormAnalysis": []}
+    with patch("app.core.supabase_client.SupabaseService.query", new=AsyncMock(return_value=[row])):
+        form = await LLMRepository.get_form_with_analysis(1, 2025, "A")
+
+    assert form["analysis"] is None
 
 
 @pytest.mark.asyncio
-async def test_get_analysis_result_not_found():
-    with patch("app.core.supabase_client.SupabaseService.query_field_by_conditions", new=AsyncMock(return_value=None)):
-        result = await LLMRepository.get_analysis_result(1, "questions_A")
-        assert result is None
+async def test_get_case_forms_with_analysis_single_query():
+    rows = [
+        {"id": 1, "form_type": "A", "content": [{"a": 1}], "LifeSupportFormAnalysis": []},
+        {"id": 2, "form_type": "B", "content": [{"b": 1}], "LifeSupportFormAnalysis": None},
+    ]
+    with patch("app.core.supabase_client.SupabaseService.query", new=AsyncMock(return_value=rows)) as mock_query:
+        forms = await LLMRepository.get_case_forms_with_analysis(1, 2025)
+
+    mock_query.assert_awaited_once()
+    assert mock_query.await_args.kwargs["filters"] == {"case_id": 1, "year": 2025}
+    assert [f["form_type"] for f in forms] == ["A", "B"]
+    assert all(f["analysis"] is None for f in forms)
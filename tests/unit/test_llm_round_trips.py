@@ -0,0 +1,77 @@
+import pytest
+from types import SimpleNamespace
+
+from app.core import supabase_client
+from app.services.llm_service import LLMService
+
+ANALYSIS = {
+    "summary": {"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"},
+    "suggestions": {"strategy": "t"}
+}
+LLM_RESPONSE = '{"summary": {"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"}, "suggestions": {"strategy": "t"}}'
+
+
+class RecordingQuery:
+    """Chainable request builder that answers every select with one form row"""
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        return SimpleNamespace(data=[self.row])
+
+
+@pytest.fixture
+def round_trips(monkeypatch):
+    trips = []
+    state = {"row": None}
+
+    async def fake_get_table(name):
+        return RecordingQuery(name, state["row"])
+
+    async def fake_execute(query):
+        trips.append(query.table)
+        return await query.execute()
+
+    monkeypatch.setattr(supabase_client, "get_table", fake_get_table)
+    monkeypatch.setattr(supabase_client, "execute", fake_execute)
+    return trips, state
+
+
+@pytest.mark.asyncio
+async def test_existing_analysis_costs_one_round_trip(round_trips):
+    trips, state = round_trips
+    state["row"] = {"id": 1, "content": [{"a": 1}], "LifeSupportFormAnalysis": [ANALYSIS]}
+
+    result = await LLMService.analyze_case(1, 2025, "A")
+
+    assert result == ANALYSIS
+    assert trips == ["forms"]
+
+
+@pytest.mark.asyncio
+async def test_new_analysis_costs_fetch_plus_save(round_trips, monkeypatch):
+    trips, state = round_trips
+    state["row"] = {"id": 1, "content": [{"a": 1}], "LifeSupportFormAnalysis": []}
+
+    async def fake_llm(prompt):
+        return LLM_RESPONSE
+
+    monkeypatch.setattr(LLMService, "run_llm", staticmethod(fake_llm))
+
+    await LLMService.analyze_case(1, 2025, "A")
+
+    assert trips == ["forms", "LifeSupportFormAnalysis"]
+
+
+@pytest.mark.asyncio
+async def test_get_analysis_result_costs_one_round_trip(round_trips):
+    trips, state = round_trips
+    state["row"] = {"id": 1, "content": [{"a": 1}], "LifeSupportFormAnalysis": [ANALYSIS]}
+
+    assert await LLMService.get_analysis_result(1, 2025, "A") == ANALYSIS
+    assert trips == ["forms"]
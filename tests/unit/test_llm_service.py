@@ -1,36 +1,39 @@
 import pytest
+import json
 from unittest.mock import patch, AsyncMock, MagicMock
-from app.services.llm_service import LLMService
+from app.services.llm_service import FormNotFound, LLMService
 from app.models.llm_analysis_result import AnalysisResult
 
 
 @pytest.mark.asyncio
 async def test_analyze_case_with_existing_result():
     # 模擬資料
-    fake_form_data = {"some": "data"}
-    fake_form_id = 123
-    fake_existing_result = AnalysisResult(
-        summary={
-            "summary": "已有摘要",
-            "strengths": "已有優勢",
-            "concerns": "已有困難",
-            "priority_item": "已有優先項目"
-        },
-        suggestions={"strategy": "已有策略"}
-    )
+    fake_form = {
+        "id": 123,
+        "content": [{"some": "data"}],
+        "analysis": AnalysisResult(
+            summary={
+                "summary": "已有摘要",
+                "strengths": "已有優勢",
+                "concerns": "已有困難",
+                "priority_item": "已有優先項目"
+            },
+            suggestions={"strategy": "已有策略"}
+        )
+    }
 
-    with patch("app.repositories.llm_repository.LLMRepository.get_question_value", new=AsyncMock(side_effect=[fake_form_data, fake_form_id])):
-        with patch("app.services.llm_service.LLMService.get_analysis_result", new=AsyncMock(return_value=fake_existing_result)):
-            result = await LLMService.analyze_case(1, "2025", "questions_A")
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(return_value=fake_form)):
+        with patch("app.services.llm_service.LLMService.run_llm", new=AsyncMock()) as mock_llm:
+            result = await LLMService.analyze_case(1, 2025, "A")
 
-            assert result.summary.strengths == "已有優勢"
-            assert result.suggestions.strategy == "已有策略"
+            assert result["summary"]["strengths"] == "已有優勢"
+            assert result["suggestions"]["strategy"] == "已有策略"
+            mock_llm.assert_not_awaited()
 
 
 @pytest.mark.asyncio
 async def test_analyze_case_without_existing_result():
-    fake_form_data = {"some": "data"}
-    fake_form_id = 123
+    fake_form = {"id": 123, "content": [{"some": "data"}], "analysis": None}
     fake_prompt = "這是 prompt"
     fake_llm_response = """```json
     {
@@ -46,21 +49,21 @@ async def test_analyze_case_without_existing_result():
     }
     ```"""
 
-    with patch("app.repositories.llm_repository.LLMRepository.get_question_value", new=AsyncMock(side_effect=[fake_form_data, fake_form_id])):
-        with patch("app.services.llm_service.LLMService.get_analysis_result", new=AsyncMock(return_value=None)):
-            with patch("app.models.llm_prompt.LLMPrompt.generate_analysis_prompt", return_value=fake_prompt):
-                with patch("app.services.llm_service.LLMService.run_llm", return_value=fake_llm_response):
-                    with patch("app.repositories.llm_repository.LLMRepository.save_analysis_result", new=AsyncMock()) as mock_save:
-                        result = await LLMService.analyze_case(1, "2025", "questions_A")
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(return_value=fake_form)):
+        with patch("app.models.llm_prompt.LLMPrompt.generate_analysis_prompt", return_value=fake_prompt):
+            with patch("app.services.llm_service.LLMService.run_llm", return_value=fake_llm_response):
+                with patch("app.repositories.llm_repository.LLMRepository.save_analysis_result", new=AsyncMock()) as mock_save:
+                    result = await LLMService.analyze_case(1, 2025, "A")
 
-                        assert result.summary.strengths == "測試優勢"
-                        assert result.suggestions.strategy == "測試策略"
-                        mock_save.assert_awaited_once()
+                    assert result["summary"]["strengths"] == "測試優勢"
+                    assert result["suggestions"]["strategy"] == "測試策略"
+                    mock_save.assert_awaited_once()
+                    assert mock_save.await_args.kwargs["filled_form_id"] == 123
 
 
 @pytest.mark.asyncio
 async def test_analyze_case_form_not_found():
-    with patch("app.repositories.llm_repository.LLMRepository.get_question_value", new=AsyncMock(return_value=None)):
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(return_value=None)):
         with pytest.raises(ValueError, match="Form not found"):
             await LLMService.analyze_case(1, "2025", "questions_A")
 
@@ -85,9 +88,209 @@ async def test_parse_response_to_json_success():
     assert result.suggestions.strategy == "策略"
 
 
-def test_clean_json_text():
-    raw_text = """```json
-    {"a": 1}
-    ```"""
-    cleaned = LLMService.clean_json_text(raw_text)
-    assert cleaned == '{"a": 1}'
+@pytest.mark.asyncio
+async def test_stream_analysis_emits_tokens_then_saved_result():
+    from app.core.llm_pipeline import FakeBackend
+
+    backend = FakeBackend()
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(return_value={"id": 123, "content": [{"some": "data"}], "analysis": None})), \
+         patch("app.models.llm_prompt.LLMPrompt.generate_analysis_prompt", return_value="prompt"), \
+         patch("app.services.llm_service.llm_stream", side_effect=backend.stream), \
+         patch("app.repositories.llm_repository.LLMRepository.save_analysis_result", new=AsyncMock()) as mock_save:
+        events = await LLMService.stream_analysis(1, 2025, "A")
+        received = [event async for event in events]
+
+    kinds = [kind for kind, _ in received]
+    assert kinds[-1] == "result"
+    assert set(kinds[:-1]) == {"token"}
+    assert "".join(data["text"] for kind, data in received if kind == "token") == backend.response
+    assert received[-1][1]["suggestions"]["strategy"] == "測試策略"
+    mock_save.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stream_analysis_dropped_before_iteration_leaves_no_flight():
+    from app.services.llm_service import analysis_flights
+
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(return_value={"id": 123, "content": [{"some": "data"}], "analysis": None})), \
+         patch("app.models.llm_prompt.LLMPrompt.generate_analysis_prompt", return_value="prompt"), \
+         patch("app.services.llm_service.llm_stream") as mock_stream:
+        events = await LLMService.stream_analysis(1, 2025, "A")
+        await events.aclose()
+
+    assert analysis_flights.in_flight((1, 2025, "A")) is None
+    mock_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stream_analysis_replays_existing_result():
+    existing = {"summary": {"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"},
+                "suggestions": {"strategy": "已有策略"}}
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(return_value={"id": 123, "content": [{"some": "data"}], "analysis": AnalysisResult(**existing)})), \
+         patch("app.services.llm_service.llm_stream") as mock_stream:
+        events = await LLMService.stream_analysis(1, 2025, "A")
+        received = [event async for event in events]
+
+    assert received == [("result", existing)]
+    mock_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_analyze_case_generates_once():
+    import asyncio
+
+    async def slow_llm(prompt):
+        await asyncio.sleep(0.05)
+        return '{"summary": {"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"}, "suggestions": {"strategy": "t"}}'
+
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(return_value={"id": 123, "content": [{"some": "data"}], "analysis": None})), \
+         patch("app.models.llm_prompt.LLMPrompt.generate_analysis_prompt", return_value="prompt"), \
+         patch("app.services.llm_service.LLMService.run_llm", new=AsyncMock(side_effect=slow_llm)) as mock_llm, \
+         patch("app.repositories.llm_repository.LLMRepository.save_analysis_result", new=AsyncMock()) as mock_save:
+        results = await asyncio.gather(*[LLMService.analyze_case(1, 2025, "A") for _ in range(3)])
+
+    assert mock_llm.await_count == 1
+    mock_save.assert_awaited_once()
+    assert results[0] == results[1] == results[2]
+
+
+@pytest.mark.asyncio
+async def test_identical_prompt_reuses_cached_result_for_another_form():
+    response = '{"summary": {"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"}, "suggestions": {"strategy": "t"}}'
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(side_effect=[{"id": 1, "content": [{"a": 1}], "analysis": None}, {"id": 2, "content": [{"a": 1}], "analysis": None}])), \
+         patch("app.services.llm_service.LLMService.run_llm", new=AsyncMock(return_value=response)) as mock_llm, \
+         patch("app.repositories.llm_repository.LLMRepository.save_analysis_result", new=AsyncMock()) as mock_save:
+        first = await LLMService.analyze_case(1, 2025, "A")
+        second = await LLMService.analyze_case(2, 2025, "A")
+
+    assert first == second
+    assert mock_llm.await_count == 1
+    assert [c.kwargs["filled_form_id"] for c in mock_save.await_args_list] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_analyze_case_year_fans_out_missing_forms_in_parallel():
+    import asyncio
+
+    form_response = '{"summary": {"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"}, "suggestions": {"strategy": "t"}}'
+    plan_response = '{"overall_summary": "o", "strengths": "s", "concerns": "c", "priority_goals": "g", "support_plan": "p"}'
+    existing = AnalysisResult(**json.loads(form_response))
+    forms = [
+        {"id": 1, "form_type": "A", "content": [{"a": 1}], "analysis": existing},
+        {"id": 2, "form_type": "B", "content": [{"b": 1}], "analysis": None},
+        {"id": 3, "form_type": "C", "content": [{"c": 1}], "analysis": None},
+    ]
+
+    async def slow_llm(prompt):
+        await asyncio.sleep(0.1)
+        return plan_response if "overall_summary" in prompt else form_response
+
+    with patch("app.repositories.llm_repository.LLMRepository.get_case_forms_with_analysis", new=AsyncMock(return_value=forms)), \
+         patch("app.services.llm_service.LLMService.run_llm", new=AsyncMock(side_effect=slow_llm)) as mock_llm, \
+         patch("app.repositories.llm_repository.LLMRepository.save_analysis_result", new=AsyncMock()) as mock_save:
+        start = asyncio.get_running_loop().time()
+        result = await LLMService.analyze_case_year(1, 2025)
+        elapsed = asyncio.get_running_loop().time() - start
+
+    # Two missing forms plus one synthesis call; the missing forms run side by side
+    assert mock_llm.await_count == 3
+    assert elapsed < 0.3
+    assert sorted(c.kwargs["filled_form_id"] for c in mock_save.await_args_list) == [2, 3]
+    assert set(result["forms"]) == {"A", "B", "C"}
+    assert result["plan"]["priority_goals"] == "g"
+
+
+@pytest.mark.asyncio
+async def test_analyze_case_year_offline_runs_every_form_in_one_wave():
+    import asyncio
+    from app.core.llm_pipeline import FakeBackend, llm_client
+
+    forms = [
+        {"id": i, "form_type": form_type, "content": [{"item": form_type}], "analysis": None}
+        for i, form_type in enumerate("ABCDEFG", start=1)
+    ]
+    with patch("app.repositories.llm_repository.LLMRepository.get_case_forms_with_analysis", new=AsyncMock(return_value=forms)), \
+         patch("app.repositories.llm_repository.LLMRepository.save_analysis_result", new=AsyncMock()), \
+         patch.object(llm_client, "backend", FakeBackend(latency=0.1)):
+        start = asyncio.get_running_loop().time()
+        result = await LLMService.analyze_case_year(1, 2025)
+        elapsed = asyncio.get_running_loop().time() - start
+
+    # Seven forms side by side, then the synthesis: about two model latencies in all
+    assert elapsed < 0.28
+    assert set(result["forms"]) == set("ABCDEFG")
+    assert result["plan"]["support_plan"] == "測試支持計畫"
+
+
+@pytest.mark.asyncio
+async def test_analyze_case_year_without_forms():
+    with patch("app.repositories.llm_repository.LLMRepository.get_case_forms_with_analysis", new=AsyncMock(return_value=[])):
+        with pytest.raises(FormNotFound):
+            await LLMService.analyze_case_year(1, 2025)
+
+
+@pytest.mark.asyncio
+async def test_analyze_case_reanalyzes_only_changed_activities(monkeypatch):
+    from app.repositories.llm_repository import LLMRepository
+
+    monkeypatch.setattr(LLMRepository, "INCREMENTAL_ANALYSIS", True)
+    content = [
+        {"activity": "1. 使用廁所", "item": "1. 小便", "subitem": None, "core_area": "個人發展", "support_type": 1},
+        {"activity": "2. 處理衣物", "item": "1. 更換髒衣物", "subitem": None, "core_area": "個人發展", "support_type": 2},
+    ]
+    digests = LLMService.activity_digests(content)
+    edited = [content[0], dict(content[1], support_type=4)]
+    previous = AnalysisResult(
+        summary={"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"},
+        suggestions={"strategy": "舊策略"}
+    )
+    revised = '{"summary": {"summary": "s", "strengths": "s", "concerns": "c2", "priority_item": "p"}, "suggestions": {"strategy": "新策略"}}'
+    form = {"id": 7, "content": edited, "analysis": previous, "digests": digests}
+
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(return_value=form)), \
+         patch("app.services.llm_service.LLMService.run_llm", new=AsyncMock(return_value=revised)) as mock_llm, \
+         patch("app.repositories.llm_repository.LLMRepository.update_analysis_result", new=AsyncMock()) as mock_update, \
+         patch("app.repositories.llm_repository.LLMRepository.save_analysis_result", new=AsyncMock()) as mock_save:
+        result = await LLMService.analyze_case(1, 2025, "A")
+
+    prompt = mock_llm.await_args.args[0]
+    assert "更換髒衣物=4" in prompt
+    assert "小便" not in prompt
+    assert "舊策略" in prompt
+    assert result["suggestions"]["strategy"] == "新策略"
+    mock_save.assert_not_awaited()
+    assert mock_update.await_args.kwargs["activity_digests"] == LLMService.activity_digests(edited)
+
+
+@pytest.mark.asyncio
+async def test_analyze_case_reuses_analysis_when_digests_match(monkeypatch):
+    from app.repositories.llm_repository import LLMRepository
+
+    monkeypatch.setattr(LLMRepository, "INCREMENTAL_ANALYSIS", True)
+    content = [{"activity": "1. 使用廁所", "item": "1. 小便", "subitem": None, "core_area": "個人發展", "support_type": 1}]
+    previous = AnalysisResult(
+        summary={"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"},
+        suggestions={"strategy": "舊策略"}
+    )
+    form = {"id": 7, "content": content, "analysis": previous, "digests": LLMService.activity_digests(content)}
+
+    with patch("app.repositories.llm_repository.LLMRepository.get_form_with_analysis", new=AsyncMock(return_value=form)), \
+         patch("app.services.llm_service.LLMService.run_llm", new=AsyncMock()) as mock_llm:
+        result = await LLMService.analyze_case(1, 2025, "A")
+
+    assert result == previous.dict()
+    mock_llm.assert_not_awaited()
+
+
+def test_parse_response_to_json_with_preamble_and_tracks_failures():
+    before = LLMService.parse_stats()
+    response_text = '以下是結果：{"summary": {"summary": "s", "strengths": "s", "concerns": "c", "priority_item": "p"}, "suggestions": {"strategy": "t"}} 謝謝'
+
+    result = LLMService.parse_response_to_json(response_text)
+    with pytest.raises(ValueError):
+        LLMService.parse_response_to_json("無法解析")
+
+    after = LLMService.parse_stats()
+    assert result.suggestions.strategy == "t"
+    assert after["parsed"] == before["parsed"] + 1
+    assert after["failed"] == before["failed"] + 1
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": calls}
+
+    results = await asyncio.gather(*[flights.do("key", work) for _ in range(5)])
+
+    assert calls == 1
+    assert all(r == {"value": 1} for r in results)
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "followers": 4}
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flights = SingleFlight("test")
+
+    async def work(key):
+        await asyncio.sleep(0.01)
+        return key
+
+    results = await asyncio.gather(flights.do("a", lambda: work("a")), flights.do("b", lambda: work("b")))
+
+    assert results == ["a", "b"]
+    assert flights.stats()["leaders"] == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_key_is_released():
+    flights = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flights.do("key", fail), flights.do("key", fail), return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flights.in_flight("key") is None
+
+
+@pytest.mark.asyncio
+async def test_started_flight_releases_followers():
+    flights = SingleFlight("test")
+    flight = flights.start("key")
+
+    follower = asyncio.ensure_future(flights.join(flights.in_flight("key")))
+    await asyncio.sleep(0)
+    flights.finish(flight, result="done")
+
+    assert await follower == "done"
+    assert flights.in_flight("key") is None
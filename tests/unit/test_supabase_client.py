@@ -0,0 +1,66 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+
+from app.core import supabase_client
+from app.core.supabase_client import SupabaseService
+
+
+class FakeQuery:
+    """Chainable stand-in for a postgrest request builder with a slow execute"""
+
+    def __init__(self, latency: float, tracker: dict):
+        self.latency = latency
+        self.tracker = tracker
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        self.tracker["in_flight"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["in_flight"])
+        await asyncio.sleep(self.latency)
+        self.tracker["in_flight"] -= 1
+        return SimpleNamespace(data=[{"id": 1}])
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    tracker = {"in_flight": 0, "peak": 0, "created": 0}
+
+    class FakeClient:
+        def table(self, name):
+            return FakeQuery(0.05, tracker)
+
+    async def fake_acreate_client(**kwargs):
+        tracker["created"] += 1
+        return FakeClient()
+
+    monkeypatch.setattr(supabase_client, "acreate_client", fake_acreate_client)
+    monkeypatch.setattr(supabase_client, "_client", None)
+    monkeypatch.setattr(supabase_client, "_client_loop", None)
+    return tracker
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_overlap(fake_client):
+    """20 concurrent 50ms queries should finish in roughly one round trip, not twenty"""
+    start = time.perf_counter()
+    results = await asyncio.gather(*[SupabaseService.get_by_id("cases", i) for i in range(20)])
+    elapsed = time.perf_counter() - start
+
+    assert all(r == {"id": 1} for r in results)
+    assert fake_client["peak"] == 20
+    assert elapsed < 0.5
+    # All queries share a single client and its pooled HTTP session
+    assert fake_client["created"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(fake_client, monkeypatch):
+    monkeypatch.setattr(supabase_client, "MAX_CONCURRENT_QUERIES", 5)
+
+    await asyncio.gather(*[SupabaseService.get_all("cases") for _ in range(20)])
+
+    assert fake_client["peak"] == 5
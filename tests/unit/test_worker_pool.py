@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import pytest
+
+from app.core.worker_pool import WorkerPool, WorkerPoolBusy
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_and_counts():
+    pool = WorkerPool("test", max_workers=2, max_queue=10)
+
+    result = await pool.run(lambda a, b: a + b, 1, 2)
+
+    assert result == 3
+    stats = pool.stats()
+    assert stats["completed"] == 1
+    assert stats["queued"] == 0
+    assert stats["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_rejects_when_queue_is_full():
+    pool = WorkerPool("test", max_workers=1, max_queue=2)
+    release = threading.Event()
+
+    first = asyncio.ensure_future(pool.run(release.wait))
+    second = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    # One job is running and one is waiting, so the queue still has room for one more
+    third = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0)
+    with pytest.raises(WorkerPoolBusy):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(first, second, third)
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 3
+    assert stats["peak_queued"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_job_frees_its_slot():
+    pool = WorkerPool("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+    waiting = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    assert pool.stats()["queued"] == 0
+    release.set()
+    await running
+    assert await pool.run(lambda: "ok") == "ok"
+    assert pool.stats()["completed"] == 2